@@ -0,0 +1,56 @@
+"""
+Conexões com o banco: persistentes e com health check.
+
+As duas formas de configurar o banco (DATABASE_URL ou POSTGRES_*/DATABASE_HOST) passam
+por database_settings() e recebem as mesmas opções:
+
+- CONN_MAX_AGE (DB_CONN_MAX_AGE, padrão 600 s): a conexão da thread é reaproveitada
+  entre requisições, sem novo handshake TLS/autenticação a cada chamada. No modo ASGI
+  (SERVER_MODE=asgi) o padrão é 0, como recomenda o Django: as views async usam threads
+  do executor que não reaproveitam conexões de forma previsível; use um pooler externo
+  (PgBouncer) na frente do Postgres.
+- CONN_HEALTH_CHECKS: a conexão persistente que caiu (restart do Postgres, timeout de
+  ociosidade de um proxy) é testada e reaberta no início da requisição, em vez de
+  estourar erro na primeira query.
+- connect_timeout (DB_CONNECT_TIMEOUT): Postgres fora do ar não prende o worker.
+
+Cada thread do gunicorn (GUNICORN_THREADS) mantém a sua conexão: no Postgres o total fica
+em WEB_CONCURRENCY x GUNICORN_THREADS (+ runworker), que precisa caber em max_connections.
+Reaproveitamento, idade e tempo de vida das conexões aparecem em /api/metrics/ (core.metrics).
+"""
+import os
+
+from decouple import config
+
+POSTGRES_ENGINES = ('django.db.backends.postgresql', 'django.db.backends.postgresql_psycopg2')
+
+
+def asgi_mode():
+    return config('SERVER_MODE', default='wsgi').lower() == 'asgi'
+
+
+def _explicit():
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('POSTGRES_DB', default=os.environ.get('POSTGRES_DB', 'MYfitPersonal')),
+        'USER': config('POSTGRES_USER', default=os.environ.get('POSTGRES_USER', 'gym')),
+        'PASSWORD': config('POSTGRES_PASSWORD', default=os.environ.get('POSTGRES_PASSWORD', 'gym_secret')),
+        'HOST': config('DATABASE_HOST', default=os.environ.get('DATABASE_HOST', 'localhost')),
+        'PORT': config('DATABASE_PORT', default=os.environ.get('DATABASE_PORT', '5432')),
+    }
+
+
+def database_settings():
+    """DATABASES['default']: DATABASE_URL se definido (ex.: Docker, Railway), senão POSTGRES_*."""
+    url = os.environ.get('DATABASE_URL')
+    if url:
+        import dj_database_url
+        db = dj_database_url.parse(url)
+    else:
+        db = _explicit()
+    db['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=0 if asgi_mode() else 600, cast=int)
+    db['CONN_HEALTH_CHECKS'] = True
+    if db['ENGINE'] in POSTGRES_ENGINES:
+        options = db.setdefault('OPTIONS', {})
+        options.setdefault('connect_timeout', config('DB_CONNECT_TIMEOUT', default=5, cast=int))
+    return db
@@ -6,6 +6,8 @@ from pathlib import Path
 from datetime import timedelta
 from decouple import config
 
+from config.database import database_settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = config('SECRET_KEY', default='dev-secret-change-in-production')
@@ -42,6 +44,33 @@ STRIPE_PRODUCT_NAME = config('STRIPE_PRODUCT_NAME', default='Acesso ao sistema -
 STRIPE_PIX_ENABLED = config('STRIPE_PIX_ENABLED', default=False, cast=bool)
 # PIX: tempo em segundos para o cliente pagar (10 a 1209600). Opcional; se não definir, Stripe usa 1 dia.
 STRIPE_PIX_EXPIRES_AFTER_SECONDS = config('STRIPE_PIX_EXPIRES_AFTER_SECONDS', default=None)
+# Webhooks (users.webhooks): gravados e processados pelo runworker em lotes; com o atraso (s) uma
+# rajada costuma cair na mesma tarefa
+STRIPE_WEBHOOK_BATCH_SIZE = config('STRIPE_WEBHOOK_BATCH_SIZE', default=100, cast=int)
+STRIPE_WEBHOOK_MAX_ATTEMPTS = config('STRIPE_WEBHOOK_MAX_ATTEMPTS', default=5, cast=int)
+STRIPE_WEBHOOK_DELAY = config('STRIPE_WEBHOOK_DELAY', default=1, cast=int)
+# Cliente compartilhado (users.stripe_client): timeouts (s), novas tentativas e pool de conexões.
+# STRIPE_API_BASE aponta para um substituto local da API (ex.: manage.py stripestub) em testes.
+STRIPE_API_BASE = config('STRIPE_API_BASE', default='')
+STRIPE_CONNECT_TIMEOUT = config('STRIPE_CONNECT_TIMEOUT', default=3, cast=float)
+STRIPE_READ_TIMEOUT = config('STRIPE_READ_TIMEOUT', default=10, cast=float)
+STRIPE_MAX_RETRIES = config('STRIPE_MAX_RETRIES', default=2, cast=int)
+STRIPE_POOL_SIZE = config('STRIPE_POOL_SIZE', default=10, cast=int)
+# Circuit breaker: abre com >= THRESHOLD de falhas nas últimas WINDOW chamadas (mín. MIN_CALLS)
+# e responde 503 na hora por COOLDOWN segundos
+STRIPE_BREAKER_WINDOW = config('STRIPE_BREAKER_WINDOW', default=20, cast=int)
+STRIPE_BREAKER_THRESHOLD = config('STRIPE_BREAKER_THRESHOLD', default=0.5, cast=float)
+STRIPE_BREAKER_MIN_CALLS = config('STRIPE_BREAKER_MIN_CALLS', default=5, cast=int)
+STRIPE_BREAKER_COOLDOWN = config('STRIPE_BREAKER_COOLDOWN', default=30, cast=int)
+# Reaproveita a sessão de checkout aberta com os mesmos parâmetros (users.checkout_cache) até
+# MARGIN segundos antes de ela expirar no Stripe
+STRIPE_CHECKOUT_REUSE = config('STRIPE_CHECKOUT_REUSE', default=True, cast=bool)
+STRIPE_CHECKOUT_REUSE_MARGIN = config('STRIPE_CHECKOUT_REUSE_MARGIN', default=600, cast=int)
+STRIPE_CHECKOUT_CACHE_ALIAS = 'default'
+# Conciliação (manage.py reconcilestripe): sessões por página (máx. 100) e quanto recuar (s)
+# da marca d'água da última execução (sessões pagas depois de criadas)
+STRIPE_RECONCILE_PAGE_SIZE = config('STRIPE_RECONCILE_PAGE_SIZE', default=100, cast=int)
+STRIPE_RECONCILE_OVERLAP = config('STRIPE_RECONCILE_OVERLAP', default=48 * 60 * 60, cast=int)
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -62,6 +91,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro: a latência medida inclui os demais middlewares
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -74,6 +105,7 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 TEMPLATES = [
     {
@@ -92,22 +124,29 @@ TEMPLATES = [
     },
 ]
 
-DATABASES = {
+# DATABASE_URL (ex.: Docker) ou POSTGRES_*; conexões persistentes/pool em config/database.py
+DATABASES = {'default': database_settings()}
+
+# Cache (locmem por padrão; com mais de um worker use um backend compartilhado, ex.:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache e CACHE_LOCATION=redis://...)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('POSTGRES_DB', default=os.environ.get('POSTGRES_DB', 'MYfitPersonal')),
-        'USER': config('POSTGRES_USER', default=os.environ.get('POSTGRES_USER', 'gym')),
-        'PASSWORD': config('POSTGRES_PASSWORD', default=os.environ.get('POSTGRES_PASSWORD', 'gym_secret')),
-        'HOST': config('DATABASE_HOST', default=os.environ.get('DATABASE_HOST', 'localhost')),
-        'PORT': config('DATABASE_PORT', default=os.environ.get('DATABASE_PORT', '5432')),
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='myfit-default'),
     }
 }
 
-# Parse DATABASE_URL if present (e.g. Docker)
-_db_url = os.environ.get('DATABASE_URL')
-if _db_url:
-    import dj_database_url
-    DATABASES['default'] = dj_database_url.parse(_db_url, conn_max_age=600)
+# Conjunto de profissionais visíveis por aluno (users.visibility)
+VISIBILITY_CACHE_ALIAS = 'default'
+VISIBILITY_CACHE_TIMEOUT = config('VISIBILITY_CACHE_TIMEOUT', default=300, cast=int)
+
+# Respostas de /api/videos/ e /api/categories/ em cache por versão de conteúdo (0 desativa)
+CONTENT_CACHE_ALIAS = 'default'
+CONTENT_CACHE_TIMEOUT = config('CONTENT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Busca de vídeos (videos.search): full-text no PostgreSQL; icontains nos demais bancos
+VIDEO_SEARCH_FULLTEXT = config('VIDEO_SEARCH_FULLTEXT', default=True, cast=bool)
+VIDEO_SEARCH_CONFIG = 'portuguese_unaccent'
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -134,7 +173,8 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT com role/assinatura nas claims: sem SELECT em users_user por requisição (users/authentication.py)
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -143,7 +183,8 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 12,
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        # JSONRenderer que registra o tempo de renderização (core/metrics.py)
+        'core.metrics.TimedJSONRenderer',
     ),
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
 }
@@ -154,7 +195,10 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=config('JWT_REFRESH_TOKEN_LIFETIME_DAYS', default=7, cast=int)),
     'ROTATE_REFRESH_TOKENS': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'users.authentication.ClaimsTokenRefreshSerializer',
 }
+# Por quanto tempo a versão das claims de cada usuário fica no cache (ver users/authentication.py)
+TOKEN_VERSION_CACHE_TIMEOUT = config('TOKEN_VERSION_CACHE_TIMEOUT', default=300, cast=int)
 
 _cors_raw = config('CORS_ALLOWED_ORIGINS', default='').strip()
 if _cors_raw:
@@ -167,6 +211,10 @@ if _frontend and _frontend not in CORS_ALLOWED_ORIGINS:
     CORS_ALLOWED_ORIGINS.append(_frontend)
 if DEBUG:
     CORS_ALLOW_ALL_ORIGINS = True
+# Cabeçalhos do upload resumível (tus) precisam atravessar o CORS
+from corsheaders.defaults import default_headers as _cors_default_headers
+CORS_ALLOW_HEADERS = (*_cors_default_headers, 'tus-resumable', 'upload-length', 'upload-offset', 'upload-metadata', 'upload-checksum')
+CORS_EXPOSE_HEADERS = ('Location', 'Tus-Resumable', 'Upload-Offset', 'Upload-Length', 'Upload-Video-Id')
 
 # S3 / Storage (USE_S3=True no Railway + variáveis AWS_* para vídeos persistirem)
 USE_S3 = config('USE_S3', default=False, cast=bool)
@@ -181,9 +229,87 @@ if USE_S3:
     _m = re.search(r'([a-z]{2}-[a-z]+-\d+)', _region, re.I)
     AWS_S3_REGION_NAME = _m.group(1).lower() if _m else _region
     AWS_S3_CUSTOM_DOMAIN = (config('AWS_S3_CUSTOM_DOMAIN', default='') or '').strip() or None
+    # Endpoint alternativo compatível com S3 (ex.: MinIO local); vazio = AWS
+    AWS_S3_ENDPOINT_URL = (config('AWS_S3_ENDPOINT_URL', default='') or '').strip() or None
     AWS_S3_OBJECT_PARAMETERS = {'CacheControl': 'max-age=86400'}
     # Bucket com "Object ownership: Bucket owner enforced" não aceita ACLs; use política do bucket para leitura pública
     AWS_DEFAULT_ACL = None
     DEFAULT_FILE_STORAGE = 'videos.storage.MediaStorage'
 else:
     DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
+
+# Upload direto para o S3 em partes (videos.uploads): tamanho de cada parte e validade das URLs assinadas
+VIDEO_UPLOAD_PART_SIZE = config('VIDEO_UPLOAD_PART_SIZE', default=16 * 1024 * 1024, cast=int)
+VIDEO_UPLOAD_URL_EXPIRES = config('VIDEO_UPLOAD_URL_EXPIRES', default=3600, cast=int)
+
+# Upload resumível (videos.resumable): arquivos parciais fora do MEDIA_ROOT, tamanho máximo e
+# idade (horas sem atividade) a partir da qual cleanup_uploads descarta uploads abandonados
+VIDEO_RESUMABLE_UPLOAD_DIR = config('VIDEO_RESUMABLE_UPLOAD_DIR', default=str(BASE_DIR / 'uploads_tmp'))
+VIDEO_RESUMABLE_MAX_SIZE = config('VIDEO_RESUMABLE_MAX_SIZE', default=5 * 1024 * 1024 * 1024, cast=int)
+VIDEO_UPLOAD_ABANDON_HOURS = config('VIDEO_UPLOAD_ABANDON_HOURS', default=24, cast=int)
+
+# Fila de tarefas em segundo plano (core.jobs): rode `python manage.py runworker` como serviço separado
+JOB_WORKER_PROCESSES = config('JOB_WORKER_PROCESSES', default=2, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=2.0, cast=float)
+JOB_STALE_TIMEOUT = config('JOB_STALE_TIMEOUT', default=600, cast=int)
+
+# Processamento de vídeo (videos.processing): HLS em vários bitrates + poster via ffmpeg
+VIDEO_PROCESSING_ENABLED = config('VIDEO_PROCESSING_ENABLED', default=True, cast=bool)
+FFMPEG_BINARY = config('FFMPEG_BINARY', default='ffmpeg')
+FFPROBE_BINARY = config('FFPROBE_BINARY', default='ffprobe')
+VIDEO_HLS_SEGMENT_SECONDS = 6
+VIDEO_HLS_RENDITIONS = (
+    {'height': 360, 'video_bitrate': '800k', 'audio_bitrate': '96k'},
+    {'height': 720, 'video_bitrate': '2800k', 'audio_bitrate': '128k'},
+    {'height': 1080, 'video_bitrate': '5000k', 'audio_bitrate': '160k'},
+)
+
+# Variantes do thumbnail (videos.thumbnails): larguras geradas em WebP e JPEG para srcset
+VIDEO_THUMBNAIL_WIDTHS = (320, 640, 1280)
+VIDEO_THUMBNAIL_QUALITY = config('VIDEO_THUMBNAIL_QUALITY', default=80, cast=int)
+
+# Streaming do arquivo de vídeo local (videos.streaming, /api/videos/<id>/stream/): com proxy na frente,
+# 'x-accel-redirect' (nginx, location interna em VIDEO_STREAM_ACCEL_PREFIX apontando para MEDIA_ROOT)
+# ou 'x-sendfile' (Apache/lighttpd) delega o envio ao proxy depois da checagem de acesso
+VIDEO_STREAM_OFFLOAD = config('VIDEO_STREAM_OFFLOAD', default='')
+VIDEO_STREAM_ACCEL_PREFIX = config('VIDEO_STREAM_ACCEL_PREFIX', default='/protected-media/')
+VIDEO_STREAM_MAX_AGE = 3600
+
+# URLs assinadas e com validade para os vídeos (videos.signing): HMAC no streaming local, pré-assinadas
+# do S3 ou do CloudFront (com par de chaves configurado; requer o pacote cryptography). Válidas de TTL a 2×TTL
+VIDEO_SIGNED_URLS = config('VIDEO_SIGNED_URLS', default=True, cast=bool)
+VIDEO_SIGNED_URL_TTL = config('VIDEO_SIGNED_URL_TTL', default=3600, cast=int)
+VIDEO_CLOUDFRONT_KEY_ID = config('VIDEO_CLOUDFRONT_KEY_ID', default='')
+VIDEO_CLOUDFRONT_PRIVATE_KEY = config('VIDEO_CLOUDFRONT_PRIVATE_KEY', default='')
+
+# Categorias (videos.categories): novas tentativas quando o slug é criado ao mesmo tempo por outra
+# requisição e limites da importação de árvore (categories/import/)
+CATEGORY_SLUG_RETRIES = config('CATEGORY_SLUG_RETRIES', default=3, cast=int)
+CATEGORY_IMPORT_MAX_NODES = config('CATEGORY_IMPORT_MAX_NODES', default=500, cast=int)
+CATEGORY_IMPORT_MAX_DEPTH = config('CATEGORY_IMPORT_MAX_DEPTH', default=6, cast=int)
+
+# Operações em lote nos vídeos (videos.bulk): máximo de vídeos por requisição
+VIDEO_BULK_MAX_IDS = config('VIDEO_BULK_MAX_IDS', default=1000, cast=int)
+
+# Vínculo de alunos em lote (users.enrollment): e-mails processados por bloco
+STUDENT_BULK_CHUNK_SIZE = config('STUDENT_BULK_CHUNK_SIZE', default=1000, cast=int)
+# Linhas por busca no banco na exportação da lista de alunos (students/export/)
+STUDENT_EXPORT_CHUNK_SIZE = config('STUDENT_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Métricas por view (core.metrics, /api/metrics/ para admin) e orçamento de queries por endpoint
+# (nome da rota -> máximo de queries, contando caches frios). Acima do orçamento: 'warn' loga um aviso, 'raise' falha a
+# requisição (use em testes/CI)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='warn')
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGETS = {
+    'video-list': 5,
+    'video-my-list': 4,
+    'video-watch': 4,
+    'category-list-create': 3,
+    'category-detail': 3,
+    'me': 2,
+    'login': 4,
+    'student-list-create': 5,
+    'video-bulk': 10,
+}
@@ -4,6 +4,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import MetricsView
 from users import stripe_views as user_stripe_views
 
 
@@ -17,6 +18,7 @@ urlpatterns = [
     path('api/auth/', include('users.urls')),
     path('api/', include('videos.urls')),
     path('api/webhooks/stripe/', user_stripe_views.stripe_webhook),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
 
 if settings.MEDIA_ROOT:
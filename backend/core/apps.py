@@ -5,3 +5,9 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .metrics import install_query_wrapper
+        connection_created.connect(install_query_wrapper, dispatch_uid='core.metrics.install_query_wrapper')
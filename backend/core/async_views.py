@@ -0,0 +1,88 @@
+"""
+Base para views DRF assíncronas (servidas por uvicorn no modo ASGI).
+
+O DRF só despacha handlers síncronos. AsyncAPIViewMixin troca o dispatch por uma
+versão async: autenticação, permissões e throttling (que podem tocar o banco ou
+o cache) rodam numa thread via sync_to_async; o handler async usa o ORM
+assíncrono e libera o event loop enquanto espera o banco. Sob WSGI as mesmas
+views continuam funcionando (o Django executa a view async com async_to_sync).
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from rest_framework.response import Response
+
+from .metrics import timer
+
+
+def run_in_threadpool(func, *args, **kwargs):
+    """
+    Executa `func` no pool de threads (fora da thread das queries da requisição).
+    Para trabalho sem banco que pode bloquear: geração de URLs do storage/assinaturas
+    (boto3, cache remoto) durante a serialização.
+    """
+    return sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+
+
+class AsyncAPIViewMixin:
+    """Use antes de APIView/GenericAPIView; todos os handlers (get, post, ...) devem ser async."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def _serialize(self, serializer):
+        with timer('serialization'):
+            return serializer.data
+
+    async def aget_queryset(self):
+        """get_queryset + filtros numa thread (podem consultar banco/cache, ex.: visibilidade do aluno)."""
+        return await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+
+    async def aget_object(self):
+        queryset = await self.aget_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = await queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).afirst()
+        if obj is None:
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+
+class AsyncListModelMixin:
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.aget_queryset()
+        if self.paginator is None:
+            objects = [obj async for obj in queryset]
+        else:
+            objects = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(objects, many=True)
+        # Thread da requisição (thread_sensitive): serializers de listagem podem consultar o banco
+        data = await sync_to_async(self._serialize)(serializer)
+        if self.paginator is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class AsyncRetrieveModelMixin:
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(await run_in_threadpool(self._serialize, serializer))
@@ -0,0 +1,123 @@
+"""
+Benchmark helpers for API endpoints: latency percentiles and SQL query counts
+measured through Django's test client.
+"""
+import math
+import statistics
+import time
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.authentication import set_user_claims
+
+
+def auth_headers(user):
+    """
+    Authorization header with a JWT access token for `user`, carrying the same claims
+    as a login token so requests take the claims-only authentication path.
+    """
+    token = set_user_claims(RefreshToken.for_user(user), user).access_token
+    return {'Authorization': f'Bearer {token}'}
+
+
+def auth_client(user):
+    """Test client authenticated as `user` (see auth_headers)."""
+    return Client(headers=auth_headers(user))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(client, path, method='get', iterations=50, before_each=None, **request_kwargs):
+    """
+    Run `iterations` requests against `path` and return latency/query stats.
+    `before_each` (optional) is called before every request, e.g. to clear a cache.
+    """
+    timings = []
+    queries = []
+    status_code = None
+    for _ in range(iterations):
+        if before_each:
+            before_each()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = getattr(client, method)(path, **request_kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(ctx.captured_queries))
+        status_code = response.status_code
+    return {
+        'path': path,
+        'method': method.upper(),
+        'status': status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': max(queries),
+    }
+
+
+def measure_callable(func, iterations=50):
+    """Latency/query stats for calling `func()` directly (e.g. a serializer), without HTTP."""
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(ctx.captured_queries))
+    return {
+        'path': getattr(func, '__name__', 'callable'),
+        'method': 'CALL',
+        'status': '-',
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': max(queries),
+    }
+
+
+def format_result(name, result):
+    return (
+        f"{name:<48} {result['status']:>4}  p50={result['p50_ms']:>9.3f}ms  "
+        f"p95={result['p95_ms']:>9.3f}ms  p99={result.get('p99_ms', 0):>9.3f}ms  queries={result['queries']}"
+    )
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_delta_ms=1.0):
+    """
+    Compare `results` ({label: stats}) with a stored baseline of the same shape.
+    Returns a list of (label, message, is_regression): more queries than the baseline,
+    or p95 above baseline * (1 + tolerance) and more than `min_delta_ms` slower (run-to-run
+    jitter on millisecond-scale endpoints exceeds any relative tolerance), is a regression.
+    """
+    report = []
+    for label, result in results.items():
+        base = baseline.get(label)
+        if base is None:
+            report.append((label, 'sem baseline', False))
+            continue
+        query_delta = result['queries'] - base['queries']
+        ratio = result['p95_ms'] / base['p95_ms'] if base['p95_ms'] else 1.0
+        slower = ratio > 1 + tolerance and result['p95_ms'] - base['p95_ms'] > min_delta_ms
+        regression = query_delta > 0 or slower
+        report.append((
+            label,
+            f"p95 {base['p95_ms']:.3f} -> {result['p95_ms']:.3f}ms ({(ratio - 1) * 100:+.0f}%), "
+            f"queries {base['queries']} -> {result['queries']}",
+            regression,
+        ))
+    return report
@@ -0,0 +1,156 @@
+"""
+Geração de dados sintéticos em volume (bulk_create) para reproduzir a escala de produção:
+profissionais com árvores de categorias, bibliotecas de vídeos e alunos vinculados.
+
+Usado pelo comando `gendata` (dados persistentes) e pelo cenário `hot-paths` do `benchapi`
+(dentro de uma transação desfeita). Os objetos são criados em lotes de profissionais para
+manter a memória limitada; bulk_create não dispara signals, mas como todos os IDs são
+novos não há cache de visibilidade/conteúdo a invalidar.
+"""
+import random
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.text import slugify
+
+from users.models import ProfessionalProfile, ProfessionalStudent, User
+from videos.models import Category, Video
+
+CATEGORY_NAMES = (
+    'Musculação', 'Cardio', 'Mobilidade', 'Funcional', 'Alongamento', 'HIIT', 'Pilates',
+    'Core', 'Pernas', 'Glúteos', 'Costas', 'Peito', 'Ombros', 'Braços', 'Corrida', 'Yoga',
+)
+EXERCISES = (
+    'Agachamento', 'Levantamento terra', 'Supino', 'Remada', 'Desenvolvimento', 'Prancha',
+    'Afundo', 'Burpee', 'Puxada', 'Elevação pélvica', 'Rosca direta', 'Tríceps corda',
+    'Abdominal', 'Polichinelo', 'Stiff', 'Passada', 'Flexão', 'Mountain climber',
+)
+LEVELS = ('iniciante', 'intermediário', 'avançado')
+FIRST_NAMES = ('Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João')
+LAST_NAMES = ('Silva', 'Souza', 'Oliveira', 'Santos', 'Lima', 'Pereira', 'Costa', 'Almeida', 'Ferreira', 'Rocha')
+
+
+@dataclass
+class GeneratedData:
+    professional_ids: list = field(default_factory=list)
+    student_ids: list = field(default_factory=list)
+    categories: int = 0
+    videos: int = 0
+    links: int = 0
+
+
+def _users(rng, prefix, start, count, role, password, **extra):
+    return [
+        User(
+            email=f'{prefix}-{role}-{i}@bench.local',
+            username=f'{prefix}-{role}-{i}',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            role=role,
+            password=password,
+            **extra,
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def _category_trees(rng, profiles, depth, fanout, batch_size):
+    """
+    Árvores de `depth` níveis com `fanout` filhos por nó, criadas nível a nível. O path
+    materializado (Category.save) é calculado aqui, já que bulk_create não chama save().
+    Devolve {professional_id: [categorias]}.
+    """
+    by_professional = {profile.pk: [] for profile in profiles}
+    parents = [(profile.pk, None) for profile in profiles]
+    for level in range(depth):
+        objs = []
+        for professional_id, parent in parents:
+            names = rng.sample(CATEGORY_NAMES if level == 0 else EXERCISES, fanout)
+            for i, name in enumerate(names):
+                label = name if level == 0 else f'{name} {rng.choice(LEVELS)}'
+                objs.append(Category(
+                    name=label,
+                    slug=f'{slugify(label)}-{i}',
+                    description=f'{label} — treinos de nível {rng.choice(LEVELS)}',
+                    parent=parent,
+                    professional_id=professional_id,
+                ))
+        Category.objects.bulk_create(objs, batch_size=batch_size)
+        for obj in objs:
+            obj.path = f'{obj.parent.path if obj.parent else "/"}{obj.pk}/'
+            by_professional[obj.professional_id].append(obj)
+        Category.objects.bulk_update(objs, ['path'], batch_size=batch_size)
+        parents = [(obj.professional_id, obj) for obj in objs]
+    return by_professional
+
+
+def _videos(rng, categories_by_professional, per_professional, batch_size):
+    videos = [
+        Video(
+            title=f'{rng.choice(EXERCISES)} {rng.choice(LEVELS)} #{n}',
+            description=f'Execução, respiração e erros comuns. Série {rng.randint(1, 5)}x{rng.randint(6, 20)}.',
+            video_url=f'https://videos.bench.local/{professional_id}/{n}.mp4',
+            professional_id=professional_id,
+        )
+        for professional_id in categories_by_professional
+        for n in range(per_professional)
+    ]
+    Video.objects.bulk_create(videos, batch_size=batch_size)
+    Through = Video.categories.through
+    links = []
+    for video in videos:
+        categories = categories_by_professional[video.professional_id]
+        if categories:
+            for category in rng.sample(categories, min(len(categories), rng.randint(1, 3))):
+                links.append(Through(video_id=video.pk, category_id=category.pk))
+    Through.objects.bulk_create(links, batch_size=batch_size)
+    return len(videos)
+
+
+def generate(
+    professionals=2000, students=20000, videos_per_professional=100, category_depth=3, category_fanout=3,
+    links_per_student=3, prefix='gen', password='senha123', seed=42, batch_size=2000, chunk=100, log=None,
+):
+    """
+    Cria os dados e devolve um GeneratedData. `chunk` profissionais (com categorias e vídeos)
+    por transação; alunos e vínculos em seguida. Todos os usuários têm a senha `password`.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    password_hash = make_password(password)
+    result = GeneratedData()
+    for start in range(0, professionals, chunk):
+        count = min(chunk, professionals - start)
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                _users(rng, prefix, start, count, User.Role.PROFESSIONAL, password_hash,
+                       subscription_status=User.SubscriptionStatus.ACTIVE),
+                batch_size=batch_size,
+            )
+            profiles = ProfessionalProfile.objects.bulk_create([
+                ProfessionalProfile(user=u, full_name=f'{u.first_name} {u.last_name}', bio='Personal trainer')
+                for u in users
+            ], batch_size=batch_size)
+            trees = _category_trees(rng, profiles, category_depth, category_fanout, batch_size)
+            result.categories += sum(len(c) for c in trees.values())
+            result.videos += _videos(rng, trees, videos_per_professional, batch_size)
+        result.professional_ids.extend(u.pk for u in users)
+        log(f'{start + count}/{professionals} profissionais, {result.videos} vídeos')
+
+    for start in range(0, students, chunk * 10):
+        count = min(chunk * 10, students - start)
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                _users(rng, prefix, start, count, User.Role.USER, password_hash), batch_size=batch_size,
+            )
+            links = [
+                ProfessionalStudent(professional_id=professional_id, student_id=u.pk)
+                for u in users
+                for professional_id in rng.sample(result.professional_ids, min(links_per_student, len(result.professional_ids)))
+            ]
+            ProfessionalStudent.objects.bulk_create(links, batch_size=batch_size)
+        result.student_ids.extend(u.pk for u in users)
+        result.links += len(links)
+        log(f'{start + count}/{students} alunos, {result.links} vínculos')
+    return result
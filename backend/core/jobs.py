@@ -0,0 +1,107 @@
+"""
+Fila de tarefas em segundo plano usando o próprio banco como broker.
+
+Cada app registra handlers em um módulo `jobs.py` com o decorator @job('nome');
+`enqueue` grava a tarefa na mesma transação da alteração que a originou e o
+comando `runworker` (processo separado dos workers web) executa as tarefas num
+pool de processos, com novas tentativas e backoff exponencial.
+"""
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+# Tarefa em execução neste processo (last_attempt)
+_current = threading.local()
+
+
+def job(name):
+    """Registra a função como handler da tarefa `name` (recebe o payload como kwargs)."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def autodiscover():
+    autodiscover_modules('jobs')
+
+
+def enqueue(name, *, delay=None, max_attempts=3, **payload):
+    run_after = timezone.now() + delay if delay else timezone.now()
+    return Job.objects.create(name=name, payload=payload, max_attempts=max_attempts, run_after=run_after)
+
+
+def last_attempt():
+    """Dentro de um handler: True se uma falha agora não terá nova tentativa (fora do worker, sempre)."""
+    job_obj = getattr(_current, 'job', None)
+    return job_obj is None or job_obj.attempts >= job_obj.max_attempts
+
+
+def claim(limit):
+    """Reserva até `limit` tarefas prontas (SKIP LOCKED: vários workers não pegam a mesma)."""
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if ids:
+            Job.objects.filter(pk__in=ids).update(status=Job.Status.RUNNING, updated_at=now)
+    return ids
+
+
+def requeue_stale(timeout):
+    """Tarefas 'running' sem atualização há mais de `timeout` (worker morreu) voltam para a fila."""
+    cutoff = timezone.now() - timeout
+    return Job.objects.filter(status=Job.Status.RUNNING, updated_at__lt=cutoff).update(status=Job.Status.QUEUED)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 3600))
+
+
+def execute(job_id):
+    """Executa uma tarefa já reservada. Roda dentro do processo do pool."""
+    close_old_connections()
+    job_obj = Job.objects.filter(pk=job_id).first()
+    if job_obj is None:
+        return None
+    job_obj.attempts += 1
+    handler = _registry.get(job_obj.name)
+    _current.job = job_obj
+    try:
+        if handler is None:
+            raise LookupError(f'Tarefa não registrada: {job_obj.name}')
+        handler(**job_obj.payload)
+    except Exception:  # noqa: BLE001 — qualquer falha do handler vira nova tentativa ou 'failed'
+        job_obj.last_error = traceback.format_exc()[-4000:]
+        if job_obj.attempts < job_obj.max_attempts:
+            job_obj.status = Job.Status.QUEUED
+            job_obj.run_after = timezone.now() + retry_delay(job_obj.attempts)
+        else:
+            job_obj.status = Job.Status.FAILED
+            job_obj.finished_at = timezone.now()
+        logger.exception('Tarefa %s #%s falhou (tentativa %s)', job_obj.name, job_obj.pk, job_obj.attempts)
+    else:
+        job_obj.status = Job.Status.DONE
+        job_obj.last_error = ''
+        job_obj.finished_at = timezone.now()
+    finally:
+        _current.job = None
+    job_obj.save(update_fields=['attempts', 'status', 'run_after', 'last_error', 'finished_at', 'updated_at'])
+    close_old_connections()
+    return job_obj.status
@@ -0,0 +1,269 @@
+"""
+Benchmark dos endpoints da API (latência p50/p95/p99 e número de queries).
+Os dados sintéticos são criados dentro de uma transação desfeita ao final.
+
+Uso: python manage.py benchapi --scenario student-visibility --professionals 200
+     python manage.py benchapi --scenario hot-paths --baseline benchmarks/baseline.json
+     python manage.py benchapi --scenario hot-paths --existing gen   # dados do `gendata`
+
+--save-baseline grava os resultados; --baseline compara (mais queries ou p95 acima da
+tolerância e mais de --min-delta-ms mais lento é regressão; --fail-on-regression encerra
+com erro, para CI).
+"""
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core import datagen
+from core.benchmark import auth_client, compare_to_baseline, format_result, measure, measure_callable
+from core.pagination import OptionalCursorPagination
+from users import stripe_fixtures
+from users.models import ProfessionalProfile, ProfessionalStudent, User
+from users.visibility import invalidate_student_visibility
+from videos.models import Category, Video
+from videos.serializers import VideoListSerializer, VideoListValuesSerializer
+from videos.views import _with_categories
+
+
+def _create_professionals(count, prefix='bench-pro'):
+    users = User.objects.bulk_create([
+        User(email=f'{prefix}-{i}@bench.local', username=f'{prefix}-{i}', role=User.Role.PROFESSIONAL)
+        for i in range(count)
+    ])
+    profiles = ProfessionalProfile.objects.bulk_create([
+        ProfessionalProfile(user=u, full_name=f'Profissional {i}') for i, u in enumerate(users)
+    ])
+    return users, profiles
+
+
+def scenario_student_visibility(command, options):
+    """Aluno vinculado a muitos profissionais: listagem, detalhe e categorias (cache frio x quente)."""
+    count = options['professionals']
+    pro_users, profiles = _create_professionals(count)
+    Category.objects.bulk_create([
+        Category(name=f'Categoria {p.pk}', slug=f'categoria-{p.pk}', professional=p) for p in profiles
+    ])
+    videos = Video.objects.bulk_create([
+        Video(title=f'Vídeo {p.pk}', video_url='https://example.com/v.mp4', professional=p) for p in profiles
+    ])
+    student = User.objects.create(email='bench-student@bench.local', username='bench-student', role=User.Role.USER)
+    ProfessionalStudent.objects.bulk_create([
+        ProfessionalStudent(professional=u, student=student) for u in pro_users
+    ])
+    client = auth_client(student)
+    cold = lambda: invalidate_student_visibility(student.pk)  # noqa: E731
+    paths = [
+        ('videos', '/api/videos/'),
+        ('video detail', f'/api/videos/{videos[-1].pk}/'),
+        ('categories', '/api/categories/'),
+    ]
+    results = {}
+    for label, path in paths:
+        results[f'{label} (cache frio)'] = measure(client, path, iterations=options['iterations'], before_each=cold)
+        results[f'{label} (cache quente)'] = measure(client, path, iterations=options['iterations'])
+    return results
+
+
+def scenario_video_pagination(command, options):
+    """Biblioteca grande de um profissional: página profunda (OFFSET + COUNT) x cursor."""
+    total = options['videos']
+    pro_users, profiles = _create_professionals(1, prefix='bench-lib')
+    pro = pro_users[0]
+    pro.subscription_status = User.SubscriptionStatus.ACTIVE
+    pro.save(update_fields=['subscription_status'])
+    Video.objects.bulk_create(
+        [Video(title=f'Vídeo {i}', video_url='https://example.com/v.mp4', professional=profiles[0]) for i in range(total)],
+        batch_size=1000,
+    )
+    client = auth_client(pro)
+    page_size = 12
+    last_page = max(1, -(-total // page_size))
+    # Cursor apontando para a mesma região da última página
+    anchor = Video.objects.filter(professional=profiles[0]).order_by('-created_at', '-id')[max(0, total - page_size - 1)]
+    cursor = OptionalCursorPagination().encode_cursor(anchor, reverse=False)
+    iterations = options['iterations']
+    return {
+        'videos/me página 1': measure(client, '/api/videos/me/', iterations=iterations),
+        f'videos/me página {last_page}': measure(client, f'/api/videos/me/?page={last_page}', iterations=iterations),
+        'videos/me cursor inicial': measure(client, '/api/videos/me/?cursor=', iterations=iterations),
+        'videos/me cursor profundo': measure(client, f'/api/videos/me/?cursor={cursor}', iterations=iterations),
+    }
+
+
+def scenario_list_serialization(command, options):
+    """VideoListSerializer (instâncias + prefetch) x VideoListValuesSerializer (.values()) em 12/100/1000 linhas."""
+    pro_users, profiles = _create_professionals(1, prefix='bench-ser')
+    profile = profiles[0]
+    roots = Category.objects.bulk_create([
+        Category(name=f'Grupo {i}', slug=f'grupo-{i}', professional=profile) for i in range(5)
+    ])
+    children = Category.objects.bulk_create([
+        Category(name=f'Exercício {i}', slug=f'exercicio-{i}', parent=roots[i % 5], professional=profile) for i in range(20)
+    ])
+    videos = Video.objects.bulk_create(
+        [Video(title=f'Vídeo {i}', video_url='https://example.com/v.mp4', professional=profile) for i in range(1000)],
+        batch_size=500,
+    )
+    Through = Video.categories.through
+    Through.objects.bulk_create(
+        [Through(video_id=v.pk, category_id=c.pk) for i, v in enumerate(videos) for c in (roots[i % 5], children[i % 20])],
+        batch_size=1000,
+    )
+    request = Request(APIRequestFactory().get('/api/videos/', HTTP_HOST='bench.local'))
+    request.user = pro_users[0]
+    context = {'request': request}
+    queryset = Video.objects.filter(professional=profile)
+    results = {}
+    for rows in (12, 100, 1000):
+        def before():
+            return VideoListSerializer(list(_with_categories(queryset)[:rows]), many=True, context=context).data
+
+        def after():
+            return VideoListValuesSerializer(
+                list(VideoListValuesSerializer.rows(queryset)[:rows]), many=True, context=context,
+            ).data
+
+        if before() != after():
+            command.stderr.write(f'Saídas diferentes com {rows} linhas')
+        results[f'{rows} linhas: VideoListSerializer'] = measure_callable(before, iterations=options['iterations'])
+        results[f'{rows} linhas: .values()'] = measure_callable(after, iterations=options['iterations'])
+    return results
+
+
+def scenario_hot_paths(command, options):
+    """
+    Caminhos mais usados com dados em volume (core.datagen, ou os do `gendata` com --existing):
+    listagem/detalhe de vídeos e árvore de categorias do aluno, árvore e alunos do profissional,
+    login e webhook do Stripe.
+    """
+    prefix = options['existing']
+    if not prefix:
+        prefix = 'bench-hot'
+        professionals = options['professionals']
+        datagen.generate(
+            professionals=professionals,
+            students=options['students'],
+            videos_per_professional=max(1, options['videos'] // professionals),
+            prefix=prefix,
+            password=options['password'],
+        )
+    student = (
+        User.objects.filter(email__startswith=f'{prefix}-user-', linked_professionals__isnull=False)
+        .order_by('pk').first()
+    )
+    pro = (
+        User.objects.filter(email__startswith=f'{prefix}-professional-')
+        .annotate(students=Count('linked_students')).order_by('-students', 'pk').first()
+    )
+    if student is None or pro is None:
+        raise CommandError(f'Sem dados com o prefixo "{prefix}" (rode o gendata ou omita --existing).')
+    video = Video.objects.filter(professional_id__in=student.linked_professionals.values('professional_id')).first()
+
+    iterations = options['iterations']
+    student_client = auth_client(student)
+    pro_client = auth_client(pro)
+    results = {}
+    for label, client, path in (
+        ('videos (aluno)', student_client, '/api/videos/'),
+        ('video detail (aluno)', student_client, f'/api/videos/{video.pk}/'),
+        ('categories?tree=1 (aluno)', student_client, '/api/categories/?tree=1'),
+        ('categories?tree=1 (profissional)', pro_client, '/api/categories/?tree=1'),
+        ('students (profissional)', pro_client, '/api/auth/students/'),
+    ):
+        results[f'{label} cache frio'] = measure(client, path, iterations=iterations, before_each=cache.clear)
+        results[f'{label} cache quente'] = measure(client, path, iterations=iterations)
+
+    results['login'] = measure(
+        Client(), '/api/auth/login/', method='post', iterations=iterations,
+        data={'email': student.email, 'password': options['password']}, content_type='application/json',
+    )
+
+    secret = 'whsec_bench'
+    # Mesmo evento repetido: a primeira requisição grava, as demais são reenvios (dedupe por ID)
+    payload = json.dumps(stripe_fixtures.event(
+        'checkout_session_completed', event_id='evt_bench', customer='cus_bench', metadata={'user_id': str(pro.pk)},
+    ))
+    with override_settings(STRIPE_WEBHOOK_SECRET=secret):
+        results['stripe_webhook'] = measure(
+            Client(), '/api/webhooks/stripe/', method='post', iterations=iterations,
+            data=payload, content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=stripe_fixtures.signature(payload, secret),
+        )
+    return results
+
+
+SCENARIOS = {
+    'hot-paths': scenario_hot_paths,
+    'list-serialization': scenario_list_serialization,
+    'student-visibility': scenario_student_visibility,
+    'video-pagination': scenario_video_pagination,
+}
+
+
+class Command(BaseCommand):
+    help = 'Mede latência (p50/p95) e número de queries dos principais endpoints da API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--professionals', type=int, default=200)
+        parser.add_argument('--videos', type=int, default=20000)
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--password', default='senha123', help='Senha dos usuários gerados (login)')
+        parser.add_argument('--existing', metavar='PREFIX', help='hot-paths: usa os dados do gendata com esse prefixo')
+        parser.add_argument('--baseline', help='JSON de uma execução anterior para comparar')
+        parser.add_argument('--save-baseline', help='Grava os resultados neste JSON')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Aumento de p95 tolerado (0.25 = 25%%)')
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=1.0, help='Aumento de p95 (ms) abaixo do qual não é regressão',
+        )
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        names = options['scenario'] or sorted(SCENARIOS)
+        all_results = {}
+        with override_settings(ALLOWED_HOSTS=['*'], DEBUG=False):
+            for name in names:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                with transaction.atomic():
+                    results = SCENARIOS[name](self, options)
+                    transaction.set_rollback(True)
+                for label, result in results.items():
+                    self.stdout.write(format_result(label, result))
+                    all_results[f'{name}: {label}'] = result
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as fh:
+                json.dump({
+                    'database': connection.vendor,
+                    'iterations': options['iterations'],
+                    'results': all_results,
+                }, fh, indent=2, ensure_ascii=False)
+                fh.write('\n')
+            self.stdout.write(f'Baseline gravado em {options["save_baseline"]}')
+        if options['baseline']:
+            self._compare(all_results, options)
+
+    def _compare(self, results, options):
+        with open(options['baseline']) as fh:
+            baseline = json.load(fh)
+        if baseline.get('database') != connection.vendor:
+            self.stdout.write(self.style.WARNING(
+                f'Baseline medido em {baseline.get("database")}, execução atual em {connection.vendor}.'
+            ))
+        self.stdout.write(self.style.MIGRATE_HEADING('comparação com o baseline'))
+        regressions = 0
+        comparison = compare_to_baseline(results, baseline['results'], options['tolerance'], options['min_delta_ms'])
+        for label, message, regression in comparison:
+            style = self.style.ERROR if regression else self.style.SUCCESS
+            self.stdout.write(style(f'{label:<60} {message}'))
+            regressions += regression
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{regressions} regressão(ões) em relação ao baseline.')
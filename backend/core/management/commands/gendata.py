@@ -0,0 +1,56 @@
+"""
+Gera dados sintéticos em volume (core.datagen) no banco configurado: milhares de
+profissionais com árvores de categorias, centenas de milhares de vídeos e vínculos
+de alunos. Use num banco de desenvolvimento/benchmark, nunca em produção.
+
+Uso: python manage.py gendata --professionals 2000 --students 20000 --videos-per-professional 100
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core import datagen
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Gera profissionais, categorias, vídeos e alunos sintéticos em volume (bulk_create).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--professionals', type=int, default=2000)
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--videos-per-professional', type=int, default=100)
+        parser.add_argument('--category-depth', type=int, default=3)
+        parser.add_argument('--category-fanout', type=int, default=3)
+        parser.add_argument('--links-per-student', type=int, default=3)
+        parser.add_argument('--prefix', default='gen', help='Prefixo dos e-mails (<prefix>-<perfil>-<n>@bench.local)')
+        parser.add_argument('--password', default='senha123')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(Q(email__startswith=f'{prefix}-professional-') | Q(email__startswith=f'{prefix}-user-')).exists():
+            raise CommandError(f'Já existem usuários com o prefixo "{prefix}"; use outro --prefix.')
+        max_fanout = min(len(datagen.CATEGORY_NAMES), len(datagen.EXERCISES))
+        if options['category_fanout'] > max_fanout:
+            raise CommandError(f'--category-fanout máximo: {max_fanout}')
+        started = time.perf_counter()
+        result = datagen.generate(
+            professionals=options['professionals'],
+            students=options['students'],
+            videos_per_professional=options['videos_per_professional'],
+            category_depth=options['category_depth'],
+            category_fanout=options['category_fanout'],
+            links_per_student=options['links_per_student'],
+            prefix=prefix,
+            password=options['password'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(result.professional_ids)} profissionais, {result.categories} categorias, {result.videos} vídeos, '
+            f'{len(result.student_ids)} alunos, {result.links} vínculos em {time.perf_counter() - started:.1f}s'
+        ))
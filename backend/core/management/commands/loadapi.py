@@ -0,0 +1,142 @@
+"""
+Teste de carga contra um servidor em execução (WSGI ou ASGI): N conexões HTTP/1.1
+keep-alive simultâneas por `--duration` segundos, para cada nível de concorrência.
+Compara quantas conexões cada worker sustenta antes da latência degradar.
+
+Uso:
+  SERVER_MODE=asgi WEB_CONCURRENCY=2 ./entrypoint.sh
+  python manage.py loadapi --url http://127.0.0.1:8000 --email aluno@exemplo.com \\
+      --path /api/videos/ --path /api/categories/ --concurrency 10 --concurrency 100 --workers 2
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import percentile
+
+DEFAULT_PATHS = ['/api/videos/', '/api/categories/', '/api/auth/me/']
+
+
+async def _read_response(reader):
+    """Lê uma resposta HTTP/1.1 (Content-Length ou chunked); devolve o status."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('conexão fechada pelo servidor')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+async def _connection(host, port, requests, deadline, timings, errors, index):
+    reader = writer = None
+    i = index
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            await writer.drain()
+            status, close = await _read_response(reader)
+            timings.append((time.perf_counter() - start) * 1000)
+            if status >= 400:
+                errors[status] = errors.get(status, 0) + 1
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+        i += 1
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, paths, concurrency, duration, token=None):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    auth = f'Authorization: Bearer {token}\r\n' if token else ''
+    requests = [
+        (f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n{auth}'
+         'Accept: application/json\r\nConnection: keep-alive\r\n\r\n').encode()
+        for path in paths
+    ]
+    timings, errors = [], {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _connection(host, port, requests, deadline, timings, errors, i) for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': len(timings),
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'errors': errors,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Teste de carga (conexões simultâneas keep-alive) contra um servidor da API em execução.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--path', action='append', help=f'Padrão: {", ".join(DEFAULT_PATHS)}')
+        parser.add_argument('--concurrency', type=int, action='append', help='Padrão: 10, 50, 200')
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--workers', type=int, default=1, help='Workers do servidor (para conexões/worker)')
+        parser.add_argument('--email', help='Usuário autenticado (token gerado com as claims atuais)')
+        parser.add_argument('--token', help='Access token JWT já emitido')
+        parser.add_argument('--json', dest='json_path', help='Grava os resultados neste arquivo')
+
+    def handle(self, *args, **options):
+        if urlsplit(options['url']).scheme != 'http':
+            raise CommandError('Apenas http:// (rode contra o servidor de aplicação, sem TLS).')
+        token = options['token']
+        if options['email']:
+            from users.models import User
+            from users.views import get_tokens_for_user
+
+            user = User.objects.filter(email__iexact=options['email']).first()
+            if user is None:
+                raise CommandError(f'Usuário {options["email"]} não encontrado.')
+            token = get_tokens_for_user(user)['access']
+        paths = options['path'] or DEFAULT_PATHS
+        workers = max(options['workers'], 1)
+        results = []
+        for concurrency in options['concurrency'] or [10, 50, 200]:
+            result = asyncio.run(run_load(options['url'], paths, concurrency, options['duration'], token))
+            result['per_worker'] = round(concurrency / workers, 1)
+            results.append(result)
+            errors = sum(result['errors'].values())
+            self.stdout.write(
+                f"conexões={concurrency:<5} ({result['per_worker']}/worker)  req/s={result['rps']:>8}  "
+                f"p50={result['p50_ms']:>8.2f}ms  p95={result['p95_ms']:>8.2f}ms  "
+                f"p99={result['p99_ms']:>8.2f}ms  erros={errors}"
+            )
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump({'url': options['url'], 'paths': paths, 'workers': workers, 'results': results}, fh, indent=2)
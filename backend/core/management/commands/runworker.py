@@ -0,0 +1,61 @@
+"""
+Worker da fila de tarefas (core.jobs). Roda como processo/serviço separado dos
+workers web (gunicorn), com um pool próprio de processos para as tarefas pesadas
+(ex.: transcodificação de vídeo), para não afetar a latência da API.
+
+Uso: python manage.py runworker [--processes 2] [--once]
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from core import jobs, worker
+from core.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano da fila no banco (core.Job).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=getattr(settings, 'JOB_WORKER_PROCESSES', 2))
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'JOB_POLL_INTERVAL', 2.0))
+        parser.add_argument('--once', action='store_true', help='Processa as tarefas prontas e sai.')
+
+    def handle(self, *args, **options):
+        jobs.autodiscover()
+        processes = max(1, options['processes'])
+        stale_timeout = timedelta(seconds=getattr(settings, 'JOB_STALE_TIMEOUT', 600))
+        # Conexões não podem ser herdadas pelos processos filhos
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        in_flight = {}
+        self.stdout.write(f'Worker iniciado com {processes} processo(s).')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=worker.setup) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    for future in [f for f in in_flight if f.done()]:
+                        job_id = in_flight.pop(future)
+                        try:
+                            self.stdout.write(f'Tarefa #{job_id}: {future.result()}')
+                        except Exception as exc:  # noqa: BLE001 — processo do pool morreu; requeue_stale recupera
+                            self.stderr.write(f'Tarefa #{job_id}: erro no processo ({exc})')
+                    if in_flight:
+                        # Heartbeat: tarefas longas em execução não são consideradas abandonadas
+                        Job.objects.filter(pk__in=in_flight.values()).update(updated_at=timezone.now())
+                    jobs.requeue_stale(stale_timeout)
+                    claimed = jobs.claim(processes - len(in_flight))
+                    for job_id in claimed:
+                        in_flight[pool.submit(worker.run, job_id)] = job_id
+                    if options['once'] and not claimed and not in_flight:
+                        break
+                    if not claimed:
+                        time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Encerrando worker...')
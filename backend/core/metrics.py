@@ -0,0 +1,368 @@
+"""
+Métricas por view em memória (histogramas no formato do Prometheus).
+
+MetricsMiddleware mede cada requisição roteada: latência total, número de queries,
+tempo no banco e tempo de serialização (renderização JSON em TimedJSONRenderer e os
+trechos marcados com `timer('serialization')`, ex.: serializer.data nas views async).
+As queries são contadas por um execute_wrapper instalado em cada conexão; o estado da
+requisição fica num ContextVar, então também soma as queries feitas em threads via
+sync_to_async (views async).
+
+Banco (por alias): conexões abertas (myfit_db_connections_total), requisições atendidas por
+conexão já aberta, conexões abertas agora e idade da mais antiga, e tempo de vida e
+requisições por conexão das que fecharam (PersistentConnectionStats).
+
+Os valores são do processo: com vários workers cada um expõe os seus em /api/metrics/.
+
+QUERY_BUDGETS ({view_name: máximo de queries}) define o orçamento de cada endpoint;
+acima dele loga um aviso ou, com QUERY_BUDGET_MODE='raise' (testes/CI), levanta
+QueryBudgetExceeded.
+"""
+import bisect
+import logging
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'serialization_time', 'connections')
+
+    def __init__(self):
+        self.connections = set()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labelnames=('view', 'method')):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # contagens por bucket (+Inf no fim), soma, total
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            base = _labels(self.labelnames, labels)
+            cumulative = 0
+            for bound, n in zip((*self.buckets, '+Inf'), counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{base}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=('view', 'method')):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f'{self.name}{{{_labels(self.labelnames, labels)}}} {value}' for labels, value in items)
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+def _labels(names, values):
+    parts = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return ','.join(parts)
+
+
+REQUEST_DURATION = Histogram('myfit_http_request_duration_seconds', 'Latência total da requisição.', LATENCY_BUCKETS)
+DB_QUERIES = Histogram('myfit_http_request_db_queries', 'Queries SQL por requisição.', QUERY_BUCKETS)
+DB_DURATION = Histogram('myfit_http_request_db_duration_seconds', 'Tempo no banco por requisição.', LATENCY_BUCKETS)
+SERIALIZATION_DURATION = Histogram(
+    'myfit_http_request_serialization_duration_seconds', 'Tempo de serialização por requisição.', LATENCY_BUCKETS,
+)
+BUDGET_EXCEEDED = Counter('myfit_query_budget_exceeded_total', 'Requisições acima do orçamento de queries.')
+# Taxa de acerto: hit / (hit + miss + stale)
+CHECKOUT_SESSION_CACHE = Counter(
+    'myfit_stripe_checkout_session_cache_total',
+    'Consultas ao cache de sessões de checkout (users.checkout_cache) por resultado.',
+    labelnames=('result',),
+)
+
+# Com conexões persistentes cresce pouco; subindo junto com as requisições = reaproveitamento falhando
+DB_CONNECTIONS = Counter(
+    'myfit_db_connections_total', 'Conexões abertas pelo Django.', labelnames=('alias',),
+)
+# Taxa de reaproveitamento: reused="true" / total
+DB_CONNECTION_REQUESTS = Counter(
+    'myfit_db_connection_requests_total',
+    'Requisições que usaram o banco, por conexão já aberta (reused="true") ou aberta na requisição.',
+    labelnames=('alias', 'reused'),
+)
+DB_CONNECTION_LIFETIME_REQUESTS = Histogram(
+    'myfit_db_connection_lifetime_requests', 'Requisições atendidas por conexão até ela ser fechada.',
+    (1, 2, 5, 10, 50, 100, 500, 1000, 5000), labelnames=('alias',),
+)
+DB_CONNECTION_LIFETIME = Histogram(
+    'myfit_db_connection_lifetime_seconds', 'Tempo de vida das conexões fechadas.',
+    (1, 10, 60, 300, 600, 1800, 3600), labelnames=('alias',),
+)
+
+
+class _TrackedConnection:
+    __slots__ = ('wrapper', 'raw', 'alias', 'opened_at', 'requests')
+
+    def __init__(self, connection):
+        self.wrapper = weakref.ref(connection)
+        self.raw = connection.connection
+        self.alias = connection.alias
+        self.opened_at = time.monotonic()
+        self.requests = 0
+
+    def is_open(self):
+        wrapper = self.wrapper()
+        return wrapper is not None and wrapper.connection is self.raw
+
+
+class PersistentConnectionStats:
+    """
+    Conexões persistentes (CONN_MAX_AGE, config/database.py): cada thread tem a sua, e este
+    registro deixa a coleta ver as de todas as threads do processo. Na coleta: conexões
+    abertas e idade da mais antiga (gauges); as que fecharam desde a última coleta (ou que
+    foram substituídas por uma nova na mesma thread) entram nos histogramas de tempo de vida
+    e de requisições atendidas.
+    """
+
+    def __init__(self):
+        self._tracked = {}
+        self._lock = threading.Lock()
+
+    def opened(self, connection):
+        with self._lock:
+            self._prune()
+            self._tracked[id(connection)] = _TrackedConnection(connection)
+
+    def used(self, connection):
+        """Primeira query de uma requisição nesta conexão."""
+        with self._lock:
+            tracked = self._tracked.get(id(connection))
+            if tracked is None or not tracked.is_open():
+                return
+            tracked.requests += 1
+            reused = tracked.requests > 1
+        DB_CONNECTION_REQUESTS.inc((tracked.alias, 'true' if reused else 'false'))
+
+    def _prune(self):
+        now = time.monotonic()
+        for key, tracked in list(self._tracked.items()):
+            if not tracked.is_open():
+                del self._tracked[key]
+                DB_CONNECTION_LIFETIME.observe((tracked.alias,), now - tracked.opened_at)
+                DB_CONNECTION_LIFETIME_REQUESTS.observe((tracked.alias,), tracked.requests)
+
+    def render(self):
+        now = time.monotonic()
+        by_alias = {}
+        with self._lock:
+            self._prune()
+            for tracked in self._tracked.values():
+                by_alias.setdefault(tracked.alias, []).append(now - tracked.opened_at)
+        lines = ['# TYPE myfit_db_connections_open gauge']
+        lines.extend(
+            f'myfit_db_connections_open{{{_labels(("alias",), (alias,))}}} {len(ages)}'
+            for alias, ages in sorted(by_alias.items())
+        )
+        lines.append('# TYPE myfit_db_connection_max_age_seconds gauge')
+        lines.extend(
+            f'myfit_db_connection_max_age_seconds{{{_labels(("alias",), (alias,))}}} {max(ages):.3f}'
+            for alias, ages in sorted(by_alias.items())
+        )
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._tracked.clear()
+
+
+DB_PERSISTENT_CONNECTIONS = PersistentConnectionStats()
+
+METRICS = (
+    REQUEST_DURATION, DB_QUERIES, DB_DURATION, SERIALIZATION_DURATION, BUDGET_EXCEEDED, CHECKOUT_SESSION_CACHE,
+    DB_CONNECTIONS, DB_CONNECTION_REQUESTS, DB_PERSISTENT_CONNECTIONS, DB_CONNECTION_LIFETIME_REQUESTS,
+    DB_CONNECTION_LIFETIME,
+)
+
+
+def render_prometheus():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for metric in METRICS:
+        metric.clear()
+
+
+# --- coleta ---
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    connection = context['connection']
+    if id(connection) not in stats.connections:
+        stats.connections.add(id(connection))
+        DB_PERSISTENT_CONNECTIONS.used(connection)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - start
+        stats.queries += 1
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """Receiver de connection_created: conta a conexão e as queries dela (wrapper uma vez por conexão)."""
+    DB_CONNECTIONS.inc((connection.alias,))
+    DB_PERSISTENT_CONNECTIONS.opened(connection)
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@contextmanager
+def timer(kind='serialization'):
+    """Soma a duração do bloco ao tempo de `kind` da requisição atual (no-op fora de uma)."""
+    stats = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            setattr(stats, f'{kind}_time', getattr(stats, f'{kind}_time') + time.perf_counter() - start)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer que soma a renderização ao tempo de serialização da requisição."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timer('serialization'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+def query_budget(view_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+
+
+def _view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    """Registra as métricas das requisições que chegaram a uma view (404 de rota não conta)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def _observe(self, request, response, stats, elapsed):
+        view = _view_label(request)
+        if view is None:
+            return
+        labels = (view, request.method)
+        REQUEST_DURATION.observe(labels, elapsed)
+        DB_QUERIES.observe(labels, stats.queries)
+        DB_DURATION.observe(labels, stats.db_time)
+        SERIALIZATION_DURATION.observe(labels, stats.serialization_time)
+        budget = query_budget(view)
+        if budget is None or stats.queries <= budget:
+            return
+        BUDGET_EXCEEDED.inc(labels)
+        message = f'{request.method} {request.path} ({view}): {stats.queries} queries, orçamento {budget}'
+        if getattr(settings, 'QUERY_BUDGET_MODE', 'warn') == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning('Orçamento de queries excedido: %s', message)
@@ -0,0 +1,37 @@
+# Fila de tarefas em segundo plano no banco (core.jobs)
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='tarefa')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='parâmetros')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Executando'), ('done', 'Concluída'), ('failed', 'Falhou')], default='queued', max_length=20, verbose_name='status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='tentativas')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='máximo de tentativas')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='executar a partir de')),
+                ('last_error', models.TextField(blank=True, verbose_name='último erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'tarefa',
+                'verbose_name_plural': 'tarefas',
+                'ordering': ('run_after', 'id'),
+                'indexes': [models.Index(fields=['status', 'run_after'], name='core_job_status_run_after_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Tarefa em segundo plano (fila no próprio banco), executada pelo comando runworker."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Na fila'
+        RUNNING = 'running', 'Executando'
+        DONE = 'done', 'Concluída'
+        FAILED = 'failed', 'Falhou'
+
+    name = models.CharField('tarefa', max_length=100)
+    payload = models.JSONField('parâmetros', default=dict, blank=True)
+    status = models.CharField('status', max_length=20, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField('tentativas', default=0)
+    max_attempts = models.PositiveSmallIntegerField('máximo de tentativas', default=3)
+    run_after = models.DateTimeField('executar a partir de', default=timezone.now)
+    last_error = models.TextField('último erro', blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'tarefa'
+        verbose_name_plural = 'tarefas'
+        ordering = ('run_after', 'id')
+        indexes = [
+            models.Index(fields=('status', 'run_after'), name='core_job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.get_status_display()})'
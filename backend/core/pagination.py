@@ -0,0 +1,167 @@
+"""
+Pagination classes for the API.
+
+`KeysetPaginationMixin` implements keyset (cursor) pagination over
+(created_at, id): each page is a range scan on the composite index, with no
+COUNT(*) and no OFFSET, so latency stays flat regardless of page depth.
+`OptionalCursorPagination` keeps the default page-number behaviour and
+switches to keyset mode when the request carries `?cursor=` (empty for the
+first page); `KeysetPagination` is always in keyset mode.
+"""
+import base64
+import binascii
+import json
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin:
+    cursor_query_param = 'cursor'
+    keyset_fields = ('created_at', 'id')
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def encode_cursor(self, obj, reverse):
+        created_field, id_field = self.keyset_fields
+        # obj pode ser uma instância ou um dict (queryset .values())
+        get = obj.get if isinstance(obj, dict) else lambda field: getattr(obj, field)
+        payload = {
+            't': get(created_field).isoformat(),
+            'i': get(id_field),
+            'r': int(reverse),
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, value):
+        try:
+            raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+            payload = json.loads(raw)
+            created = parse_datetime(payload['t'])
+            pk = int(payload['i'])
+            reverse = bool(payload.get('r'))
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created, pk, reverse
+
+    def _keyset_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        created_field, id_field = self.keyset_fields
+        value = request.query_params.get(self.cursor_query_param) or ''
+        reverse = False
+        if value:
+            created, pk, reverse = self.decode_cursor(value)
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f'{created_field}__gt': created}) | Q(**{created_field: created, f'{id_field}__gt': pk})
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{created_field}__lt': created}) | Q(**{created_field: created, f'{id_field}__lt': pk})
+                )
+        if reverse:
+            queryset = queryset.order_by(created_field, id_field)
+        else:
+            queryset = queryset.order_by(f'-{created_field}', f'-{id_field}')
+        self._keyset_state = (bool(value), reverse)
+        return queryset[:self.page_size + 1]
+
+    def _keyset_page(self, rows):
+        has_cursor, reverse = self._keyset_state
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.next_cursor = self.encode_cursor(rows[-1], reverse=False) if rows else None
+            self.previous_cursor = self.encode_cursor(rows[0], reverse=True) if rows and has_more else None
+        else:
+            self.next_cursor = self.encode_cursor(rows[-1], reverse=False) if rows and has_more else None
+            self.previous_cursor = self.encode_cursor(rows[0], reverse=True) if rows and has_cursor else None
+        return rows
+
+    def paginate_keyset(self, queryset, request):
+        return self._keyset_page(list(self._keyset_queryset(queryset, request)))
+
+    async def apaginate_keyset(self, queryset, request):
+        return self._keyset_page([obj async for obj in self._keyset_queryset(queryset, request)])
+
+    def _cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), 'page')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_keyset_response(self, data):
+        return Response({
+            'success': True,
+            'data': {
+                'next': self._cursor_link(self.next_cursor),
+                'previous': self._cursor_link(self.previous_cursor),
+                'results': data,
+            },
+        })
+
+
+class OptionalCursorPagination(KeysetPaginationMixin, PageNumberPagination):
+    """Paginação por página (padrão) ou por cursor quando ?cursor= é enviado."""
+    keyset_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = self.cursor_query_param in request.query_params
+        if self.keyset_mode:
+            return self.paginate_keyset(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset para views async: COUNT e página pelo ORM assíncrono."""
+        self.keyset_mode = self.cursor_query_param in request.query_params
+        if self.keyset_mode:
+            return await self.apaginate_keyset(queryset, request)
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset_mode:
+            return self.get_keyset_response(data)
+        return super().get_paginated_response(data)
+
+
+class KeysetPagination(KeysetPaginationMixin, BasePagination):
+    """Keyset pagination only (no page numbers, no COUNT); the first page has no cursor."""
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_keyset(queryset, request)
+
+    def get_paginated_response(self, data):
+        return self.get_keyset_response(data)
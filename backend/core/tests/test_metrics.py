@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+
+from core import metrics
+from core.benchmark import auth_client
+from videos.tests.utils import create_professional
+
+
+class FakeConnection:
+    alias = 'replica'
+
+    def __init__(self):
+        self.connection = object()
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class PersistentConnectionStatsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_requests_on_an_open_connection_count_as_reused(self):
+        user, _ = create_professional()
+        client = auth_client(user)
+        metrics.DB_PERSISTENT_CONNECTIONS.opened(connections['default'])
+        for _ in range(3):
+            # Sem a versão das claims em cache a requisição sempre consulta o banco
+            cache.clear()
+            client.get('/api/videos/me/')
+        output = metrics.render_prometheus()
+        self.assertIn('myfit_db_connection_requests_total{alias="default",reused="false"} 1', output)
+        self.assertIn('myfit_db_connection_requests_total{alias="default",reused="true"} 2', output)
+        self.assertIn('myfit_db_connections_open{alias="default"} 1', output)
+        self.assertIn('myfit_db_connection_max_age_seconds{alias="default"}', output)
+
+    def test_closed_connection_goes_to_lifetime_histograms(self):
+        fake = FakeConnection()
+        stats = metrics.DB_PERSISTENT_CONNECTIONS
+        stats.opened(fake)
+        stats.used(fake)
+        stats.used(fake)
+        fake.connection = None
+        output = metrics.render_prometheus()
+        self.assertNotIn('myfit_db_connections_open{alias="replica"}', output)
+        self.assertIn('myfit_db_connection_lifetime_requests_bucket{alias="replica",le="2"} 1', output)
+        self.assertIn('myfit_db_connection_lifetime_requests_bucket{alias="replica",le="1"} 0', output)
+        self.assertIn('myfit_db_connection_lifetime_seconds_count{alias="replica"} 1', output)
@@ -0,0 +1,13 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+from .metrics import render_prometheus
+from .permissions import IsAdmin
+
+
+class MetricsView(APIView):
+    """Métricas por view deste processo no formato texto do Prometheus (apenas admin)."""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
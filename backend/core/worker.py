@@ -0,0 +1,20 @@
+"""
+Pontos de entrada dos processos do pool do runworker.
+
+Os processos são criados com 'spawn': este módulo é importado antes do Django
+estar configurado, por isso não importa models no nível do módulo.
+"""
+import os
+
+
+def setup():
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+    from core import jobs
+    jobs.autodiscover()
+
+
+def run(job_id):
+    from core import jobs
+    return jobs.execute(job_id)
@@ -1,4 +1,11 @@
 #!/bin/sh
 set -e
 python manage.py migrate --noinput
-exec gunicorn --bind "0.0.0.0:${PORT:-8000}" --workers 2 --timeout 120 config.wsgi:application
+# SERVER_MODE=asgi: workers uvicorn (views async liberam o worker enquanto esperam o banco)
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  exec gunicorn --bind "0.0.0.0:${PORT:-8000}" --workers "${WEB_CONCURRENCY:-2}" --timeout 120 \
+    -k uvicorn_worker.UvicornWorker config.asgi:application
+fi
+# GUNICORN_THREADS > 1: worker gthread; cada thread mantém sua conexão com o banco (config/database.py)
+exec gunicorn --bind "0.0.0.0:${PORT:-8000}" --workers "${WEB_CONCURRENCY:-2}" --threads "${GUNICORN_THREADS:-1}" \
+  --timeout 120 config.wsgi:application
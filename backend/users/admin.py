@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, ProfessionalProfile, ProfessionalStudent
+from . import webhooks
+from .models import User, ProfessionalProfile, ProfessionalStudent, StripeEvent, StripeReconciliation
 
 
 @admin.register(User)
@@ -27,3 +28,23 @@ class ProfessionalStudentAdmin(admin.ModelAdmin):
     list_filter = ('professional',)
     search_fields = ('professional__email', 'student__email')
     raw_id_fields = ('professional', 'student')
+
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'type', 'status', 'attempts', 'created', 'received_at', 'processed_at')
+    list_filter = ('status', 'type')
+    search_fields = ('event_id',)
+    readonly_fields = ('event_id', 'type', 'created', 'payload', 'attempts', 'last_error', 'received_at', 'processed_at')
+    actions = ('replay',)
+
+    @admin.action(description='Reprocessar eventos selecionados')
+    def replay(self, request, queryset):
+        self.message_user(request, f'{webhooks.replay(queryset)} evento(s) de volta à fila.')
+
+
+@admin.register(StripeReconciliation)
+class StripeReconciliationAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'status', 'dry_run', 'since', 'watermark', 'finished_at')
+    list_filter = ('status', 'dry_run')
+    readonly_fields = ('started_at', 'finished_at', 'status', 'dry_run', 'since', 'watermark', 'summary', 'error')
@@ -0,0 +1,117 @@
+"""
+Autenticação JWT sem SELECT em users_user a cada requisição.
+
+O access token carrega role, subscription_status, se o usuário tem perfil
+profissional e a versão das claims (User.token_version). ClaimsJWTAuthentication
+devolve um ClaimsUser montado só com o token enquanto essa versão for a atual;
+a versão atual fica no cache (consultada no banco só quando não está lá).
+
+Quando o webhook do Stripe, o admin ou o cadastro alteram esses campos, User.save()
+incrementa token_version e remove a versão do cache: tokens antigos deixam de valer
+como claims e a requisição cai no caminho normal (usuário carregado do banco, com
+checagem de is_active) até o cliente renovar o token.
+
+Views que precisam do usuário completo (e-mail, Stripe, /me) usam JWTAuthentication.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import ProfessionalProfile, User
+
+VERSION_CLAIM = 'token_version'
+
+
+def _version_cache_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def current_token_version(user_id):
+    """Versão atual das claims do usuário (None se não existe ou está inativo)."""
+    key = _version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id, is_active=True).values_list('token_version', flat=True).first()
+        )
+        if version is None:
+            return None
+        cache.set(key, version, getattr(settings, 'TOKEN_VERSION_CACHE_TIMEOUT', 300))
+    return version
+
+
+def invalidate_token_version(*user_ids):
+    if user_ids:
+        cache.delete_many([_version_cache_key(pk) for pk in user_ids])
+
+
+def set_user_claims(token, user):
+    """Grava no token (refresh; o access herda) as claims usadas pelas permissões."""
+    token['role'] = user.role
+    token['subscription_status'] = user.subscription_status
+    token['professional'] = user.has_professional_profile
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """Usuário montado com as claims do access token; mesmas regras de User para as permissões."""
+    Role = User.Role
+    SubscriptionStatus = User.SubscriptionStatus
+
+    is_professional = User.is_professional
+    has_active_subscription = User.has_active_subscription
+
+    @cached_property
+    def id(self):
+        # simplejwt grava o user_id como str; inteiro como em User, para comparar com FKs
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', '')
+
+    @cached_property
+    def subscription_status(self):
+        return self.token.get('subscription_status', '')
+
+    @cached_property
+    def has_professional_profile(self):
+        return bool(self.token.get('professional'))
+
+    @cached_property
+    def professional_profile(self):
+        """Carregado sob demanda (escritas); sem perfil levanta o mesmo erro do acesso em User."""
+        if not self.has_professional_profile:
+            raise User.professional_profile.RelatedObjectDoesNotExist('User has no professional_profile.')
+        return ProfessionalProfile.objects.get(pk=self.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que só consulta o banco quando as claims do token estão desatualizadas."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        version = validated_token.get(VERSION_CLAIM)
+        if user_id is not None and version is not None and version == current_token_version(user_id):
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Renovação do token que reemite as claims com os valores atuais do banco."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is not None:
+            attrs = {**attrs, 'refresh': str(set_user_claims(refresh, user))}
+        return super().validate(attrs)
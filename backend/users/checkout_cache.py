@@ -0,0 +1,100 @@
+"""
+Reaproveitamento de sessões de checkout do Stripe ainda abertas.
+
+Cada clique em "pagar" criava uma sessão nova no Stripe. Agora a sessão criada fica no
+cache (por usuário, sob a impressão digital dos parâmetros: valor, moeda, produto,
+customer, URLs) até perto de expirar (expires_at menos STRIPE_CHECKOUT_REUSE_MARGIN), e um
+novo clique com os mesmos parâmetros devolve a mesma URL sem chamar o Stripe. Os webhooks
+checkout.session.completed/expired (users.webhooks) tiram a sessão do cache.
+
+Resultados das consultas (hit, miss, stale) vão para a métrica
+myfit_stripe_checkout_session_cache_total em /api/metrics/.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core.metrics import CHECKOUT_SESSION_CACHE
+
+HIT = 'hit'
+MISS = 'miss'
+STALE = 'stale'
+
+# Validade padrão de uma sessão de checkout no Stripe
+DEFAULT_SESSION_TTL = 24 * 60 * 60
+
+
+def _cache():
+    return caches[getattr(settings, 'STRIPE_CHECKOUT_CACHE_ALIAS', 'default')]
+
+
+def enabled():
+    return getattr(settings, 'STRIPE_CHECKOUT_REUSE', True)
+
+
+def margin():
+    return getattr(settings, 'STRIPE_CHECKOUT_REUSE_MARGIN', 600)
+
+
+def _key(user_id):
+    return f'stripe-checkout:{user_id}'
+
+
+def _remaining(entry):
+    return int(entry['expires_at'] - margin() - time.time())
+
+
+def _save(cache, user_id, entries):
+    """Grava as entradas ainda válidas (timeout = a que expira por último) ou apaga a chave."""
+    entries = {key: entry for key, entry in entries.items() if _remaining(entry) > 0}
+    if entries:
+        cache.set(_key(user_id), entries, timeout=max(_remaining(entry) for entry in entries.values()))
+    else:
+        cache.delete(_key(user_id))
+
+
+def fingerprint(params):
+    """Impressão digital dos parâmetros da sessão (valor, moeda, produto, customer, URLs)."""
+    raw = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+
+def get(user_id, params):
+    """{'id', 'url', 'expires_at'} de uma sessão aberta com esses parâmetros, ou None."""
+    if not enabled():
+        return None
+    entry = (_cache().get(_key(user_id)) or {}).get(fingerprint(params))
+    if entry is None:
+        CHECKOUT_SESSION_CACHE.inc((MISS,))
+        return None
+    if _remaining(entry) <= 0:
+        CHECKOUT_SESSION_CACHE.inc((STALE,))
+        return None
+    CHECKOUT_SESSION_CACHE.inc((HIT,))
+    return entry
+
+
+def store(user_id, params, session_id, url, expires_at=None):
+    """Guarda a sessão criada até expires_at - margem (sem expires_at: agora + 24 h)."""
+    if not enabled():
+        return
+    expires_at = expires_at or time.time() + DEFAULT_SESSION_TTL
+    cache = _cache()
+    entries = cache.get(_key(user_id)) or {}
+    entries[fingerprint(params)] = {'id': session_id, 'url': url, 'expires_at': expires_at}
+    _save(cache, user_id, entries)
+
+
+def invalidate(user_id, session_id=None):
+    """Remove a sessão `session_id` (None = todas) do cache do usuário."""
+    cache = _cache()
+    entries = cache.get(_key(user_id))
+    if not entries:
+        return
+    if session_id is None:
+        cache.delete(_key(user_id))
+    else:
+        _save(cache, user_id, {key: entry for key, entry in entries.items() if entry['id'] != session_id})
@@ -0,0 +1,119 @@
+"""
+Vínculo de alunos em lote (lista JSON ou CSV de e-mails) ao profissional.
+
+As linhas são processadas em blocos de STUDENT_BULK_CHUNK_SIZE: por bloco, uma query
+email__in para achar os alunos, uma para os vínculos já existentes e um
+bulk_create(ignore_conflicts=True). Como bulk_create não dispara signals, o cache de
+visibilidade dos alunos vinculados é invalidado aqui. enroll() é um gerador (uma
+entrada do relatório por linha), então arquivos grandes não ficam inteiros na memória.
+"""
+import csv
+import io
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import ProfessionalStudent, User
+from .visibility import invalidate_student_visibility
+
+ADDED = 'added'
+ALREADY_LINKED = 'already_linked'
+NOT_FOUND = 'not_found'
+INVALID_EMAIL = 'invalid_email'
+DUPLICATE = 'duplicate'
+STATUSES = (ADDED, ALREADY_LINKED, NOT_FOUND, INVALID_EMAIL, DUPLICATE)
+
+
+def chunk_size():
+    return max(getattr(settings, 'STUDENT_BULK_CHUNK_SIZE', 1000), 1)
+
+
+def csv_emails(fileobj):
+    """
+    E-mails de um CSV enviado (lido linha a linha). Usa a coluna "email" se houver
+    cabeçalho; senão a primeira coluna. Linhas vazias são ignoradas.
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    column = 0
+    for i, row in enumerate(csv.reader(text)):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if i == 0:
+            header = [cell.strip().lower() for cell in row]
+            if 'email' in header or 'e-mail' in header:
+                column = header.index('email') if 'email' in header else header.index('e-mail')
+                continue
+        yield row[column] if column < len(row) else ''
+
+
+def _enroll_chunk(professional_id, rows, seen):
+    """rows: [(número da linha, e-mail normalizado)]; devolve o relatório do bloco."""
+    report = []
+    valid = {}
+    for row, email in rows:
+        try:
+            validate_email(email)
+        except ValidationError:
+            report.append({'row': row, 'email': email, 'status': INVALID_EMAIL, 'student_id': None})
+            continue
+        if email in seen:
+            report.append({'row': row, 'email': email, 'status': DUPLICATE, 'student_id': None})
+            continue
+        seen.add(email)
+        valid[row] = email
+        report.append({'row': row, 'email': email, 'status': None, 'student_id': None})
+
+    students = dict(
+        User.objects.filter(email__in=set(valid.values()), role=User.Role.USER, is_active=True)
+        .values_list('email', 'pk')
+    )
+    with transaction.atomic():
+        existing = set(
+            ProfessionalStudent.objects.filter(professional_id=professional_id, student_id__in=students.values())
+            .values_list('student_id', flat=True)
+        )
+        new_ids = [pk for pk in students.values() if pk not in existing]
+        # ignore_conflicts: vínculo criado por outra requisição entre a consulta e o INSERT
+        ProfessionalStudent.objects.bulk_create(
+            [ProfessionalStudent(professional_id=professional_id, student_id=pk) for pk in new_ids],
+            ignore_conflicts=True,
+        )
+        if new_ids:
+            invalidate_student_visibility(*new_ids)
+            transaction.on_commit(lambda: invalidate_student_visibility(*new_ids))
+
+    for item in report:
+        if item['status'] is not None:
+            continue
+        student_id = students.get(item['email'])
+        item['student_id'] = student_id
+        if student_id is None:
+            item['status'] = NOT_FOUND
+        else:
+            item['status'] = ALREADY_LINKED if student_id in existing else ADDED
+    return report
+
+
+def enroll(professional_id, emails):
+    """
+    Vincula os e-mails (iterável, pode ser um gerador) como alunos do profissional.
+    Gera {'row', 'email', 'status', 'student_id'} por linha, na ordem de entrada.
+    """
+    seen = set()
+    numbered = ((i, (email or '').strip().lower()) for i, email in enumerate(emails, start=1))
+    size = chunk_size()
+    while True:
+        rows = list(islice(numbered, size))
+        if not rows:
+            return
+        yield from _enroll_chunk(professional_id, rows, seen)
+
+
+def summarize(report):
+    counts = dict.fromkeys(STATUSES, 0)
+    for item in report:
+        counts[item['status']] += 1
+    return counts
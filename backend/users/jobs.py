@@ -0,0 +1,9 @@
+"""Tarefas em segundo plano do app users (executadas pelo runworker)."""
+from core.jobs import job
+
+from . import webhooks
+
+
+@job(webhooks.PROCESS_JOB)
+def process_stripe_events():
+    webhooks.process_pending()
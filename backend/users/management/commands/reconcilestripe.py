@@ -0,0 +1,68 @@
+"""
+Concilia o acesso dos profissionais com as sessões de checkout e os PaymentIntents pagos
+no Stripe (users.reconciliation): libera quem pagou e ficou sem acesso porque o webhook se perdeu.
+Incremental: parte da marca d'água da última execução. Agende (cron) a cada hora, por ex.
+
+Uso: python manage.py reconcilestripe [--dry-run] [--report relatorio.csv]
+     python manage.py reconcilestripe --since 2026-01-01 | --full
+"""
+import csv
+import sys
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from users import reconciliation
+from users.stripe_client import StripeUnavailable
+
+
+class Command(BaseCommand):
+    help = 'Concilia subscription_status dos profissionais com os pagamentos (checkout e PaymentIntents) no Stripe.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Pagamentos criados desde (data/ISO 8601); ignora a marca d'água")
+        parser.add_argument('--full', action='store_true', help='Todos os pagamentos (primeira carga)')
+        parser.add_argument('--dry-run', action='store_true', help='Só o relatório, sem alterar usuários')
+        parser.add_argument('--report', help='Arquivo CSV do relatório ("-" = saída padrão)')
+        parser.add_argument('--changes-only', action='store_true', help='No relatório, só as linhas que alteraram usuários')
+
+    def handle(self, *args, **options):
+        since = self._since(options['since'])
+        report = options['report']
+        out = None
+        if report:
+            out = sys.stdout if report == '-' else open(report, 'w', newline='', encoding='utf-8')
+        try:
+            on_row = None
+            if out is not None:
+                writer = csv.DictWriter(out, fieldnames=reconciliation.REPORT_FIELDS)
+                writer.writeheader()
+                changes = (reconciliation.ACTIVATED, reconciliation.CUSTOMER_LINKED)
+
+                def on_row(row):
+                    if not options['changes_only'] or row['action'] in changes:
+                        writer.writerow(row)
+            try:
+                run = reconciliation.reconcile(
+                    since=since, full=options['full'], dry_run=options['dry_run'], on_row=on_row,
+                )
+            except StripeUnavailable as exc:
+                raise CommandError(str(exc))
+        finally:
+            if out is not None and out is not sys.stdout:
+                out.close()
+        prefix = '[simulação] ' if run.dry_run else ''
+        self.stderr.write(f"{prefix}Desde: {run.since or 'início'}; marca d'água: {run.watermark}; resumo: {run.summary}")
+
+    def _since(self, value):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f'Data inválida: {value}')
+            parsed = datetime.combine(day, time.min)
+        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
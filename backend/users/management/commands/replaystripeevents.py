@@ -0,0 +1,56 @@
+"""
+Reprocessa eventos de webhook do Stripe já recebidos (users.webhooks). Os handlers são
+idempotentes, então reprocessar um evento já aplicado não altera nada.
+
+Uso: python manage.py replaystripeevents                       # eventos 'failed'
+     python manage.py replaystripeevents evt_123 evt_456 --sync
+     python manage.py replaystripeevents --status processed --type checkout.session.completed --since 2024-01-01
+"""
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from users import webhooks
+from users.models import StripeEvent
+
+
+class Command(BaseCommand):
+    help = 'Volta eventos do Stripe para a fila (ou os processa na hora com --sync).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help='IDs dos eventos (evt_...)')
+        parser.add_argument('--status', choices=StripeEvent.Status.values, help="Default: 'failed' sem IDs")
+        parser.add_argument('--type', help='Tipo do evento (ex.: checkout.session.completed)')
+        parser.add_argument('--since', help='Eventos criados no Stripe a partir desta data (AAAA-MM-DD ou ISO)')
+        parser.add_argument('--sync', action='store_true', help='Processa neste processo em vez de agendar no runworker')
+        parser.add_argument('--dry-run', action='store_true', help='Só mostra quantos eventos seriam reprocessados')
+
+    def handle(self, *args, **options):
+        queryset = StripeEvent.objects.all()
+        if options['event_ids']:
+            queryset = queryset.filter(event_id__in=options['event_ids'])
+        status = options['status'] or (None if options['event_ids'] else StripeEvent.Status.FAILED)
+        if status:
+            queryset = queryset.filter(status=status)
+        if options['type']:
+            queryset = queryset.filter(type=options['type'])
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                day = parse_date(options['since'])
+                if day is None:
+                    raise CommandError('--since inválido.')
+                since = datetime.combine(day, time.min)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(created__gte=since)
+
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} evento(s) seriam reprocessados.')
+            return
+        count = webhooks.replay(queryset)
+        self.stdout.write(f'{count} evento(s) de volta à fila.')
+        if options['sync'] and count:
+            self.stdout.write(f'Processados: {dict(webhooks.process_pending())}')
@@ -0,0 +1,73 @@
+"""
+Envia um evento de webhook do Stripe assinado (users/stripe_fixtures) para o endpoint, sem
+precisar de conta no Stripe. Por padrão usa o client de teste do Django (no processo); com
+--url envia por HTTP para um servidor rodando com o mesmo STRIPE_WEBHOOK_SECRET.
+
+Uso: python manage.py sendstripefixture checkout_session_completed --user-id 5 [--process]
+     python manage.py sendstripefixture checkout_session_completed --user-id 5 --count 50 --duplicates 3
+"""
+import json
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from users import stripe_fixtures, webhooks
+
+
+class Command(BaseCommand):
+    help = 'Envia eventos de webhook do Stripe assinados a partir das fixtures (teste local).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help=f'Nome da fixture: {", ".join(stripe_fixtures.names())}')
+        parser.add_argument('--user-id', help='metadata.user_id do objeto (ex.: ID do profissional)')
+        parser.add_argument('--customer', help='customer do objeto (ex.: cus_...)')
+        parser.add_argument('--event-id', help='ID fixo do evento (default: um novo por envio)')
+        parser.add_argument('--count', type=int, default=1, help='Eventos diferentes a enviar')
+        parser.add_argument('--duplicates', type=int, default=1, help='Envios de cada evento (simula reenvios do Stripe)')
+        parser.add_argument('--url', help='Endpoint HTTP (ex.: http://localhost:8000/api/webhooks/stripe/)')
+        parser.add_argument('--secret', help='Segredo do webhook (default: STRIPE_WEBHOOK_SECRET ou whsec_fixture)')
+        parser.add_argument('--process', action='store_true', help='Processa os eventos pendentes em seguida (sem runworker)')
+
+    def handle(self, *args, **options):
+        secret = options['secret'] or settings.STRIPE_WEBHOOK_SECRET or 'whsec_fixture'
+        fields = {}
+        if options['user_id']:
+            fields['metadata'] = {'user_id': str(options['user_id'])}
+        if options['customer']:
+            fields['customer'] = options['customer']
+        statuses = {}
+        for n in range(options['count']):
+            event_id = options['event_id'] and (options['event_id'] if options['count'] == 1 else f"{options['event_id']}_{n}")
+            try:
+                event = stripe_fixtures.event(options['fixture'], event_id=event_id, **fields)
+            except LookupError as exc:
+                raise CommandError(str(exc))
+            payload = json.dumps(event)
+            for _ in range(max(options['duplicates'], 1)):
+                status = self._send(payload, stripe_fixtures.signature(payload, secret), secret, options['url'])
+                statuses[status] = statuses.get(status, 0) + 1
+        self.stdout.write(f'Respostas: {statuses}')
+        if options['process']:
+            self.stdout.write(f'Processados: {dict(webhooks.process_pending())}')
+
+    def _send(self, payload, signature, secret, url):
+        if url:
+            request = urllib.request.Request(
+                url, data=payload.encode(), method='POST',
+                headers={'Content-Type': 'application/json', 'Stripe-Signature': signature},
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    return response.status
+            except urllib.error.HTTPError as exc:
+                return exc.code
+        with override_settings(STRIPE_WEBHOOK_SECRET=secret, ALLOWED_HOSTS=['*']):
+            response = Client().post(
+                '/api/webhooks/stripe/', data=payload, content_type='application/json',
+                HTTP_STRIPE_SIGNATURE=signature,
+            )
+        return response.status_code
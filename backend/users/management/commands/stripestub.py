@@ -0,0 +1,49 @@
+"""
+Sobe o substituto local da API do Stripe (users/stripe_fixtures/stub.py) para testar o
+checkout/portal sem conta no Stripe, com lentidão e falhas simuladas.
+
+Uso: python manage.py stripestub [--port 12111] [--delay 0.5] [--fail-rate 0.3]
+     e, no servidor: STRIPE_API_BASE=http://127.0.0.1:12111 STRIPE_SECRET_KEY=sk_test_stub
+     python manage.py stripestub --paid-user 5 (sessão paga sem webhook, para reconcilestripe)
+     python manage.py stripestub --paid-intent 5 (só o PaymentIntent pago, sessão fora da janela)
+"""
+from django.core.management.base import BaseCommand
+
+from users.stripe_fixtures.stub import StubServer
+
+
+class Command(BaseCommand):
+    help = 'Substituto local da API do Stripe (checkout e portal) para testes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument('--delay', type=float, default=0, help='Atraso (s) de cada resposta')
+        parser.add_argument('--fail-rate', type=float, default=0, help='Fração das requisições que falham (0 a 1)')
+        parser.add_argument('--fail-status', type=int, default=500, help='Status HTTP das falhas simuladas')
+        parser.add_argument(
+            '--paid-user', type=int, action='append', default=[],
+            help='Semeia uma sessão paga para o usuário (testar reconcilestripe); pode repetir',
+        )
+        parser.add_argument(
+            '--paid-intent', type=int, action='append', default=[],
+            help='Semeia um PaymentIntent pago (metadata.user_id) para o usuário; pode repetir',
+        )
+
+    def handle(self, *args, **options):
+        server = StubServer(
+            host=options['host'], port=options['port'], delay=options['delay'],
+            fail_rate=options['fail_rate'], fail_status=options['fail_status'], verbose=True,
+        )
+        for user_id in options['paid_user']:
+            server.add_session(user_id=user_id)
+        for user_id in options['paid_intent']:
+            server.add_payment_intent(user_id=user_id)
+        self.stdout.write(f'Stripe stub em {server.url} (STRIPE_API_BASE). Ctrl+C para sair.')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write(f'Requisições: {dict(server.requests)}')
@@ -0,0 +1,18 @@
+# Versão das claims do access token (users.authentication)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_professionalstudent_limit_choices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='versão do token'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Lista de alunos: índice (professional, created_at, id) para a paginação por cursor e
+# índice trigram (pg_trgm) em UPPER(email/first_name/last_name) para a busca ?search=.
+# As operações do PostgreSQL são ignoradas em outros bancos (SQLite em dev/testes).
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='gin_trgm_ops'),
+    django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('first_name'), name='gin_trgm_ops'),
+    django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('last_name'), name='gin_trgm_ops'),
+    name='users_user_search_trgm',
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.add_index(apps.get_model('users', 'User'), SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('users', 'User'), SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='professionalstudent',
+            index=models.Index(fields=['professional', '-created_at', '-id'], name='users_prostudent_created_idx'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='user', index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+        ),
+    ]
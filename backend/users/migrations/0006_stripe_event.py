@@ -0,0 +1,34 @@
+# Eventos de webhook do Stripe (users.webhooks): registro por ID, processados em segundo plano
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_student_roster_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255, unique=True, verbose_name='ID do evento')),
+                ('type', models.CharField(max_length=100, verbose_name='tipo')),
+                ('created', models.DateTimeField(verbose_name='criado no Stripe')),
+                ('payload', models.JSONField(verbose_name='evento')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('processed', 'Processado'), ('ignored', 'Ignorado'), ('failed', 'Falhou')], default='pending', max_length=20, verbose_name='status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='tentativas')),
+                ('last_error', models.TextField(blank=True, verbose_name='último erro')),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='recebido em')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='processado em')),
+            ],
+            options={
+                'verbose_name': 'evento do Stripe',
+                'verbose_name_plural': 'eventos do Stripe',
+                'ordering': ('created', 'id'),
+                'indexes': [models.Index(fields=['status', 'created', 'id'], name='users_stripeevent_status_idx')],
+            },
+        ),
+    ]
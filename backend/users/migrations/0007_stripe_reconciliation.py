@@ -0,0 +1,32 @@
+# Execuções da conciliação com o Stripe (users.reconciliation) e a marca d'água incremental
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_stripe_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeReconciliation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='início')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='fim')),
+                ('status', models.CharField(choices=[('running', 'Em andamento'), ('succeeded', 'Concluída'), ('failed', 'Falhou')], default='running', max_length=20, verbose_name='status')),
+                ('dry_run', models.BooleanField(default=False, verbose_name='simulação')),
+                ('since', models.DateTimeField(blank=True, null=True, verbose_name='sessões desde')),
+                ('watermark', models.DateTimeField(blank=True, null=True, verbose_name="marca d'água")),
+                ('summary', models.JSONField(blank=True, default=dict, verbose_name='resumo')),
+                ('error', models.TextField(blank=True, verbose_name='erro')),
+            ],
+            options={
+                'verbose_name': 'conciliação do Stripe',
+                'verbose_name_plural': 'conciliações do Stripe',
+                'ordering': ('-started_at', '-id'),
+            },
+        ),
+    ]
@@ -1,6 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.conf import settings
+from django.db.models.functions import Upper
+
+# Campos da busca de alunos (?search= em students/); icontains gera UPPER(campo) LIKE, daí o índice em UPPER
+STUDENT_SEARCH_FIELDS = ('email', 'first_name', 'last_name')
 
 
 class User(AbstractUser):
@@ -32,17 +37,56 @@ class User(AbstractUser):
         choices=SubscriptionStatus.choices,
         blank=True,
     )
+    # Versão das claims do access token (users.authentication); muda quando TOKEN_CLAIM_FIELDS mudam
+    token_version = models.PositiveIntegerField('versão do token', default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
+    TOKEN_CLAIM_FIELDS = ('role', 'subscription_status', 'is_active')
 
     class Meta:
         verbose_name = 'usuário'
         verbose_name_plural = 'usuários'
+        indexes = [
+            # Trigram (pg_trgm) para a busca por trecho de e-mail/nome; só no PostgreSQL (migração 0005)
+            GinIndex(
+                *(OpClass(Upper(field), name='gin_trgm_ops') for field in STUDENT_SEARCH_FIELDS),
+                name='users_user_search_trgm',
+            ),
+        ]
 
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_claims = instance._claim_values()
+        return instance
+
+    def _claim_values(self):
+        return tuple(self.__dict__.get(field) for field in self.TOKEN_CLAIM_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_token_claims', None)
+        changed = loaded is not None and loaded != self._claim_values()
+        if changed:
+            # Tokens emitidos antes desta alteração deixam de valer como claims
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._token_claims = self._claim_values()
+        if changed:
+            from .authentication import invalidate_token_version
+            invalidate_token_version(self.pk)
+            transaction.on_commit(lambda: invalidate_token_version(self.pk))
+
+    @property
+    def has_professional_profile(self):
+        return hasattr(self, 'professional_profile')
+
     @property
     def is_professional(self):
         return self.role in (self.Role.PROFESSIONAL, self.Role.ADMIN)
@@ -98,6 +142,71 @@ class ProfessionalStudent(models.Model):
         verbose_name = 'aluno do profissional'
         verbose_name_plural = 'alunos do profissional'
         unique_together = [['professional', 'student']]
+        indexes = [
+            # Paginação por cursor (created_at, id) da lista de alunos do profissional
+            models.Index(fields=('professional', '-created_at', '-id'), name='users_prostudent_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.professional.email} -> {self.student.email}"
+
+
+class StripeEvent(models.Model):
+    """Evento de webhook do Stripe (um registro por ID), processado em segundo plano por users.webhooks."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pendente'
+        PROCESSED = 'processed', 'Processado'
+        IGNORED = 'ignored', 'Ignorado'
+        FAILED = 'failed', 'Falhou'
+
+    event_id = models.CharField('ID do evento', max_length=255, unique=True)
+    type = models.CharField('tipo', max_length=100)
+    # Ordem de processamento: momento em que o Stripe criou o evento (não o de chegada)
+    created = models.DateTimeField('criado no Stripe')
+    payload = models.JSONField('evento')
+    status = models.CharField('status', max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField('tentativas', default=0)
+    last_error = models.TextField('último erro', blank=True)
+    received_at = models.DateTimeField('recebido em', auto_now_add=True)
+    processed_at = models.DateTimeField('processado em', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'evento do Stripe'
+        verbose_name_plural = 'eventos do Stripe'
+        ordering = ('created', 'id')
+        indexes = [
+            models.Index(fields=('status', 'created', 'id'), name='users_stripeevent_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.type} {self.event_id} ({self.get_status_display()})'
+
+
+class StripeReconciliation(models.Model):
+    """
+    Execução da conciliação com o Stripe (users.reconciliation). `watermark` é a criação da
+    sessão mais recente vista; a próxima execução parte dela (menos a sobreposição).
+    """
+
+    class Status(models.TextChoices):
+        RUNNING = 'running', 'Em andamento'
+        SUCCEEDED = 'succeeded', 'Concluída'
+        FAILED = 'failed', 'Falhou'
+
+    started_at = models.DateTimeField('início', auto_now_add=True)
+    finished_at = models.DateTimeField('fim', null=True, blank=True)
+    status = models.CharField('status', max_length=20, choices=Status.choices, default=Status.RUNNING)
+    dry_run = models.BooleanField('simulação', default=False)
+    since = models.DateTimeField('sessões desde', null=True, blank=True)
+    watermark = models.DateTimeField('marca d\'água', null=True, blank=True)
+    summary = models.JSONField('resumo', default=dict, blank=True)
+    error = models.TextField('erro', blank=True)
+
+    class Meta:
+        verbose_name = 'conciliação do Stripe'
+        verbose_name_plural = 'conciliações do Stripe'
+        ordering = ('-started_at', '-id')
+
+    def __str__(self):
+        return f'Conciliação {self.started_at:%Y-%m-%d %H:%M} ({self.get_status_display()})'
@@ -0,0 +1,191 @@
+"""
+Conciliação do acesso dos profissionais com os pagamentos no Stripe.
+
+O acesso só é liberado pelo webhook checkout.session.completed; se um evento se perde,
+subscription_status fica errado. reconcile() percorre as sessões de checkout concluídas e
+depois os PaymentIntents pagos criados desde a marca d'água da última execução, página a
+página (STRIPE_RECONCILE_PAGE_SIZE), e compara os pagamentos com os usuários de
+metadata.user_id: por página, um in_bulk para os usuários e um bulk_update para os que
+precisam de ajuste. Só a página atual fica na memória; cada linha do relatório vai para
+`on_row` (o comando reconcilestripe grava CSV).
+
+Uma sessão aberta pode ser paga horas depois de criada e a listagem é por data de
+criação, então cada execução recomeça STRIPE_RECONCILE_OVERLAP segundos antes da marca
+d'água (StripeReconciliation) da última execução concluída. O PaymentIntent do checkout
+é criado quando o cliente paga e recebe o mesmo metadata.user_id (payment_intent_data),
+então também acha o pagamento de uma sessão criada antes da janela. PaymentIntents sem
+metadata.user_id (de antes disso) ficam de fora; a sessão deles ainda é listada.
+Reaplicar é idempotente: quem já está ativo fica como está. bulk_update não passa por
+User.save(), então token_version é incrementado e o cache da versão invalidado aqui.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import checkout_cache, stripe_client
+from .authentication import invalidate_token_version
+from .models import StripeReconciliation, User
+
+logger = logging.getLogger(__name__)
+
+ACTIVATED = 'activated'
+CUSTOMER_LINKED = 'customer_linked'
+UP_TO_DATE = 'up_to_date'
+UNKNOWN_USER = 'unknown_user'
+SKIPPED = 'skipped'
+ACTIONS = (ACTIVATED, CUSTOMER_LINKED, UP_TO_DATE, UNKNOWN_USER, SKIPPED)
+
+REPORT_FIELDS = ('stripe_id', 'object', 'created', 'user_id', 'email', 'previous_status', 'action')
+PAID_STATUSES = ('paid', 'no_payment_required')
+
+
+def page_size():
+    # Limite da API de listagem do Stripe: 100
+    return min(max(getattr(settings, 'STRIPE_RECONCILE_PAGE_SIZE', 100), 1), 100)
+
+
+def overlap():
+    return timedelta(seconds=getattr(settings, 'STRIPE_RECONCILE_OVERLAP', 48 * 60 * 60))
+
+
+def last_watermark():
+    """Marca d'água da execução concluída mais recente (simulações não contam)."""
+    return (
+        StripeReconciliation.objects
+        .filter(status=StripeReconciliation.Status.SUCCEEDED, dry_run=False, watermark__isnull=False)
+        .order_by('-watermark')
+        .values_list('watermark', flat=True)
+        .first()
+    )
+
+
+def _timestamp(value):
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+def _pages(list_page, since, keep=None, **params):
+    """Páginas (listas de dicts) de uma listagem do Stripe, mais recentes primeiro."""
+    params['limit'] = page_size()
+    if since is not None:
+        params['created'] = {'gte': int(since.timestamp())}
+    while True:
+        page = list_page(params)
+        objects = [obj.to_dict() for obj in page.data]
+        kept = [obj for obj in objects if keep is None or keep(obj)]
+        if kept:
+            yield kept
+        if not page.has_more or not objects:
+            return
+        params['starting_after'] = objects[-1]['id']
+
+
+def sessions_pages(since=None):
+    """Sessões de checkout concluídas criadas desde `since`."""
+    return _pages(stripe_client.list_checkout_sessions, since, status='complete')
+
+
+def _paid_intent(intent):
+    return intent.get('status') == 'succeeded' and bool((intent.get('metadata') or {}).get('user_id'))
+
+
+def payments_pages(since=None):
+    """PaymentIntents pagos com metadata.user_id criados desde `since` (a API não filtra por status)."""
+    for intents in _pages(stripe_client.list_payment_intents, since, keep=_paid_intent):
+        # Mesmo formato das sessões para _reconcile_page
+        yield [{**intent, 'mode': 'payment', 'payment_status': 'paid'} for intent in intents]
+
+
+def _reconcile_page(sessions, dry_run):
+    """Compara uma página de sessões (ou PaymentIntents) com os usuários; devolve as linhas do relatório."""
+    rows, paid = [], []
+    for session in sessions:
+        user_id = str((session.get('metadata') or {}).get('user_id') or '')
+        row = dict.fromkeys(REPORT_FIELDS, '')
+        row.update(
+            stripe_id=session['id'], object=session.get('object', ''),
+            created=_timestamp(session['created']).isoformat(), user_id=user_id,
+        )
+        if session.get('mode') != 'payment' or session.get('payment_status') not in PAID_STATUSES:
+            row['action'] = SKIPPED
+        elif not user_id.isdigit():
+            row['action'] = UNKNOWN_USER
+        else:
+            paid.append((row, session))
+        rows.append(row)
+
+    users = User.objects.in_bulk({int(row['user_id']) for row, _ in paid})
+    changed = {}
+    for row, session in paid:
+        user = users.get(int(row['user_id']))
+        if user is None:
+            row['action'] = UNKNOWN_USER
+            continue
+        row['email'] = user.email
+        row['previous_status'] = user.subscription_status
+        customer = session.get('customer') or ''
+        if user.subscription_status != User.SubscriptionStatus.ACTIVE:
+            user.subscription_status = User.SubscriptionStatus.ACTIVE
+            user.stripe_customer_id = user.stripe_customer_id or customer
+            row['action'] = ACTIVATED
+            changed[user.pk] = user
+        elif not user.stripe_customer_id and customer:
+            user.stripe_customer_id = customer
+            row['action'] = CUSTOMER_LINKED
+            changed[user.pk] = user
+        else:
+            row['action'] = UP_TO_DATE
+
+    activated = [row['user_id'] for row in rows if row['action'] == ACTIVATED]
+    if changed and not dry_run:
+        with transaction.atomic():
+            User.objects.bulk_update(changed.values(), ['subscription_status', 'stripe_customer_id'])
+            if activated:
+                # subscription_status é claim do token (ver User.save)
+                User.objects.filter(pk__in=activated).update(token_version=F('token_version') + 1)
+                transaction.on_commit(lambda: invalidate_token_version(*activated))
+        for user_id in activated:
+            checkout_cache.invalidate(user_id)
+    return rows
+
+
+def reconcile(since=None, full=False, dry_run=False, on_row=None):
+    """
+    Concilia as sessões e PaymentIntents criados desde `since` (default: marca d'água -
+    sobreposição; `full`: todos). Chama `on_row(linha)` para cada um e devolve a
+    StripeReconciliation gravada.
+    """
+    previous = last_watermark()
+    if since is None and not full and previous is not None:
+        since = previous - overlap()
+    run = StripeReconciliation.objects.create(since=since, dry_run=dry_run, watermark=previous)
+    counts = Counter()
+    try:
+        for sessions in chain(sessions_pages(since), payments_pages(since)):
+            counts['pages'] += 1
+            newest = _timestamp(max(session['created'] for session in sessions))
+            if run.watermark is None or newest > run.watermark:
+                run.watermark = newest
+            for row in _reconcile_page(sessions, dry_run):
+                counts[row['action']] += 1
+                if on_row is not None:
+                    on_row(row)
+    except Exception as exc:
+        logger.exception('Conciliação com o Stripe falhou')
+        run.status = StripeReconciliation.Status.FAILED
+        run.error = str(exc)
+        # Marca d'água não avança: a próxima execução refaz o intervalo
+        run.watermark = previous
+        raise
+    else:
+        run.status = StripeReconciliation.Status.SUCCEEDED
+    finally:
+        run.summary = {'objects': sum(counts[action] for action in ACTIONS), **counts}
+        run.finished_at = timezone.now()
+        run.save(update_fields=['status', 'error', 'watermark', 'summary', 'finished_at'])
+    return run
@@ -0,0 +1,34 @@
+"""
+Signals do app users: mantém coerentes o cache de visibilidade dos alunos e a
+versão das claims do token (perfil profissional criado/removido).
+"""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_token_version
+from .models import ProfessionalProfile, ProfessionalStudent, User
+from .visibility import invalidate_student_visibility
+
+
+@receiver(post_save, sender=ProfessionalStudent)
+@receiver(post_delete, sender=ProfessionalStudent)
+def invalidate_visibility_on_link_change(sender, instance, **kwargs):
+    """Vínculo criado/removido: descarta o conjunto em cache do aluno."""
+    student_id = instance.student_id
+    invalidate_student_visibility(student_id)
+    # Requisições concorrentes podem repovoar o cache antes do commit; invalida de novo ao final.
+    transaction.on_commit(lambda: invalidate_student_visibility(student_id))
+
+
+@receiver(post_save, sender=ProfessionalProfile)
+@receiver(post_delete, sender=ProfessionalProfile)
+def bump_token_version_on_profile_change(sender, instance, created=None, **kwargs):
+    """A claim 'professional' do token muda só na criação/remoção do perfil."""
+    if created is False:
+        return
+    user_id = instance.user_id
+    User.objects.filter(pk=user_id).update(token_version=F('token_version') + 1)
+    invalidate_token_version(user_id)
+    transaction.on_commit(lambda: invalidate_token_version(user_id))
@@ -0,0 +1,209 @@
+"""
+Cliente Stripe compartilhado (checkout, portal e conciliação).
+
+- Um StripeClient por processo, com sessão HTTP (requests) reaproveitada e pool de
+  conexões de STRIPE_POOL_SIZE: sem novo handshake TLS a cada chamada.
+- Timeouts curtos de conexão/leitura (STRIPE_CONNECT_TIMEOUT/STRIPE_READ_TIMEOUT) em vez
+  dos 80 s padrão da biblioteca, para não prender um worker do gunicorn.
+- Novas tentativas (STRIPE_MAX_RETRIES) com backoff exponencial e jitter da própria
+  biblioteca; toda escrita leva uma idempotency key, então repetir não duplica a operação.
+- Circuit breaker por processo: com taxa de falhas (rede, timeout, 429, 5xx) acima de
+  STRIPE_BREAKER_THRESHOLD nas últimas STRIPE_BREAKER_WINDOW chamadas, as chamadas
+  falham na hora com StripeUnavailable (as views respondem 503) por
+  STRIPE_BREAKER_COOLDOWN segundos; depois uma chamada de teste decide se o circuito fecha.
+
+STRIPE_API_BASE aponta o cliente para um substituto local da API (ex.: comando
+`stripestub` ou stripe-mock) em testes.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+
+import requests
+import stripe
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class StripeUnavailable(Exception):
+    """Stripe fora do ar (circuito aberto ou falha de rede/servidor após as novas tentativas)."""
+
+    def __init__(self, message='Stripe indisponível no momento. Tente novamente em instantes.', retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_outage(exc):
+    """Falhas do lado do Stripe/rede (contam para o circuit breaker); erros do pedido não contam."""
+    if isinstance(exc, (stripe.APIConnectionError, stripe.RateLimitError)):
+        return True
+    return isinstance(exc, stripe.StripeError) and (exc.http_status or 0) >= 500
+
+
+class CircuitBreaker:
+    """Janela deslizante das últimas chamadas; aberto por `cooldown` s quando a taxa de falha passa do limite."""
+
+    def __init__(self, window, threshold, min_calls, cooldown):
+        self.window = window
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._results = deque(maxlen=window)
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            return 'half-open' if time.monotonic() - self._opened_at >= self.cooldown else 'open'
+
+    def before_call(self):
+        """Levanta StripeUnavailable com o circuito aberto; True se esta chamada é a de teste."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._probing:
+                raise StripeUnavailable(retry_after=max(int(remaining), 1))
+            # Meio-aberto: só uma chamada de teste por vez
+            self._probing = True
+            return True
+
+    def release_probe(self):
+        """Libera a chamada de teste que terminou sem record() (ex.: exceção fora de StripeError)."""
+        with self._lock:
+            self._probing = False
+
+    def record(self, success):
+        with self._lock:
+            if self._opened_at is not None:
+                self._probing = False
+                if success:
+                    logger.info('Circuit breaker do Stripe fechado.')
+                    self._opened_at = None
+                    self._results.clear()
+                else:
+                    self._opened_at = time.monotonic()
+                return
+            self._results.append(success)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.threshold:
+                logger.warning('Circuit breaker do Stripe aberto: %s falhas em %s chamadas.', failures, len(self._results))
+                self._opened_at = time.monotonic()
+
+
+_lock = threading.Lock()
+_state = {}
+
+
+def _config():
+    return (
+        settings.STRIPE_SECRET_KEY,
+        _setting('STRIPE_API_BASE', ''),
+        _setting('STRIPE_CONNECT_TIMEOUT', 3),
+        _setting('STRIPE_READ_TIMEOUT', 10),
+        _setting('STRIPE_MAX_RETRIES', 2),
+        _setting('STRIPE_POOL_SIZE', 10),
+    )
+
+
+def _build(config):
+    api_key, api_base, connect_timeout, read_timeout, max_retries, pool_size = config
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return stripe.StripeClient(
+        api_key,
+        base_addresses={'api': api_base} if api_base else None,
+        max_network_retries=max_retries,
+        http_client=stripe.RequestsClient(timeout=(connect_timeout, read_timeout), session=session),
+    )
+
+
+def get_client():
+    """StripeClient do processo (recriado se as configurações mudarem, ex.: override_settings)."""
+    config = _config()
+    with _lock:
+        if _state.get('config') != config:
+            _state['config'] = config
+            _state['client'] = _build(config)
+        return _state['client']
+
+
+def breaker():
+    with _lock:
+        if 'breaker' not in _state:
+            _state['breaker'] = CircuitBreaker(
+                window=_setting('STRIPE_BREAKER_WINDOW', 20),
+                threshold=_setting('STRIPE_BREAKER_THRESHOLD', 0.5),
+                min_calls=_setting('STRIPE_BREAKER_MIN_CALLS', 5),
+                cooldown=_setting('STRIPE_BREAKER_COOLDOWN', 30),
+            )
+        return _state['breaker']
+
+
+def reset():
+    """Descarta cliente e circuit breaker (testes)."""
+    with _lock:
+        _state.clear()
+
+
+def new_idempotency_key(prefix='myfit'):
+    return f'{prefix}-{uuid.uuid4().hex}'
+
+
+def call(operation, params=None, idempotency_key=None, write=True):
+    """
+    Executa `operation(client)(params=..., options=...)` com o circuit breaker. Escritas levam
+    idempotency key (a informada ou uma nova, repetida nas novas tentativas). Falhas de
+    rede/servidor viram StripeUnavailable; erros do pedido (StripeError) sobem como estão.
+    """
+    circuit = breaker()
+    probe = circuit.before_call()
+    options = {}
+    if write:
+        options['idempotency_key'] = idempotency_key or new_idempotency_key()
+    try:
+        try:
+            result = operation(get_client())(params=params or {}, options=options)
+        except stripe.StripeError as exc:
+            outage = is_outage(exc)
+            circuit.record(not outage)
+            if outage:
+                logger.warning('Falha ao chamar o Stripe: %s', exc)
+                raise StripeUnavailable() from exc
+            raise
+        circuit.record(True)
+        return result
+    finally:
+        if probe:
+            # Sem isso uma exceção inesperada na chamada de teste deixaria o circuito aberto para sempre
+            circuit.release_probe()
+
+
+def create_checkout_session(params, idempotency_key=None):
+    return call(lambda client: client.v1.checkout.sessions.create, params, idempotency_key)
+
+
+def create_portal_session(params, idempotency_key=None):
+    return call(lambda client: client.v1.billing_portal.sessions.create, params, idempotency_key)
+
+
+def list_checkout_sessions(params):
+    return call(lambda client: client.v1.checkout.sessions.list, params, write=False)
+
+
+def list_payment_intents(params):
+    return call(lambda client: client.v1.payment_intents.list, params, write=False)
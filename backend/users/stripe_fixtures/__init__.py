@@ -0,0 +1,46 @@
+"""
+Payloads de webhook do Stripe para testes locais, sem conta no Stripe.
+
+Os arquivos JSON deste diretório são eventos reais simplificados; `event()` carrega um
+deles com ID e data novos (ou os informados) e campos do data.object sobrescritos, e
+`signature()` gera o header Stripe-Signature (esquema v1) com o segredo do webhook, como
+o Stripe faz. Usado pelo comando sendstripefixture e pelo benchapi.
+"""
+import copy
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+DIRECTORY = Path(__file__).resolve().parent
+
+
+def names():
+    return sorted(path.stem for path in DIRECTORY.glob('*.json'))
+
+
+@lru_cache(maxsize=None)
+def _load(name):
+    path = DIRECTORY / f'{name}.json'
+    if not path.exists():
+        raise LookupError(f'Fixture do Stripe inexistente: {name} (disponíveis: {", ".join(names())})')
+    return json.loads(path.read_text())
+
+
+def event(name, event_id=None, created=None, **object_fields):
+    """Evento `name` com ID único (ou `event_id`), created=agora e data.object atualizado."""
+    data = copy.deepcopy(_load(name))
+    data['id'] = event_id or f'evt_fixture_{uuid.uuid4().hex[:24]}'
+    data['created'] = int(created or time.time())
+    data['data']['object'].update(object_fields)
+    return data
+
+
+def signature(payload, secret, timestamp=None):
+    """Header Stripe-Signature para o payload (str), válido pela tolerância padrão de 5 minutos."""
+    timestamp = int(timestamp or time.time())
+    digest = hmac.new(secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
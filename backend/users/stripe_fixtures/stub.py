@@ -0,0 +1,200 @@
+"""
+Substituto local da API do Stripe para testar users.stripe_client sem rede.
+
+Responde POST /v1/checkout/sessions e /v1/billing_portal/sessions com objetos mínimos
+(id, url, parâmetros recebidos) e repete a mesma resposta para uma Idempotency-Key já
+vista, como o Stripe. GET /v1/checkout/sessions e /v1/payment_intents listam as sessões
+e os PaymentIntents criados ou semeados com add_session()/add_payment_intent() (mais
+recentes primeiro, com created[gte], status, limit e starting_after), para a conciliação
+(users.reconciliation). `delay` (s) e `fail_rate` (0 a 1, respostas `fail_status`)
+simulam lentidão e falhas. Usado pelo comando stripestub; em testes,
+StubServer(port=0).start() roda numa thread e .url vai em STRIPE_API_BASE.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+OBJECTS = {
+    '/v1/checkout/sessions': ('cs_test', 'checkout.session', 'https://checkout.stripe.com/c/pay/'),
+    '/v1/billing_portal/sessions': ('bps_test', 'billing_portal.session', 'https://billing.stripe.com/p/session/'),
+}
+SESSIONS_PATH = '/v1/checkout/sessions'
+PAYMENT_INTENTS_PATH = '/v1/payment_intents'
+# Validade padrão de uma sessão de checkout no Stripe
+SESSION_TTL = 24 * 60 * 60
+
+
+def _nested(pairs):
+    """Parâmetros form-encoded do Stripe (metadata[user_id]=5) em dicts aninhados."""
+    params = {}
+    for key, value in pairs:
+        parts = re.findall(r'[^\[\]]+', key)
+        target = params
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return params
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'stripestub'
+
+    def log_message(self, format, *args):
+        if self.server.stub.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # cliente desistiu (timeout)
+
+    def _begin(self, path, paths):
+        """Conta a requisição e aplica atraso/falha simulados; True se já respondeu."""
+        stub = self.server.stub
+        stub.requests[f'{self.command} {path}'] += 1
+        if stub.delay:
+            time.sleep(stub.delay)
+        if path not in paths:
+            self._send(404, {'error': {'type': 'invalid_request_error', 'message': f'Unrecognized request URL ({path}).'}})
+            return True
+        if stub.fail_rate and random.random() < stub.fail_rate:
+            self._send(stub.fail_status, {'error': {'type': 'api_error', 'message': 'Stub failure.'}})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if self._begin(url.path, (SESSIONS_PATH, PAYMENT_INTENTS_PATH)):
+            return
+        query = dict(parse_qsl(url.query))
+        stub = self.server.stub
+        objects = stub.sessions if url.path == SESSIONS_PATH else stub.payment_intents
+        self._send(200, stub.list_objects(
+            objects, url.path,
+            created_gte=int(query.get('created[gte]', 0)),
+            status=query.get('status'),
+            limit=int(query.get('limit', 10)),
+            starting_after=query.get('starting_after'),
+        ))
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length') or 0)
+        params = _nested(parse_qsl(self.rfile.read(length).decode()))
+        key = self.headers.get('Idempotency-Key')
+        if key:
+            stub.keys[key] += 1
+        if self._begin(self.path, OBJECTS):
+            return
+        with stub.lock:
+            replayed = key in stub.responses
+            if not replayed:
+                prefix, kind, url = OBJECTS[self.path]
+                object_id = f'{prefix}_{uuid.uuid4().hex[:24]}'
+                created = int(time.time())
+                body = {
+                    'id': object_id, 'object': kind, 'url': url + object_id,
+                    'created': created, 'expires_at': created + SESSION_TTL, **params,
+                }
+                if self.path == SESSIONS_PATH:
+                    body.update(status='open', payment_status='unpaid')
+                    stub.sessions[object_id] = body
+                if key:
+                    stub.responses[key] = body
+        if replayed:
+            return self._send(200, stub.responses[key], [('Idempotent-Replayed', 'true')])
+        self._send(200, body)
+
+
+class StubServer:
+    def __init__(self, host='127.0.0.1', port=12111, delay=0, fail_rate=0, fail_status=500, verbose=False):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.verbose = verbose
+        self.requests = Counter()
+        self.keys = Counter()
+        self.responses = {}
+        self.sessions = {}
+        self.payment_intents = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def add_session(self, user_id=None, **fields):
+        """Semeia uma sessão de checkout paga (como se o webhook tivesse se perdido)."""
+        created = int(fields.pop('created', None) or time.time())
+        session = {
+            'id': f'cs_test_{uuid.uuid4().hex[:24]}', 'object': 'checkout.session', 'url': None,
+            'created': created, 'expires_at': created + SESSION_TTL, 'mode': 'payment',
+            'status': 'complete', 'payment_status': 'paid', 'customer': f'cus_{uuid.uuid4().hex[:14]}',
+            'metadata': {'user_id': str(user_id)} if user_id is not None else {},
+            **fields,
+        }
+        with self.lock:
+            self.sessions[session['id']] = session
+        return session
+
+    def add_payment_intent(self, user_id=None, **fields):
+        """Semeia um PaymentIntent pago (metadata.user_id vem de payment_intent_data do checkout)."""
+        created = int(fields.pop('created', None) or time.time())
+        intent = {
+            'id': f'pi_test_{uuid.uuid4().hex[:24]}', 'object': 'payment_intent', 'created': created,
+            'amount': 3970, 'currency': 'brl', 'status': 'succeeded', 'customer': f'cus_{uuid.uuid4().hex[:14]}',
+            'metadata': {'user_id': str(user_id)} if user_id is not None else {},
+            **fields,
+        }
+        with self.lock:
+            self.payment_intents[intent['id']] = intent
+        return intent
+
+    def list_sessions(self, created_gte=0, status=None, limit=10, starting_after=None):
+        return self.list_objects(self.sessions, SESSIONS_PATH, created_gte, status, limit, starting_after)
+
+    def list_objects(self, objects, url, created_gte=0, status=None, limit=10, starting_after=None):
+        with self.lock:
+            # Mais recentes primeiro (ordem de inserção como desempate), como o Stripe
+            items = sorted(
+                enumerate(objects.values()), key=lambda item: (item[1]['created'], item[0]), reverse=True,
+            )
+        items = [
+            obj for _, obj in items
+            if obj['created'] >= created_gte and (status is None or obj.get('status') == status)
+        ]
+        if starting_after:
+            ids = [obj['id'] for obj in items]
+            items = items[ids.index(starting_after) + 1:] if starting_after in ids else []
+        return {'object': 'list', 'url': url, 'has_more': len(items) > limit, 'data': items[:limit]}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -1,7 +1,10 @@
 """
 Stripe: pagamento único (R$ 39,70) para o profissional acessar o sistema.
-Checkout em modo 'payment'; webhook checkout.session.completed ativa o acesso.
+Checkout em modo 'payment'; webhook checkout.session.completed ativa o acesso
+(processado em segundo plano, ver users.webhooks).
 """
+import json
+
 import stripe
 from django.conf import settings
 from django.http import HttpResponse
@@ -11,11 +14,22 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from core.permissions import IsProfessional
-from .models import User
+from . import checkout_cache, stripe_client, webhooks
+from .stripe_client import StripeUnavailable
+
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+def _unavailable(exc):
+    """503 com Retry-After: Stripe fora do ar ou circuit breaker aberto."""
+    response = Response(
+        {'success': False, 'error': {'message': str(exc)}},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    if exc.retry_after:
+        response['Retry-After'] = str(exc.retry_after)
+    return response
 
 
 def _checkout_session_params(user):
@@ -38,6 +52,8 @@ def _checkout_session_params(user):
         'success_url': success_url,
         'cancel_url': cancel_url,
         'metadata': {'user_id': user.id},
+        # No PaymentIntent também: a conciliação acha o pagamento mesmo fora da listagem de sessões
+        'payment_intent_data': {'metadata': {'user_id': user.id}},
     }
     if user.stripe_customer_id:
         params['customer'] = user.stripe_customer_id
@@ -48,6 +64,7 @@ def _checkout_session_params(user):
 
 class CreateCheckoutSessionView(APIView):
     """Cria sessão de checkout Stripe para pagamento único (acesso ao sistema)."""
+    authentication_classes = [JWTAuthentication]  # usa e-mail e customer_id do usuário
     permission_classes = [IsAuthenticated, IsProfessional]
 
     def post(self, request):
@@ -62,12 +79,23 @@ class CreateCheckoutSessionView(APIView):
                 {'success': False, 'error': {'message': 'Apenas profissionais podem realizar o pagamento.'}},
                 status=status.HTTP_403_FORBIDDEN,
             )
+        params = _checkout_session_params(user)
+        # Sessão aberta com os mesmos parâmetros: devolve a mesma, sem chamar o Stripe
+        cached = checkout_cache.get(user.pk, params)
+        if cached is not None:
+            return Response({
+                'success': True,
+                'data': {'checkout_url': cached['url'], 'session_id': cached['id']},
+            })
         try:
-            session = stripe.checkout.Session.create(**_checkout_session_params(user))
+            session = stripe_client.create_checkout_session(params)
+            checkout_cache.store(user.pk, params, session.id, session.url, getattr(session, 'expires_at', None))
             return Response({
                 'success': True,
                 'data': {'checkout_url': session.url, 'session_id': session.id},
             })
+        except StripeUnavailable as e:
+            return _unavailable(e)
         except stripe.error.StripeError as e:
             return Response(
                 {'success': False, 'error': {'message': str(e)}},
@@ -77,6 +105,7 @@ class CreateCheckoutSessionView(APIView):
 
 class CreatePortalSessionView(APIView):
     """Portal do cliente Stripe (histórico de faturas). Mantido para compatibilidade."""
+    authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated, IsProfessional]
 
     def post(self, request):
@@ -93,14 +122,16 @@ class CreatePortalSessionView(APIView):
             )
         return_url = settings.FRONTEND_URL.rstrip('/') + '/dashboard/professional'
         try:
-            session = stripe.billing_portal.Session.create(
-                customer=user.stripe_customer_id,
-                return_url=return_url,
-            )
+            session = stripe_client.create_portal_session({
+                'customer': user.stripe_customer_id,
+                'return_url': return_url,
+            })
             return Response({
                 'success': True,
                 'data': {'portal_url': session.url},
             })
+        except StripeUnavailable as e:
+            return _unavailable(e)
         except stripe.error.StripeError as e:
             return Response(
                 {'success': False, 'error': {'message': str(e)}},
@@ -111,32 +142,22 @@ class CreatePortalSessionView(APIView):
 @csrf_exempt
 @require_POST
 def stripe_webhook(request):
-    """Webhook Stripe: atualiza subscription_status e customer_id do User."""
+    """
+    Webhook Stripe: verifica a assinatura, grava o evento (idempotente por ID) e responde na
+    hora; o processamento (subscription_status/customer_id do User) roda em users.webhooks.
+    """
     payload = request.body
     sig_header = request.META.get('HTTP_STRIPE_SIGNATURE', '')
     webhook_secret = settings.STRIPE_WEBHOOK_SECRET
     if not webhook_secret:
         return HttpResponse('Webhook secret not set', status=500)
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
+        stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
     except ValueError:
         return HttpResponse('Invalid payload', status=400)
     except stripe.error.SignatureVerificationError:
         return HttpResponse('Invalid signature', status=400)
 
-    if event['type'] == 'checkout.session.completed':
-        session = event['data']['object']
-        user_id = (session.get('metadata') or {}).get('user_id')
-        if not user_id:
-            return HttpResponse(status=200)
-        # Pagamento único (mode=payment): ativa acesso do profissional
-        if session.get('mode') == 'payment':
-            try:
-                user = User.objects.get(pk=user_id)
-                user.stripe_customer_id = session.get('customer') or user.stripe_customer_id or ''
-                user.subscription_status = User.SubscriptionStatus.ACTIVE
-                user.save(update_fields=['stripe_customer_id', 'subscription_status'])
-            except User.DoesNotExist:
-                pass
-
+    # stripe>=8 não expõe mais StripeObject como dict; usa o JSON já verificado
+    webhooks.ingest(json.loads(payload))
     return HttpResponse(status=200)
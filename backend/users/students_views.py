@@ -2,40 +2,69 @@
 API para o profissional gerenciar seus alunos (quem pode ver seus vídeos).
 Requer assinatura ativa.
 """
+import csv
+import json
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 
+from core.pagination import KeysetPagination
 from core.permissions import IsProfessional, HasActiveSubscription
-from .models import ProfessionalStudent
+from . import enrollment
+from .models import STUDENT_SEARCH_FIELDS, ProfessionalStudent
 
 User = get_user_model()
 
 
+EXPORT_COLUMNS = ('id', 'student_id', 'email', 'first_name', 'last_name', 'created_at')
+# Relatório do vínculo em lote: acima disso o arquivo temporário vai para o disco
+REPORT_MEMORY_SIZE = 1024 * 1024
+REPORT_READ_SIZE = 64 * 1024
+
+
+def search_students(queryset, term):
+    """Cada palavra do termo precisa aparecer (trecho) no e-mail, nome ou sobrenome do aluno."""
+    for word in (term or '').split()[:5]:
+        match = Q()
+        for field in STUDENT_SEARCH_FIELDS:
+            match |= Q(**{f'student__{field}__icontains': word})
+        queryset = queryset.filter(match)
+    return queryset
+
+
+def roster_queryset(professional_id, search=None):
+    """Alunos do profissional como dicts (EXPORT_COLUMNS), do vínculo mais recente ao mais antigo."""
+    queryset = ProfessionalStudent.objects.filter(professional_id=professional_id)
+    return search_students(queryset, search).values(
+        'id', 'student_id', 'created_at',
+        email=F('student__email'), first_name=F('student__first_name'), last_name=F('student__last_name'),
+    ).order_by('-created_at', '-id')
+
+
 class StudentListCreateView(generics.ListCreateAPIView):
-    """Lista alunos do profissional e adiciona por e-mail."""
+    """
+    Lista alunos do profissional (paginação por cursor, ?search= por e-mail/nome) e
+    adiciona por e-mail.
+    """
     permission_classes = [IsAuthenticated, IsProfessional, HasActiveSubscription]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return ProfessionalStudent.objects.filter(
-            professional=self.request.user
-        ).select_related('student').order_by('-created_at')
+        return roster_queryset(self.request.user.pk, self.request.query_params.get('search'))
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        data = [
-            {
-                'id': ps.id,
-                'student_id': ps.student_id,
-                'email': ps.student.email,
-                'first_name': ps.student.first_name,
-                'last_name': ps.student.last_name,
-                'created_at': ps.created_at,
-            }
-            for ps in qs
-        ]
-        return Response({'success': True, 'data': data})
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(page)
 
     def create(self, request, *args, **kwargs):
         email = (request.data.get('email') or '').strip().lower()
@@ -57,7 +86,7 @@ class StudentListCreateView(generics.ListCreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         ps, created = ProfessionalStudent.objects.get_or_create(
-            professional=request.user,
+            professional_id=request.user.pk,
             student=student,
         )
         if not created:
@@ -78,12 +107,132 @@ class StudentListCreateView(generics.ListCreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+def _file_blocks(request, fh):
+    """Conteúdo de `fh` em blocos para StreamingHttpResponse; fecha o arquivo no fim."""
+    # No ASGI o Django consome iteradores síncronos inteiros antes de enviar: lá um gerador async
+    if isinstance(request._request, ASGIRequest):
+        async def blocks():
+            try:
+                while True:
+                    block = await sync_to_async(fh.read)(REPORT_READ_SIZE)
+                    if not block:
+                        return
+                    yield block
+            finally:
+                fh.close()
+    else:
+        def blocks():
+            with fh:
+                yield from iter(lambda: fh.read(REPORT_READ_SIZE), '')
+    return blocks()
+
+
+class _Echo:
+    """Destino do csv.writer que só devolve a linha (para StreamingHttpResponse)."""
+
+    def write(self, value):
+        return value
+
+
+class StudentBulkCreateView(APIView):
+    """
+    Adiciona alunos em lote. JSON {"emails": [...]} devolve o relatório por linha em JSON;
+    upload multipart de um CSV (campo "file") devolve o relatório em CSV (linha, email, status,
+    student_id). O vínculo roda dentro da requisição (transações e métricas/orçamento de
+    queries valem); o relatório vai para um arquivo temporário (em disco acima de
+    REPORT_MEMORY_SIZE) e só a resposta é enviada em streaming.
+    """
+    permission_classes = [IsAuthenticated, IsProfessional, HasActiveSubscription]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is not None:
+            return self._csv_report(request, enrollment.enroll(request.user.pk, enrollment.csv_emails(upload.file)))
+        emails = request.data.get('emails') if isinstance(request.data, dict) else request.data
+        if not isinstance(emails, list) or not emails:
+            return Response(
+                {'success': False, 'error': {'message': 'Envie "emails" (lista) ou um arquivo CSV em "file".'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        report = list(enrollment.enroll(request.user.pk, (str(email) for email in emails)))
+        return Response({
+            'success': True,
+            'data': {'summary': enrollment.summarize(report), 'rows': report},
+        })
+
+    def _csv_report(self, request, report):
+        fh = tempfile.SpooledTemporaryFile(max_size=REPORT_MEMORY_SIZE, mode='w+', encoding='utf-8', newline='')
+        writer = csv.writer(fh)
+        writer.writerow(['row', 'email', 'status', 'student_id'])
+        for item in report:
+            writer.writerow([item['row'], item['email'], item['status'], item['student_id'] or ''])
+        fh.seek(0)
+        response = StreamingHttpResponse(_file_blocks(request, fh), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="alunos-relatorio.csv"'
+        return response
+
+
+class StudentExportView(APIView):
+    """
+    Exporta a lista de alunos (?output=csv|ndjson, aceita ?search=) em streaming: as linhas
+    são lidas com iterator(chunk_size=STUDENT_EXPORT_CHUNK_SIZE) e enviadas enquanto chegam.
+    """
+    permission_classes = [IsAuthenticated, IsProfessional, HasActiveSubscription]
+
+    def get(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            return Response(
+                {'success': False, 'error': {'message': 'Formato inválido: use output=csv ou output=ndjson.'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = roster_queryset(request.user.pk, request.query_params.get('search'))
+        if output == 'csv':
+            writer = csv.writer(_Echo())
+            header = writer.writerow(EXPORT_COLUMNS)
+
+            def encode(row):
+                return writer.writerow([
+                    row['created_at'].isoformat() if column == 'created_at' else row[column]
+                    for column in EXPORT_COLUMNS
+                ])
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            header = None
+
+            def encode(row):
+                return json.dumps({column: row[column] for column in EXPORT_COLUMNS}, cls=DjangoJSONEncoder) + '\n'
+            content_type = 'application/x-ndjson'
+        response = StreamingHttpResponse(
+            self._stream(request, queryset, encode, header), content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="alunos.{output}"'
+        return response
+
+    def _stream(self, request, queryset, encode, header):
+        # No ASGI o Django consome iteradores síncronos inteiros antes de enviar: lá usa aiterator()
+        chunk_size = getattr(settings, 'STUDENT_EXPORT_CHUNK_SIZE', 2000)
+        if isinstance(request._request, ASGIRequest):
+            async def rows():
+                if header is not None:
+                    yield header
+                async for row in queryset.aiterator(chunk_size=chunk_size):
+                    yield encode(row)
+        else:
+            def rows():
+                if header is not None:
+                    yield header
+                for row in queryset.iterator(chunk_size=chunk_size):
+                    yield encode(row)
+        return rows()
+
+
 class StudentDestroyView(generics.DestroyAPIView):
     """Remove um aluno da lista do profissional."""
     permission_classes = [IsAuthenticated, IsProfessional, HasActiveSubscription]
 
     def get_queryset(self):
-        return ProfessionalStudent.objects.filter(professional=self.request.user)
+        return ProfessionalStudent.objects.filter(professional_id=self.request.user.pk)
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
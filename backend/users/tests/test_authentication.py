@@ -0,0 +1,22 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import ClaimsJWTAuthentication, ClaimsUser, set_user_claims
+from users.models import User
+
+
+class ClaimsUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='pro@example.com', username='pro', role=User.Role.PROFESSIONAL)
+
+    def test_string_user_id_claim_is_integer_pk(self):
+        token = set_user_claims(AccessToken.for_user(self.user), self.user)
+        token[api_settings.USER_ID_CLAIM] = str(self.user.pk)
+        user = ClaimsJWTAuthentication().get_user(token)
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.id, self.user.pk)
+        self.assertIsInstance(user.pk, int)
@@ -0,0 +1,80 @@
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from users import reconciliation, stripe_client
+from users.authentication import current_token_version
+from users.models import StripeReconciliation, User
+from users.stripe_fixtures.stub import StubServer
+
+
+class ReconciliationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.stub = StubServer(port=0).start()
+        self.addCleanup(self.stub.stop)
+        settings_override = override_settings(
+            STRIPE_SECRET_KEY='sk_test_stub', STRIPE_API_BASE=self.stub.url, STRIPE_MAX_RETRIES=0,
+            STRIPE_RECONCILE_PAGE_SIZE=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        stripe_client.reset()
+        self.addCleanup(stripe_client.reset)
+
+    def professional(self, name):
+        return User.objects.create(email=f'{name}@example.com', username=name, role=User.Role.PROFESSIONAL)
+
+    def reconcile(self, **kwargs):
+        rows = []
+        with self.captureOnCommitCallbacks(execute=True):
+            run = reconciliation.reconcile(on_row=rows.append, **kwargs)
+        return run, {row['stripe_id']: row['action'] for row in rows}
+
+    def test_paid_sessions_activate_users_across_pages(self):
+        users = [self.professional(f'pro{n}') for n in range(3)]
+        sessions = [self.stub.add_session(user_id=user.pk) for user in users]
+        self.stub.add_session(user_id=users[0].pk, payment_status='unpaid')
+        # Versão das claims em cache: tem de ser invalidada depois do commit
+        current_token_version(users[0].pk)
+        run, actions = self.reconcile()
+        self.assertEqual(run.status, StripeReconciliation.Status.SUCCEEDED)
+        self.assertEqual(run.summary['pages'], 2)
+        self.assertEqual([actions[s['id']] for s in sessions], [reconciliation.ACTIVATED] * 3)
+        self.assertIn(reconciliation.SKIPPED, actions.values())
+        for user, session in zip(users, sessions):
+            user.refresh_from_db()
+            self.assertEqual(user.subscription_status, User.SubscriptionStatus.ACTIVE)
+            self.assertEqual(user.stripe_customer_id, session['customer'])
+        self.assertEqual(current_token_version(users[0].pk), users[0].token_version)
+
+    def test_payment_intent_found_when_session_is_outside_the_window(self):
+        user = self.professional('late')
+        old = int(time.time()) - 10 * 24 * 60 * 60
+        self.stub.add_session(user_id=user.pk, created=old)
+        intent = self.stub.add_payment_intent(user_id=user.pk)
+        self.stub.add_payment_intent(user_id=user.pk, status='requires_payment_method')
+        self.stub.add_payment_intent()  # sem metadata.user_id: fora do checkout
+        run, actions = self.reconcile(since=timezone.now() - timedelta(hours=1))
+        self.assertEqual(actions, {intent['id']: reconciliation.ACTIVATED})
+        user.refresh_from_db()
+        self.assertEqual(user.subscription_status, User.SubscriptionStatus.ACTIVE)
+
+    def test_rerun_is_idempotent_and_dry_run_changes_nothing(self):
+        user = self.professional('pro')
+        session = self.stub.add_session(user_id=user.pk)
+        _, actions = self.reconcile(dry_run=True)
+        self.assertEqual(actions[session['id']], reconciliation.ACTIVATED)
+        user.refresh_from_db()
+        self.assertNotEqual(user.subscription_status, User.SubscriptionStatus.ACTIVE)
+        self.reconcile()
+        user.refresh_from_db()
+        version = user.token_version
+        run, actions = self.reconcile()
+        self.assertEqual(actions[session['id']], reconciliation.UP_TO_DATE)
+        user.refresh_from_db()
+        self.assertEqual(user.token_version, version)
+        self.assertIsNotNone(run.watermark)
@@ -0,0 +1,48 @@
+import stripe
+from django.test import SimpleTestCase, override_settings
+
+from users import stripe_client
+from users.stripe_client import StripeUnavailable
+
+
+def _raise(exc):
+    def operation(client):
+        def run(params, options):
+            raise exc
+        return run
+    return operation
+
+
+@override_settings(
+    STRIPE_SECRET_KEY='sk_test_breaker', STRIPE_BREAKER_MIN_CALLS=1,
+    STRIPE_BREAKER_THRESHOLD=0.5, STRIPE_BREAKER_COOLDOWN=0,
+)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        stripe_client.reset()
+        self.addCleanup(stripe_client.reset)
+
+    def _open(self):
+        with self.assertLogs('users.stripe_client', 'WARNING'):
+            with self.assertRaises(StripeUnavailable):
+                stripe_client.call(_raise(stripe.APIConnectionError('sem rede')), write=False)
+        self.assertEqual(stripe_client.breaker().state, 'half-open')
+
+    def test_unexpected_error_in_probe_releases_it(self):
+        self._open()
+        with self.assertRaises(TypeError):
+            stripe_client.call(_raise(TypeError('bug')), write=False)
+        self.assertFalse(stripe_client.breaker()._probing)
+        # A próxima chamada pode testar de novo e fecha o circuito
+        with self.assertLogs('users.stripe_client', 'INFO'):
+            self.assertEqual(stripe_client.call(lambda client: lambda params, options: 'ok', write=False), 'ok')
+        self.assertEqual(stripe_client.breaker().state, 'closed')
+
+    def test_probe_in_flight_blocks_other_calls(self):
+        self._open()
+        circuit = stripe_client.breaker()
+        self.assertTrue(circuit.before_call())
+        with self.assertRaises(StripeUnavailable):
+            circuit.before_call()
+        circuit.release_probe()
+        self.assertTrue(circuit.before_call())
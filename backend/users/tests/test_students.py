@@ -0,0 +1,59 @@
+import re
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, TestCase, override_settings
+
+from core import metrics
+from core.benchmark import auth_client, auth_headers
+from users.models import ProfessionalStudent, User
+from videos.tests.utils import create_professional
+
+URL = '/api/auth/students/bulk/'
+HEADER = 'row,email,status,student_id'
+STATUSES = ['added', 'not_found', 'invalid_email']
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class StudentBulkCsvTests(TestCase):
+    """Relatório CSV do vínculo em lote: vínculo dentro da requisição, resposta em streaming."""
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user, _ = create_professional()
+        self.student = User.objects.create(email='aluno@example.com', username='aluno', role=User.Role.USER)
+        # Token gerado fora do event loop (as claims consultam o banco)
+        self.headers = auth_headers(self.user)
+
+    def _upload(self):
+        content = b'email\naluno@example.com\nninguem@example.com\nnao-e-email\n'
+        return {'file': SimpleUploadedFile('alunos.csv', content, content_type='text/csv')}
+
+    def _check(self, body):
+        lines = body.decode().splitlines()
+        self.assertEqual(lines[0], HEADER)
+        self.assertEqual([line.split(',')[2] for line in lines[1:]], STATUSES)
+        self.assertTrue(ProfessionalStudent.objects.filter(professional_id=self.user.pk, student=self.student).exists())
+        # Queries do vínculo contam na requisição (antes rodavam depois do MetricsMiddleware)
+        queries = re.search(
+            r'myfit_http_request_db_queries_sum\{view="student-bulk-create",method="POST"\} (\S+)',
+            metrics.render_prometheus(),
+        )
+        # Busca dos alunos, vínculos existentes e INSERT do bloco
+        self.assertGreaterEqual(float(queries.group(1)), 3)
+
+    def test_wsgi_report(self):
+        response = auth_client(self.user).post(URL, self._upload())
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        self._check(b''.join(response.streaming_content))
+
+    async def test_asgi_report_streams_asynchronously(self):
+        response = await AsyncClient().post(URL, self._upload(), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        # Iterador síncrono seria consumido inteiro pelo ASGIHandler antes do envio
+        self.assertTrue(response.is_async)
+        await sync_to_async(self._check)(b''.join([block async for block in response.streaming_content]))
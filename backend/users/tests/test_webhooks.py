@@ -0,0 +1,86 @@
+import json
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.models import Job
+from users import stripe_fixtures, webhooks
+from users.models import StripeEvent, User
+
+SECRET = 'whsec_test'
+
+
+@override_settings(ALLOWED_HOSTS=['*'], STRIPE_WEBHOOK_SECRET=SECRET, STRIPE_WEBHOOK_MAX_ATTEMPTS=2)
+class StripeWebhookTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='pro@example.com', username='pro', role=User.Role.PROFESSIONAL)
+
+    def send(self, event, secret=SECRET):
+        payload = json.dumps(event)
+        return self.client.post(
+            '/api/webhooks/stripe/', data=payload, content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=stripe_fixtures.signature(payload, secret),
+        )
+
+    def completed(self, **kwargs):
+        return stripe_fixtures.event(
+            'checkout_session_completed', metadata={'user_id': str(self.user.pk)}, **kwargs,
+        )
+
+    def test_invalid_signature_is_rejected(self):
+        self.assertEqual(self.send(self.completed(), secret='whsec_other').status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_redelivered_event_is_stored_once(self):
+        event = self.completed()
+        for _ in range(3):
+            self.assertEqual(self.send(event).status_code, 200)
+        self.assertEqual(StripeEvent.objects.filter(event_id=event['id']).count(), 1)
+        self.assertTrue(Job.objects.filter(name=webhooks.PROCESS_JOB).exists())
+        self.assertEqual(webhooks.process_pending(), {'processed': 1})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.subscription_status, User.SubscriptionStatus.ACTIVE)
+        self.assertEqual(self.user.stripe_customer_id, 'cus_test_fixture')
+
+    def test_events_are_processed_in_stripe_creation_order(self):
+        now = int(time.time())
+        seen = []
+        for offset in (30, 10, 20):
+            self.send(stripe_fixtures.event('checkout_session_expired', event_id=f'evt_{offset}', created=now - 60 + offset))
+        with mock.patch.dict(webhooks._handlers, {'checkout.session.expired': lambda obj, event: seen.append(event.event_id)}):
+            webhooks.process_pending()
+        self.assertEqual(seen, ['evt_10', 'evt_20', 'evt_30'])
+
+    def test_failing_handler_is_retried_then_marked_failed(self):
+        event = self.completed()
+        self.send(event)
+
+        def broken(obj, event):
+            raise RuntimeError('falhou')
+
+        with mock.patch.dict(webhooks._handlers, {'checkout.session.completed': broken}), \
+                self.assertLogs('users.webhooks', 'ERROR'):
+            self.assertEqual(webhooks.process_pending(), {'pending': 1})
+            stored = StripeEvent.objects.get(event_id=event['id'])
+            self.assertEqual((stored.status, stored.attempts), (StripeEvent.Status.PENDING, 1))
+            self.assertEqual(webhooks.process_pending(), {'failed': 1})
+        stored.refresh_from_db()
+        self.assertEqual((stored.status, stored.attempts), (StripeEvent.Status.FAILED, 2))
+        self.assertIn('RuntimeError', stored.last_error)
+        self.assertIsNotNone(stored.processed_at)
+
+    def test_replaying_completed_is_idempotent(self):
+        self.send(self.completed())
+        webhooks.process_pending()
+        self.user.refresh_from_db()
+        version = self.user.token_version
+        # Reprocessamento (replaystripeevents) e a mesma sessão num evento com outro ID
+        self.assertEqual(webhooks.replay(StripeEvent.objects.all()), 1)
+        self.send(self.completed())
+        self.assertEqual(webhooks.process_pending(), {'processed': 2})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.subscription_status, User.SubscriptionStatus.ACTIVE)
+        self.assertEqual(self.user.token_version, version)
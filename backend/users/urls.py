@@ -13,5 +13,7 @@ urlpatterns = [
     path('stripe/checkout/', stripe_views.CreateCheckoutSessionView.as_view(), name='stripe-checkout'),
     path('stripe/portal/', stripe_views.CreatePortalSessionView.as_view(), name='stripe-portal'),
     path('students/', students_views.StudentListCreateView.as_view(), name='student-list-create'),
+    path('students/bulk/', students_views.StudentBulkCreateView.as_view(), name='student-bulk-create'),
+    path('students/export/', students_views.StudentExportView.as_view(), name='student-export'),
     path('students/<int:pk>/', students_views.StudentDestroyView.as_view(), name='student-destroy'),
 ]
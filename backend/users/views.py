@@ -1,16 +1,21 @@
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 
+from core.async_views import AsyncAPIViewMixin
+from .authentication import set_user_claims
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
 
 User = get_user_model()
 
 
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    # Criar o perfil profissional incrementa token_version no banco (users.signals)
+    user.refresh_from_db(fields=['token_version'])
+    refresh = set_user_claims(RefreshToken.for_user(user), user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -51,9 +56,17 @@ class LoginView(APIView):
         })
 
 
-class MeView(APIView):
-    def get(self, request):
+class MeView(AsyncAPIViewMixin, APIView):
+    async def get(self, request):
+        # Usuário completo (e-mail, nome, perfil) numa query só; a autenticação usa apenas as claims
+        user = await (
+            User.objects.select_related('professional_profile')
+            .filter(pk=request.user.pk, is_active=True)
+            .afirst()
+        )
+        if user is None:
+            raise AuthenticationFailed('Usuário não encontrado.', code='user_not_found')
         return Response({
             'success': True,
-            'data': UserSerializer(request.user).data,
+            'data': UserSerializer(user).data,
         })
@@ -0,0 +1,50 @@
+"""
+Cache do conjunto de profissionais visíveis para cada aluno.
+
+Alunos só enxergam vídeos e categorias dos profissionais a que estão vinculados
+(ProfessionalStudent). Em vez de montar a subquery em toda requisição, guardamos
+os IDs desses profissionais no cache do Django (locmem por padrão; configure
+CACHE_BACKEND para Redis/Memcached quando houver mais de um worker). A invalidação
+é feita pelos signals em users/signals.py.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import ProfessionalStudent
+
+_REQUEST_ATTR = '_visible_professional_ids'
+
+
+def _cache():
+    return caches[getattr(settings, 'VISIBILITY_CACHE_ALIAS', 'default')]
+
+
+def _cache_key(student_id):
+    return f'visibility:student:{student_id}'
+
+
+def visible_professional_ids(user):
+    """
+    IDs (User.pk) dos profissionais vinculados ao aluno.
+    Como ProfessionalProfile usa o user como PK, os mesmos IDs servem para
+    filtrar Video.professional_id / Category.professional_id sem JOIN.
+    """
+    ids = getattr(user, _REQUEST_ATTR, None)
+    if ids is not None:
+        return ids
+    cache = _cache()
+    key = _cache_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            ProfessionalStudent.objects.filter(student_id=user.pk).values_list('professional_id', flat=True)
+        )
+        cache.set(key, ids, getattr(settings, 'VISIBILITY_CACHE_TIMEOUT', 300))
+    setattr(user, _REQUEST_ATTR, ids)
+    return ids
+
+
+def invalidate_student_visibility(*student_ids):
+    """Remove do cache o conjunto de profissionais dos alunos informados."""
+    if student_ids:
+        _cache().delete_many([_cache_key(pk) for pk in student_ids])
@@ -0,0 +1,167 @@
+"""
+Webhooks do Stripe: ingestão idempotente e processamento em segundo plano.
+
+O endpoint só verifica a assinatura, grava o evento em StripeEvent (único por ID do
+evento: reenvios do Stripe viram no-op) e responde 200. O processamento roda na fila
+(core.jobs, tarefa PROCESS_JOB): os eventos pendentes são lidos em lotes, na ordem em que
+o Stripe os criou, com SELECT ... FOR UPDATE SKIP LOCKED, então vários workers não
+processam o mesmo evento. Cada evento roda numa transação própria; uma falha volta o
+evento para a fila até STRIPE_WEBHOOK_MAX_ATTEMPTS tentativas.
+
+Handlers são registrados por tipo com @handler('tipo') e precisam ser idempotentes (um
+evento pode ser reprocessado pelo comando replaystripeevents). Tipos sem handler ficam
+como 'ignored'.
+"""
+import logging
+import traceback
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+from . import checkout_cache
+from .models import StripeEvent, User
+
+logger = logging.getLogger(__name__)
+
+PROCESS_JOB = 'stripe.process_events'
+
+_handlers = {}
+
+
+def handler(event_type):
+    """Registra a função como handler de `event_type` (recebe o data.object e o StripeEvent)."""
+    def decorator(func):
+        _handlers[event_type] = func
+        return func
+    return decorator
+
+
+def batch_size():
+    return getattr(settings, 'STRIPE_WEBHOOK_BATCH_SIZE', 100)
+
+
+def max_attempts():
+    return getattr(settings, 'STRIPE_WEBHOOK_MAX_ATTEMPTS', 5)
+
+
+def schedule():
+    """
+    Agenda o processamento se não houver tarefa na fila (a que está na fila pega os novos
+    eventos). Sem lock: ingestões simultâneas podem agendar uma tarefa cada; a que rodar
+    depois só não encontra eventos pendentes.
+    """
+    if not Job.objects.filter(name=PROCESS_JOB, status=Job.Status.QUEUED).exists():
+        delay = getattr(settings, 'STRIPE_WEBHOOK_DELAY', 1)
+        jobs.enqueue(PROCESS_JOB, delay=timedelta(seconds=delay) if delay else None)
+
+
+def ingest(event):
+    """
+    Grava o evento (dict já verificado) e agenda o processamento. Devolve False se o ID já
+    tinha sido recebido.
+    """
+    try:
+        with transaction.atomic():
+            StripeEvent.objects.create(
+                event_id=event['id'],
+                type=event.get('type', ''),
+                created=datetime.fromtimestamp(event.get('created') or timezone.now().timestamp(), tz=dt_timezone.utc),
+                payload=event,
+            )
+            schedule()
+    except IntegrityError:
+        return False
+    return True
+
+
+def _process(event):
+    func = _handlers.get(event.type)
+    event.attempts += 1
+    if func is None:
+        event.status = StripeEvent.Status.IGNORED
+    else:
+        try:
+            with transaction.atomic():
+                func(event.payload.get('data', {}).get('object', {}), event)
+        except Exception:  # noqa: BLE001 — falha do handler: nova tentativa ou 'failed'
+            logger.exception('Evento do Stripe %s (%s) falhou (tentativa %s)', event.event_id, event.type, event.attempts)
+            event.last_error = traceback.format_exc()[-4000:]
+            event.status = StripeEvent.Status.FAILED if event.attempts >= max_attempts() else StripeEvent.Status.PENDING
+        else:
+            event.status = StripeEvent.Status.PROCESSED
+            event.last_error = ''
+    if event.status != StripeEvent.Status.PENDING:
+        event.processed_at = timezone.now()
+    event.save(update_fields=['status', 'attempts', 'last_error', 'processed_at'])
+    return event.status
+
+
+def process_pending(limit=None):
+    """
+    Processa os eventos pendentes em lotes de STRIPE_WEBHOOK_BATCH_SIZE, em ordem de criação.
+    Eventos que falharam nesta rodada ficam para a próxima. Devolve a contagem por status.
+    """
+    counts = Counter()
+    retry_later = set()
+    while limit is None or sum(counts.values()) < limit:
+        size = batch_size() if limit is None else min(batch_size(), limit - sum(counts.values()))
+        with transaction.atomic():
+            batch = list(
+                StripeEvent.objects.select_for_update(skip_locked=True)
+                .filter(status=StripeEvent.Status.PENDING)
+                .exclude(pk__in=retry_later)
+                .order_by('created', 'id')[:size]
+            )
+            if not batch:
+                break
+            for event in batch:
+                status = _process(event)
+                counts[str(status)] += 1
+                if status == StripeEvent.Status.PENDING:
+                    retry_later.add(event.pk)
+    if retry_later:
+        jobs.enqueue(PROCESS_JOB, delay=jobs.retry_delay(1))
+    return counts
+
+
+def replay(queryset):
+    """Volta os eventos do queryset para a fila (handlers idempotentes) e devolve quantos."""
+    count = queryset.update(status=StripeEvent.Status.PENDING, attempts=0, last_error='', processed_at=None)
+    if count:
+        schedule()
+    return count
+
+
+# --- handlers ---
+
+@handler('checkout.session.completed')
+def checkout_session_completed(session, event):
+    """Pagamento único (mode=payment) concluído: ativa o acesso do profissional."""
+    user_id = (session.get('metadata') or {}).get('user_id')
+    if user_id:
+        # Pago: nenhuma sessão aberta do usuário deve ser reaproveitada
+        checkout_cache.invalidate(user_id)
+    if not user_id or session.get('mode') != 'payment':
+        return
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    customer = session.get('customer') or user.stripe_customer_id or ''
+    if user.subscription_status == User.SubscriptionStatus.ACTIVE and user.stripe_customer_id == customer:
+        return
+    user.stripe_customer_id = customer
+    user.subscription_status = User.SubscriptionStatus.ACTIVE
+    user.save(update_fields=['stripe_customer_id', 'subscription_status'])
+
+
+@handler('checkout.session.expired')
+def checkout_session_expired(session, event):
+    """Sessão expirada: não pode mais ser reaproveitada pelo checkout."""
+    user_id = (session.get('metadata') or {}).get('user_id')
+    if user_id:
+        checkout_cache.invalidate(user_id, session.get('id'))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Video
+from .models import Category, Video, VideoUpload
 
 
 @admin.register(Category)
@@ -17,3 +17,11 @@ class VideoAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description')
     raw_id_fields = ('professional',)
     filter_horizontal = ('categories',)
+
+
+@admin.register(VideoUpload)
+class VideoUploadAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'professional', 'status', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('filename', 'title')
+    raw_id_fields = ('professional', 'video')
@@ -5,3 +5,6 @@ class VideosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'videos'
     verbose_name = 'Vídeos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
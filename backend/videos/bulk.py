@@ -0,0 +1,94 @@
+"""
+Operações em lote sobre vídeos do profissional (POST /api/videos/bulk/).
+
+Cada operação roda numa transação com até três queries, qualquer que seja o número de
+vídeos e categorias: UPDATE único para ativar/desativar, DELETE e INSERT ... SELECT na
+tabela de vínculo vídeo-categoria para recategorizar, DELETEs diretos para excluir.
+Inserções/remoções diretas não disparam m2m_changed nem post_delete, então a versão de
+conteúdo é trocada aqui, uma vez por operação.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .content_cache import batched_bumps, bump_content_version
+from .models import Category, Video, VideoUpload
+
+ACTIVATE = 'activate'
+DEACTIVATE = 'deactivate'
+SET_CATEGORIES = 'set_categories'
+ADD_CATEGORIES = 'add_categories'
+REMOVE_CATEGORIES = 'remove_categories'
+MOVE = 'move'
+DELETE = 'delete'
+ACTIONS = (ACTIVATE, DEACTIVATE, SET_CATEGORIES, ADD_CATEGORIES, REMOVE_CATEGORIES, MOVE, DELETE)
+
+Through = Video.categories.through
+
+
+def max_ids():
+    return getattr(settings, 'VIDEO_BULK_MAX_IDS', 1000)
+
+
+def _link(video_ids, category_ids):
+    """
+    Cria os vínculos que faltam com um único INSERT ... SELECT (produto vídeos x categorias);
+    pares já existentes ficam como estão (ON CONFLICT DO NOTHING, PostgreSQL e SQLite).
+    """
+    if not video_ids or not category_ids:
+        return
+    qn = connection.ops.quote_name
+    video_id, category_id = (qn(Through._meta.get_field(name).column) for name in ('video', 'category'))
+    sql = (
+        f'INSERT INTO {qn(Through._meta.db_table)} ({video_id}, {category_id}) '
+        f'SELECT v.{qn(Video._meta.pk.column)}, c.{qn(Category._meta.pk.column)} '
+        f'FROM {qn(Video._meta.db_table)} v CROSS JOIN {qn(Category._meta.db_table)} c '
+        f'WHERE v.{qn(Video._meta.pk.column)} IN ({", ".join(["%s"] * len(video_ids))}) '
+        f'AND c.{qn(Category._meta.pk.column)} IN ({", ".join(["%s"] * len(category_ids))}) '
+        'ON CONFLICT DO NOTHING'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*video_ids, *category_ids])
+
+
+def apply(action, videos, categories=(), source=None, target=None):
+    """
+    Aplica `action` aos vídeos (dicts {'id', 'professional_id'}, já filtrados pelo dono).
+    `categories`: IDs para set/add/remove; `source`/`target`: IDs da categoria de origem e
+    destino em MOVE. Devolve quantos vídeos (vínculos, em remove_categories) foram alterados.
+    """
+    video_ids = [video['id'] for video in videos]
+    professional_ids = {video['professional_id'] for video in videos}
+    with batched_bumps(), transaction.atomic():
+        if action in (ACTIVATE, DEACTIVATE):
+            changed = Video.objects.filter(pk__in=video_ids).exclude(is_active=(action == ACTIVATE)).update(
+                is_active=(action == ACTIVATE), updated_at=timezone.now(),
+            )
+        elif action == DELETE:
+            # Sem o Collector, que apaga em lotes de 100: uma query para os vínculos, uma para o
+            # upload (SET_NULL) e uma para os vídeos; o post_delete só trocaria a versão de conteúdo
+            Through.objects.filter(video_id__in=video_ids).delete()
+            VideoUpload.objects.filter(video_id__in=video_ids).update(video=None)
+            changed = Video.objects.filter(pk__in=video_ids)._raw_delete(Video.objects.db)
+        elif action == SET_CATEGORIES:
+            Through.objects.filter(video_id__in=video_ids).exclude(category_id__in=categories).delete()
+            _link(video_ids, categories)
+            changed = len(video_ids)
+        elif action == ADD_CATEGORIES:
+            _link(video_ids, categories)
+            changed = len(video_ids)
+        elif action == REMOVE_CATEGORIES:
+            changed = Through.objects.filter(video_id__in=video_ids, category_id__in=categories).delete()[0]
+        elif action == MOVE:
+            moved = list(
+                Through.objects.filter(video_id__in=video_ids, category_id=source).values_list('video_id', flat=True)
+            )
+            if moved and source != target:
+                Through.objects.filter(video_id__in=moved, category_id=source).delete()
+                _link(moved, [target])
+            changed = len(moved)
+        else:
+            raise ValueError(f'Operação desconhecida: {action}')
+        if changed:
+            bump_content_version(*professional_ids)
+    return changed
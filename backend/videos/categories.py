@@ -0,0 +1,144 @@
+"""
+Criação de categorias: validação de IDs, alocação de slug e importação de árvores.
+
+Os slugs são únicos por (profissional, pai) — constraint videos_category_prof_parent_slug_uniq.
+Os slugs já usados que colidem com os nomes novos vêm numa query só (em vez de um exists()
+por tentativa) e o primeiro livre de `base`, `base-1`, `base-2`... é escolhido em memória.
+Se outra requisição criar o mesmo slug entre a consulta e o INSERT, a constraint falha e a
+criação é refeita (até CATEGORY_SLUG_RETRIES vezes).
+
+A importação cria a árvore nível a nível com bulk_create (uma query por nível) e grava o
+path materializado com bulk_update; como bulk_create não dispara signals, a versão de
+conteúdo do profissional é trocada aqui.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from .content_cache import bump_content_version
+from .models import Category
+
+SLUG_CONSTRAINTS = ('videos_category_prof_parent_slug_uniq', 'videos_category_prof_root_slug_uniq')
+# Espaço para o sufixo numérico dentro do max_length (100) do slug
+SLUG_BASE_LENGTH = 90
+
+
+class SlugConflict(Exception):
+    """Slug tomado por uma criação concorrente mesmo após as novas tentativas."""
+
+
+def max_import_nodes():
+    return getattr(settings, 'CATEGORY_IMPORT_MAX_NODES', 500)
+
+
+def max_import_depth():
+    return getattr(settings, 'CATEGORY_IMPORT_MAX_DEPTH', 6)
+
+
+def slug_retries():
+    return max(getattr(settings, 'CATEGORY_SLUG_RETRIES', 3), 1)
+
+
+def slug_base(name):
+    return slugify(name)[:SLUG_BASE_LENGTH].strip('-') or 'categoria'
+
+
+def load_categories(ids):
+    """Categorias dos IDs numa única query, na ordem informada e sem repetição."""
+    ids = list(dict.fromkeys(ids))
+    found = Category.objects.in_bulk(ids)
+    if len(found) != len(ids):
+        raise serializers.ValidationError('Categoria inválida.')
+    return [found[pk] for pk in ids]
+
+
+def taken_slugs(professional_id, parent_ids_and_bases):
+    """
+    {(parent_id, slug)} dos irmãos existentes que colidem com as bases informadas
+    ([(parent_id, base)]), numa única query.
+    """
+    match = Q()
+    for parent_id, base in set(parent_ids_and_bases):
+        match |= Q(parent_id=parent_id) & (Q(slug=base) | Q(slug__startswith=f'{base}-'))
+    if not match:
+        return set()
+    return set(
+        Category.objects.filter(match, professional_id=professional_id).values_list('parent_id', 'slug')
+    )
+
+
+def allocate_slug(parent_id, base, taken):
+    """Primeiro slug livre de `base`, `base-1`, ... entre os irmãos; reserva-o em `taken`."""
+    slug, n = base, 0
+    while (parent_id, slug) in taken:
+        n += 1
+        slug = f'{base}-{n}'
+    taken.add((parent_id, slug))
+    return slug
+
+
+def _is_slug_conflict(exc):
+    # PostgreSQL cita a constraint; SQLite lista as colunas
+    message = str(exc)
+    return any(name in message for name in SLUG_CONSTRAINTS) or 'videos_category.slug' in message
+
+
+def _with_slug_retries(create):
+    for attempt in range(slug_retries()):
+        try:
+            with transaction.atomic():
+                return create()
+        except IntegrityError as exc:
+            if not _is_slug_conflict(exc):
+                raise
+    raise SlugConflict()
+
+
+def create_category(professional_id, name, parent=None, description=''):
+    """Cria uma categoria com slug livre entre os irmãos (signals fazem a invalidação)."""
+    base = slug_base(name)
+    parent_id = parent.pk if parent else None
+
+    def create():
+        slug = allocate_slug(parent_id, base, taken_slugs(professional_id, [(parent_id, base)]))
+        return Category.objects.create(
+            name=name, slug=slug, description=description, parent=parent, professional_id=professional_id,
+        )
+    return _with_slug_retries(create)
+
+
+def import_tree(professional_id, nodes, parent=None):
+    """
+    Cria a árvore `nodes` ([{'name', 'description', 'children': [...]}]) sob `parent`
+    (None = raiz) numa transação. Devolve as categorias criadas, nível a nível.
+    """
+    def create():
+        created = []
+        taken = taken_slugs(professional_id, [(parent.pk if parent else None, slug_base(n['name'])) for n in nodes])
+        level = [(parent, node) for node in nodes]
+        while level:
+            objs = []
+            for node_parent, node in level:
+                parent_id = node_parent.pk if node_parent else None
+                objs.append(Category(
+                    name=node['name'],
+                    slug=allocate_slug(parent_id, slug_base(node['name']), taken),
+                    description=node.get('description', ''),
+                    parent=node_parent,
+                    professional_id=professional_id,
+                ))
+            Category.objects.bulk_create(objs)
+            for obj in objs:
+                obj.path = obj.build_path()
+            Category.objects.bulk_update(objs, ['path'])
+            created.extend(objs)
+            # Pais recém-criados não têm filhos no banco: só colidem entre si (já em `taken`)
+            level = [(obj, child) for obj, (_, node) in zip(objs, level) for child in node.get('children', ())]
+        return created
+
+    created = _with_slug_retries(create)
+    if created:
+        bump_content_version(professional_id)
+    return created
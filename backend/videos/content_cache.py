@@ -0,0 +1,156 @@
+"""
+Cache das respostas de listagem (vídeos e categorias) com ETag/304.
+
+Cada profissional tem uma "versão de conteúdo" no cache, trocada pelos signals
+(videos/signals.py) sempre que um vídeo, categoria ou vínculo vídeo-categoria dele
+muda, e pelas tarefas que atualizam vídeos com .update() (thumbnails, poster).
+A chave de uma resposta combina o conjunto de profissionais visíveis, as versões
+deles, a URL (parâmetros) e o que varia por usuário (host, papel, URLs assinadas).
+Enquanto nada muda, a listagem sai do cache sem queries nem serialização, e o
+cliente que envia If-None-Match recebe 304.
+
+A versão "all" muda junto com qualquer profissional (listagens sem filtro, ex.: admin).
+Dentro de `batched_bumps()` as trocas são acumuladas e feitas uma vez no fim do bloco
+(operações em lote que disparam um signal por objeto).
+"""
+import hashlib
+import json
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from . import signing
+
+ALL = 'all'
+
+_pending = ContextVar('content_version_bumps', default=None)
+
+
+def _cache():
+    return caches[getattr(settings, 'CONTENT_CACHE_ALIAS', 'default')]
+
+
+def timeout():
+    return getattr(settings, 'CONTENT_CACHE_TIMEOUT', 300)
+
+
+def _version_key(professional_id):
+    return f'content-version:{professional_id}'
+
+
+def content_version(professional_ids=None):
+    """
+    Versão combinada do conteúdo dos profissionais (None = todos). Versões ausentes
+    no cache (expiradas/removidas) são criadas na hora: só causam um miss.
+    """
+    cache = _cache()
+    ids = [ALL] if professional_ids is None else sorted(professional_ids)
+    keys = {_version_key(pk): pk for pk in ids}
+    versions = cache.get_many(list(keys))
+    missing = {key: uuid.uuid4().hex[:12] for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    raw = ','.join(f'{keys[key]}:{versions[key]}' for key in keys)
+    return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+
+def _bump(professional_ids):
+    _cache().set_many({_version_key(pk): uuid.uuid4().hex[:12] for pk in (*professional_ids, ALL)}, timeout=None)
+
+
+def bump_content_version(*professional_ids):
+    """Invalida as listagens em cache desses profissionais (agora e de novo após o commit)."""
+    pending = _pending.get()
+    if pending is not None:
+        pending.update(professional_ids)
+        pending.add(None)  # marca a chamada mesmo sem profissional (versão "all")
+        return
+    # Sem profissional (ex.: categoria global) troca só a versão "all"
+    professional_ids = [pk for pk in professional_ids if pk is not None]
+    _bump(professional_ids)
+    # Requisições concorrentes podem gravar a resposta antiga antes do commit
+    transaction.on_commit(lambda: _bump(professional_ids))
+
+
+@contextmanager
+def batched_bumps():
+    """Acumula as chamadas a bump_content_version do bloco e invalida uma vez ao sair."""
+    if _pending.get() is not None:
+        yield
+        return
+    pending = set()
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+        if pending:
+            bump_content_version(*pending)
+
+
+def response_key(request, name, professional_ids):
+    """Chave da resposta de `name` para esta requisição; None desativa o cache."""
+    if timeout() <= 0:
+        return None
+    user = request.user
+    parts = [
+        name,
+        content_version(professional_ids),
+        request.get_full_path(),
+        f'{request.scheme}://{request.get_host()}',
+        user.role,
+        # can_edit depende do usuário para profissionais/admin; alunos compartilham a resposta
+        '' if user.role == 'user' else str(user.pk),
+        # URLs assinadas mudam a cada balde de validade
+        str(signing.current_bucket()) if signing.signing_enabled() else '',
+    ]
+    return 'content-response:' + hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+def make_etag(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+
+
+def _conditional(request, data, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+        response = Response(status=304)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    # O cliente sempre revalida; a resposta depende do token
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _lookup(view, name):
+    key = response_key(view.request, name, view.content_scope())
+    return key, (_cache().get(key) if key else None)
+
+
+async def cached_response(view, name, build):
+    """
+    Resposta de `build()` (corrotina que devolve um Response) servida do cache enquanto a
+    versão do conteúdo não muda. `view.content_scope()` informa os profissionais visíveis.
+    """
+    key, entry = await sync_to_async(_lookup)(view, name)
+    if entry is None:
+        response = await build()
+        if response.status_code != 200:
+            return response
+        entry = (response.data, make_etag(response.data))
+        if key:
+            await sync_to_async(_cache().set)(key, entry, timeout())
+    data, etag = entry
+    return _conditional(view.request, data, etag)
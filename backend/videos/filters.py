@@ -1,10 +1,11 @@
-from django.db import models
+from django.db.models import Q, Subquery
 from django_filters import rest_framework as filters
-from .models import Video
+from .models import Category, Video
+from .search import search_videos
 
 
 class VideoFilter(filters.FilterSet):
-    category = filters.NumberFilter(field_name='categories__id')
+    category = filters.NumberFilter(method='filter_category')
     category_slug = filters.CharFilter(field_name='categories__slug')
     professional = filters.NumberFilter(field_name='professional__user_id')
     search = filters.CharFilter(method='filter_search')
@@ -13,9 +14,20 @@ class VideoFilter(filters.FilterSet):
         model = Video
         fields = ('category', 'category_slug', 'professional', 'is_active')
 
-    def filter_search(self, queryset, name, value):
-        if not value:
+    def filter_category(self, queryset, name, value):
+        if value is None:
             return queryset
-        return queryset.filter(
-            models.Q(title__icontains=value) | models.Q(description__icontains=value)
-        )
+        if self.data.get('descendants') not in ('1', 'true'):
+            return queryset.filter(categories__id=value)
+        # ?descendants=1: vídeos em qualquer categoria da subárvore (prefixo do caminho materializado).
+        # Sem path (linhas gravadas sem Category.save, ex.: QuerySet.update) vale só a própria
+        # categoria: o prefixo '' casaria com todas.
+        subtree_path = Category.objects.filter(pk=value).exclude(path='').values('path')[:1]
+        video_ids = Video.categories.through.objects.filter(
+            Q(category_id=value) | Q(category__path__startswith=Subquery(subtree_path)),
+        ).values('video_id')
+        return queryset.filter(pk__in=video_ids)
+
+    def filter_search(self, queryset, name, value):
+        # ?search=...&ordering=relevance ordena pelo ranking da busca
+        return search_videos(queryset, value, rank=self.data.get('ordering') == 'relevance')
@@ -0,0 +1,34 @@
+"""Tarefas em segundo plano do app videos (executadas pelo runworker)."""
+from core.jobs import job, last_attempt
+
+from . import processing, thumbnails
+from .models import Video
+
+
+@job(processing.PROCESS_JOB)
+def process_video(video_id):
+    try:
+        processing.process_video(video_id)
+    except Exception:
+        # Tarefa própria (uma falha nas variantes não refaz a transcodificação), agendada só
+        # quando não haverá nova tentativa: cada tarefa roda o ffmpeg e grava um thumbnail
+        if last_attempt():
+            _enqueue_thumbnails(video_id)
+        raise
+    _enqueue_thumbnails(video_id)
+
+
+def _enqueue_thumbnails(video_id):
+    video = Video.objects.filter(pk=video_id).first()
+    if video is not None:
+        thumbnails.enqueue_thumbnails(video)
+
+
+@job(processing.CLEANUP_JOB)
+def delete_renditions(prefix):
+    processing.delete_prefix(prefix)
+
+
+@job(thumbnails.THUMBNAIL_JOB)
+def generate_thumbnails(video_id):
+    thumbnails.generate_thumbnails(video_id)
@@ -0,0 +1,71 @@
+"""
+Descarta uploads abandonados: arquivos parciais dos uploads resumíveis e
+multipart uploads pendentes no S3 (que ocupam espaço no bucket até serem abortados).
+Rode periodicamente (cron / job agendado do Railway).
+
+Uso: python manage.py cleanup_uploads [--hours 24] [--dry-run]
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from videos import resumable, uploads
+from videos.models import VideoUpload
+
+
+class Command(BaseCommand):
+    help = 'Remove uploads de vídeo pendentes sem atividade há mais de N horas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=getattr(settings, 'VIDEO_UPLOAD_ABANDON_HOURS', 24),
+            help='Horas sem atividade para considerar o upload abandonado.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Só lista, sem remover.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = VideoUpload.objects.filter(status=VideoUpload.Status.PENDING, updated_at__lt=cutoff)
+        aborted_ids = []
+        for upload in stale.iterator():
+            if options['dry_run']:
+                self.stdout.write(f'{upload.pk} {upload.backend} {upload.filename}')
+                continue
+            if upload.backend == VideoUpload.Backend.RESUMABLE:
+                resumable.discard(upload)
+            else:
+                try:
+                    uploads.abort(upload.storage_name, upload.s3_upload_id)
+                except uploads.DirectUploadUnavailable:
+                    pass
+                except Exception as exc:  # noqa: BLE001 — segue com os demais; tenta de novo na próxima execução
+                    self.stderr.write(f'Falha ao abortar upload {upload.pk} no S3: {exc}')
+                    continue
+            aborted_ids.append(upload.pk)
+        if aborted_ids:
+            VideoUpload.objects.filter(pk__in=aborted_ids).update(status=VideoUpload.Status.ABORTED)
+        orphans = self._remove_orphan_parts(options['dry_run'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(aborted_ids)} upload(s) abandonado(s) removido(s); {orphans} arquivo(s) parcial(is) órfão(s).'
+        ))
+
+    def _remove_orphan_parts(self, dry_run):
+        """Arquivos .part sem upload pendente correspondente (ex.: registro apagado)."""
+        directory = resumable.upload_dir()
+        pending = set(
+            VideoUpload.objects.filter(
+                status=VideoUpload.Status.PENDING, backend=VideoUpload.Backend.RESUMABLE,
+            ).values_list('pk', flat=True)
+        )
+        removed = 0
+        for path in directory.glob('*.part'):
+            if path.stem.isdigit() and int(path.stem) in pending:
+                continue
+            removed += 1
+            if not dry_run:
+                path.unlink(missing_ok=True)
+        return removed
@@ -0,0 +1,21 @@
+# Índices compostos (created_at, id) para paginação por cursor das listagens de vídeo
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0004_video_categories_m2m'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['-created_at', '-id'], name='videos_video_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['professional', '-created_at', '-id'], name='videos_video_pro_created_idx'),
+        ),
+    ]
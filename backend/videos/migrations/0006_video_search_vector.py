@@ -0,0 +1,86 @@
+# Busca full-text: Video.search_vector (tsvector) com configuração portuguese_unaccent e índice GIN.
+# As operações específicas do PostgreSQL são ignoradas em outros bancos (SQLite em dev/testes).
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='videos_video_search_gin')
+
+
+def create_search_config(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    schema_editor.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+                ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+            END IF;
+        END
+        $$;
+        """
+    )
+
+
+def drop_search_config(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP TEXT SEARCH CONFIGURATION IF EXISTS portuguese_unaccent')
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.add_index(apps.get_model('videos', 'Video'), SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('videos', 'Video'), SEARCH_INDEX)
+
+
+def populate_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        """
+        UPDATE videos_video SET search_vector =
+            setweight(to_tsvector('portuguese_unaccent', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('portuguese_unaccent', coalesce(description, '')), 'B')
+        """
+    )
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0005_video_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_config, drop_search_config),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='video', index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+        ),
+        migrations.RunPython(populate_search_vector, noop),
+    ]
@@ -0,0 +1,43 @@
+# Caminho materializado em Category ('/<raiz>/.../<id>/') para montar a árvore e buscar subárvores sem recursão
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Category = apps.get_model('videos', 'Category')
+    parents = dict(Category.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def path_for(pk):
+        if pk not in paths:
+            parent_id = parents[pk]
+            prefix = path_for(parent_id) if parent_id else '/'
+            paths[pk] = f'{prefix}{pk}/'
+        return paths[pk]
+
+    objs = [Category(pk=pk, path=path_for(pk)) for pk in parents]
+    Category.objects.bulk_update(objs, ['path'], batch_size=500)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0006_video_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='caminho'),
+        ),
+        migrations.RunPython(populate_paths, noop),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='videos_category_path_idx', opclasses=('varchar_pattern_ops',)),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Upload direto em partes (S3 multipart): o Video só é criado quando o upload é concluído
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_professionalstudent_limit_choices'),
+        ('videos', '0007_category_materialized_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Em andamento'), ('completed', 'Concluído'), ('aborted', 'Abortado')], default='pending', max_length=20, verbose_name='status')),
+                ('filename', models.CharField(max_length=255, verbose_name='arquivo original')),
+                ('content_type', models.CharField(blank=True, max_length=100, verbose_name='tipo de conteúdo')),
+                ('storage_name', models.CharField(max_length=500, verbose_name='nome no storage')),
+                ('s3_upload_id', models.CharField(blank=True, max_length=1024, verbose_name='S3 UploadId')),
+                ('title', models.CharField(max_length=255, verbose_name='título')),
+                ('description', models.TextField(blank=True, verbose_name='descrição')),
+                ('category_ids', models.JSONField(blank=True, default=list, verbose_name='categorias')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_uploads', to='users.professionalprofile', verbose_name='profissional')),
+                ('video', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='videos.video', verbose_name='vídeo')),
+            ],
+            options={
+                'verbose_name': 'upload de vídeo',
+                'verbose_name_plural': 'uploads de vídeo',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
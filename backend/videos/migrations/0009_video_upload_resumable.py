@@ -0,0 +1,42 @@
+# Upload resumível (estilo tus) no armazenamento local: tamanho, offset e checksum em VideoUpload
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0008_video_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoupload',
+            name='backend',
+            field=models.CharField(choices=[('s3_multipart', 'S3 multipart'), ('resumable', 'Resumível (local)')], default='s3_multipart', max_length=20, verbose_name='tipo'),
+        ),
+        migrations.AddField(
+            model_name='videoupload',
+            name='checksum',
+            field=models.CharField(blank=True, max_length=64, verbose_name='sha256'),
+        ),
+        migrations.AddField(
+            model_name='videoupload',
+            name='offset',
+            field=models.BigIntegerField(default=0, verbose_name='bytes recebidos'),
+        ),
+        migrations.AddField(
+            model_name='videoupload',
+            name='upload_length',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='tamanho total'),
+        ),
+        migrations.AlterField(
+            model_name='videoupload',
+            name='storage_name',
+            field=models.CharField(blank=True, max_length=500, verbose_name='nome no storage'),
+        ),
+        migrations.AddIndex(
+            model_name='videoupload',
+            index=models.Index(fields=['status', 'updated_at'], name='videos_upload_status_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Processamento em segundo plano do vídeo: status, progresso, manifest HLS e poster
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0009_video_upload_resumable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='hls_manifest',
+            field=models.CharField(blank=True, max_length=500, verbose_name='manifest HLS'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='poster',
+            field=models.ImageField(blank=True, null=True, upload_to='posters/', verbose_name='poster'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='processing_error',
+            field=models.TextField(blank=True, verbose_name='erro do processamento'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='processing_progress',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='progresso (%)'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='processing_status',
+            field=models.CharField(blank=True, choices=[('', 'Sem processamento'), ('pending', 'Na fila'), ('processing', 'Processando'), ('ready', 'Pronto'), ('failed', 'Falhou')], default='', max_length=20, verbose_name='status do processamento'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Variantes redimensionadas (WebP/JPEG) do thumbnail, geradas por videos.thumbnails
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0010_video_processing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='thumbnail_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='variantes do thumbnail'),
+        ),
+    ]
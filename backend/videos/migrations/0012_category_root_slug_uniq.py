@@ -0,0 +1,42 @@
+# Slug único também entre as categorias raiz do profissional (parent NULL)
+
+from django.db import migrations, models
+
+
+def dedupe_root_slugs(apps, schema_editor):
+    """Renomeia slugs raiz repetidos (criações concorrentes antigas) antes da constraint."""
+    Category = apps.get_model('videos', 'Category')
+    roots = Category.objects.filter(parent__isnull=True, professional__isnull=False)
+    existing = set(roots.values_list('professional_id', 'slug'))
+    seen = set()
+    for category in roots.order_by('pk').only('pk', 'professional_id', 'slug').iterator():
+        key = (category.professional_id, category.slug)
+        if key not in seen:
+            seen.add(key)
+            continue
+        base, n = category.slug[:90], 1
+        while (category.professional_id, f'{base}-{n}') in existing:
+            n += 1
+        slug = f'{base}-{n}'
+        existing.add((category.professional_id, slug))
+        seen.add((category.professional_id, slug))
+        Category.objects.filter(pk=category.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0011_video_thumbnail_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_root_slugs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('parent__isnull', True)),
+                fields=('professional', 'slug'),
+                name='videos_category_prof_root_slug_uniq',
+            ),
+        ),
+    ]
@@ -1,6 +1,11 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models import Q
+from django.db.models.functions import Concat, Substr
+
+from .search import fulltext_enabled, search_vector_expression, update_search_vectors
 
 
 class Category(models.Model):
@@ -24,6 +29,8 @@ class Category(models.Model):
         blank=True,
         verbose_name='profissional',
     )
+    # Caminho materializado: '/<id raiz>/.../<id>/'. Subárvore = path__startswith=categoria.path
+    path = models.CharField('caminho', max_length=255, blank=True, default='', editable=False)
 
     class Meta:
         verbose_name = 'categoria'
@@ -35,17 +42,98 @@ class Category(models.Model):
                 condition=Q(professional__isnull=False),
                 name='videos_category_prof_parent_slug_uniq',
             ),
+            # No PostgreSQL parent NULL não colide na constraint acima: raízes precisam da sua
+            models.UniqueConstraint(
+                fields=('professional', 'slug'),
+                condition=Q(parent__isnull=True),
+                name='videos_category_prof_root_slug_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=('path',), name='videos_category_path_idx', opclasses=('varchar_pattern_ops',)),
         ]
 
     def __str__(self):
         return self.name
 
+    def build_path(self):
+        prefix = self.parent.path if self.parent_id else '/'
+        return f'{prefix}{self.pk}/'
+
+    @property
+    def depth(self):
+        return max(self.path.count('/') - 2, 0)
+
+    def is_descendant_of(self, other):
+        """True se esta categoria é `other` ou está na subárvore dele."""
+        return bool(other.path) and self.path.startswith(other.path)
+
+    def save(self, *args, **kwargs):
+        if self.pk is None:
+            # O id só existe após o INSERT; o path é gravado logo em seguida
+            super().save(*args, **kwargs)
+            self.path = self.build_path()
+            Category.objects.filter(pk=self.pk).update(path=self.path)
+            return
+        old_path = self.path
+        new_path = self.build_path()
+        if new_path == old_path:
+            super().save(*args, **kwargs)
+            return
+        self.path = new_path
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'path'}
+        super().save(*args, **kwargs)
+        if old_path:
+            # Mudou de pai: reescreve o prefixo de toda a subárvore num único UPDATE
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(models.Value(new_path), Substr('path', len(old_path) + 1))
+            )
+
 
 def video_upload_path(instance, filename):
     return f'videos/{instance.professional.user_id}/{instance.id or "temp"}/{filename}'
 
 
+class VideoQuerySet(models.QuerySet):
+    """Mantém search_vector atualizado também nos caminhos em lote (bulk_create/bulk_update/update)."""
+    SEARCH_FIELDS = ('title', 'description')
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        if pks:
+            update_search_vectors(self.model._base_manager.using(self.db).filter(pk__in=pks))
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if fulltext_enabled(self.db) and set(fields) & set(self.SEARCH_FIELDS):
+            for obj in objs:
+                obj.search_vector = search_vector_expression(obj.title, obj.description)
+            fields.append('search_vector')
+        try:
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        finally:
+            for obj in objs:
+                obj.search_vector = None
+
+    def update(self, **kwargs):
+        if fulltext_enabled(self.db) and set(kwargs) & set(self.SEARCH_FIELDS):
+            kwargs['search_vector'] = search_vector_expression(kwargs.get('title'), kwargs.get('description'))
+        return super().update(**kwargs)
+
+
 class Video(models.Model):
+    class ProcessingStatus(models.TextChoices):
+        NONE = '', 'Sem processamento'
+        PENDING = 'pending', 'Na fila'
+        PROCESSING = 'processing', 'Processando'
+        READY = 'ready', 'Pronto'
+        FAILED = 'failed', 'Falhou'
+
     title = models.CharField('título', max_length=255)
     description = models.TextField('descrição', blank=True)
     video_url = models.URLField('URL do vídeo', max_length=500, blank=True)
@@ -61,6 +149,8 @@ class Video(models.Model):
         blank=True,
         null=True,
     )
+    # Variantes redimensionadas (WebP/JPEG) do thumbnail — ver videos/thumbnails.py
+    thumbnail_variants = models.JSONField('variantes do thumbnail', default=dict, blank=True, editable=False)
     professional = models.ForeignKey(
         'users.ProfessionalProfile',
         on_delete=models.CASCADE,
@@ -76,18 +166,105 @@ class Video(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField('ativo', default=True)
+    # Processamento em segundo plano (videos.processing): renditions HLS + poster
+    processing_status = models.CharField(
+        'status do processamento', max_length=20, choices=ProcessingStatus.choices, blank=True, default='',
+    )
+    processing_progress = models.PositiveSmallIntegerField('progresso (%)', default=0)
+    processing_error = models.TextField('erro do processamento', blank=True)
+    hls_manifest = models.CharField('manifest HLS', max_length=500, blank=True)
+    poster = models.ImageField('poster', upload_to='posters/', blank=True, null=True)
+    # tsvector (título peso A, descrição peso B); preenchido só no PostgreSQL — ver videos/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = VideoQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'vídeo'
         verbose_name_plural = 'vídeos'
         ordering = ('-created_at',)
+        indexes = [
+            # Paginação por cursor (created_at, id): listagem geral e por profissional
+            models.Index(fields=('-created_at', '-id'), name='videos_video_created_id_idx'),
+            models.Index(fields=('professional', '-created_at', '-id'), name='videos_video_pro_created_idx'),
+            GinIndex(fields=('search_vector',), name='videos_video_search_gin'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        using = kwargs.get('using') or self._state.db or 'default'
+        if fulltext_enabled(using) and (update_fields is None or set(update_fields) & set(VideoQuerySet.SEARCH_FIELDS)):
+            # Calculado no próprio INSERT/UPDATE a partir dos valores novos
+            self.search_vector = search_vector_expression(self.title, self.description)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_vector'}
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self.search_vector = None
+
     @property
     def url(self):
         """URL final do vídeo: arquivo (S3/local) ou video_url."""
         if self.video_file:
             return self.video_file.url
         return self.video_url or ''
+
+
+class VideoUpload(models.Model):
+    """Upload de vídeo em andamento; o Video só é criado quando o upload é concluído."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Em andamento'
+        COMPLETED = 'completed', 'Concluído'
+        ABORTED = 'aborted', 'Abortado'
+
+    class Backend(models.TextChoices):
+        S3_MULTIPART = 's3_multipart', 'S3 multipart'
+        RESUMABLE = 'resumable', 'Resumível (local)'
+
+    professional = models.ForeignKey(
+        'users.ProfessionalProfile',
+        on_delete=models.CASCADE,
+        related_name='video_uploads',
+        verbose_name='profissional',
+    )
+    status = models.CharField('status', max_length=20, choices=Status.choices, default=Status.PENDING)
+    backend = models.CharField('tipo', max_length=20, choices=Backend.choices, default=Backend.S3_MULTIPART)
+    filename = models.CharField('arquivo original', max_length=255)
+    content_type = models.CharField('tipo de conteúdo', max_length=100, blank=True)
+    storage_name = models.CharField('nome no storage', max_length=500, blank=True)
+    s3_upload_id = models.CharField('S3 UploadId', max_length=1024, blank=True)
+    # Upload resumível: tamanho total, bytes já recebidos e sha256 (hex) opcional do arquivo inteiro
+    upload_length = models.BigIntegerField('tamanho total', null=True, blank=True)
+    offset = models.BigIntegerField('bytes recebidos', default=0)
+    checksum = models.CharField('sha256', max_length=64, blank=True)
+    # Metadados do vídeo a criar na conclusão
+    title = models.CharField('título', max_length=255)
+    description = models.TextField('descrição', blank=True)
+    category_ids = models.JSONField('categorias', default=list, blank=True)
+    video = models.OneToOneField(
+        Video,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload',
+        verbose_name='vídeo',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'upload de vídeo'
+        verbose_name_plural = 'uploads de vídeo'
+        ordering = ('-created_at',)
+        indexes = [
+            # Limpeza de uploads abandonados (cleanup_uploads)
+            models.Index(fields=('status', 'updated_at'), name='videos_upload_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.filename} ({self.get_status_display()})'
@@ -0,0 +1,252 @@
+"""
+Pipeline de processamento de vídeo: renditions HLS em vários bitrates + poster.
+
+Executado pelo worker (core.jobs / runworker) fora dos processos web. Usa ffprobe
+para ler duração/resolução/áudio e um subprocesso ffmpeg que gera todas as
+renditions numa única passada, reportando o progresso em Video.processing_progress.
+Cada processamento publica num prefixo novo; o anterior é removido por uma tarefa
+(CLEANUP_JOB) depois que as URLs assinadas emitidas para ele expiram.
+"""
+import json
+import logging
+import os
+import posixpath
+import shutil
+import subprocess
+import tempfile
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Q
+
+from core.jobs import enqueue
+from . import signing
+from .content_cache import bump_content_version
+from .models import Video
+
+logger = logging.getLogger(__name__)
+
+PROCESS_JOB = 'videos.process_video'
+CLEANUP_JOB = 'videos.delete_renditions'
+DEFAULT_RENDITIONS = (
+    {'height': 360, 'video_bitrate': '800k', 'audio_bitrate': '96k'},
+    {'height': 720, 'video_bitrate': '2800k', 'audio_bitrate': '128k'},
+    {'height': 1080, 'video_bitrate': '5000k', 'audio_bitrate': '160k'},
+)
+
+
+class ProcessingError(Exception):
+    pass
+
+
+def processing_enabled():
+    return getattr(settings, 'VIDEO_PROCESSING_ENABLED', True)
+
+
+def enqueue_processing(video):
+    """Marca o vídeo como pendente e agenda o processamento (na mesma transação)."""
+    if not processing_enabled() or not video.video_file:
+        return None
+    Video.objects.filter(pk=video.pk).update(
+        processing_status=Video.ProcessingStatus.PENDING, processing_progress=0, processing_error='',
+    )
+    video.processing_status = Video.ProcessingStatus.PENDING
+    video.processing_progress = 0
+    return enqueue(PROCESS_JOB, video_id=video.pk, max_attempts=2)
+
+
+def _set_state(video_id, **fields):
+    Video.objects.filter(pk=video_id).update(**fields)
+
+
+def probe(source):
+    """Duração (s), altura e presença de áudio via ffprobe."""
+    cmd = [
+        getattr(settings, 'FFPROBE_BINARY', 'ffprobe'), '-v', 'error',
+        '-show_entries', 'format=duration:stream=codec_type,height',
+        '-of', 'json', str(source),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise ProcessingError(f'ffprobe falhou: {result.stderr.strip()[-500:]}')
+    info = json.loads(result.stdout or '{}')
+    streams = info.get('streams', [])
+    video_streams = [s for s in streams if s.get('codec_type') == 'video']
+    if not video_streams:
+        raise ProcessingError('Arquivo sem faixa de vídeo.')
+    return {
+        'duration': float(info.get('format', {}).get('duration') or 0),
+        'height': int(video_streams[0].get('height') or 0),
+        'has_audio': any(s.get('codec_type') == 'audio' for s in streams),
+    }
+
+
+def select_renditions(source_height):
+    renditions = list(getattr(settings, 'VIDEO_HLS_RENDITIONS', DEFAULT_RENDITIONS))
+    renditions.sort(key=lambda r: r['height'])
+    # Não faz upscale; vídeos menores que a menor rendition ficam só com ela
+    selected = [r for r in renditions if r['height'] <= source_height]
+    return selected or renditions[:1]
+
+
+def hls_command(source, out_dir, renditions, has_audio):
+    ffmpeg = getattr(settings, 'FFMPEG_BINARY', 'ffmpeg')
+    segment = getattr(settings, 'VIDEO_HLS_SEGMENT_SECONDS', 6)
+    cmd = [ffmpeg, '-hide_banner', '-nostats', '-y', '-i', str(source)]
+    stream_map = []
+    for i, rendition in enumerate(renditions):
+        cmd += ['-map', '0:v:0']
+        if has_audio:
+            cmd += ['-map', '0:a:0']
+        cmd += [
+            f'-filter:v:{i}', f'scale=-2:{rendition["height"]},format=yuv420p',
+            f'-b:v:{i}', rendition['video_bitrate'],
+            f'-maxrate:v:{i}', rendition['video_bitrate'],
+            f'-bufsize:v:{i}', rendition['video_bitrate'],
+        ]
+        if has_audio:
+            cmd += [f'-b:a:{i}', rendition['audio_bitrate']]
+        stream_map.append(f'v:{i},a:{i}' if has_audio else f'v:{i}')
+    cmd += ['-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main', '-sc_threshold', '0',
+            '-force_key_frames', f'expr:gte(t,n_forced*{segment})']
+    if has_audio:
+        cmd += ['-c:a', 'aac', '-ac', '2']
+    cmd += [
+        '-f', 'hls',
+        '-hls_time', str(segment),
+        '-hls_playlist_type', 'vod',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', str(Path(out_dir) / 'v%v' / 'seg_%05d.ts'),
+        '-master_pl_name', 'master.m3u8',
+        '-var_stream_map', ' '.join(stream_map),
+        '-progress', 'pipe:1',
+        str(Path(out_dir) / 'v%v' / 'index.m3u8'),
+    ]
+    return cmd
+
+
+def run_ffmpeg(cmd, duration, on_progress=None, log_path=None):
+    """Roda o ffmpeg lendo '-progress pipe:1' e chamando on_progress(0-99)."""
+    with open(log_path or os.devnull, 'w') as log:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=log, text=True)
+        last = -1
+        for line in proc.stdout:
+            key, _, value = line.strip().partition('=')
+            if key in ('out_time_us', 'out_time_ms') and duration and value.isdigit():
+                percent = min(int(int(value) / 1_000_000 / duration * 100), 99)
+                if on_progress and percent >= last + 5:
+                    last = percent
+                    on_progress(percent)
+        returncode = proc.wait()
+    if returncode != 0:
+        tail = Path(log_path).read_text()[-500:] if log_path else ''
+        raise ProcessingError(f'ffmpeg terminou com código {returncode}: {tail}')
+
+
+def poster_time(duration):
+    """Instante do frame usado como poster: 10% do vídeo, no máximo 5s (evita abertura preta)."""
+    return min(duration * 0.1, 5.0)
+
+
+def extract_poster(source, target, at_seconds):
+    cmd = [
+        getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'), '-hide_banner', '-loglevel', 'error', '-y',
+        '-ss', f'{at_seconds:.2f}', '-i', str(source), '-frames:v', '1', '-q:v', '3', str(target),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0 or not Path(target).exists():
+        raise ProcessingError(f'Falha ao extrair poster: {result.stderr.strip()[-500:]}')
+
+
+def local_source(video, workdir):
+    """Caminho local do arquivo original (baixa do storage remoto se necessário)."""
+    try:
+        return Path(video.video_file.path)
+    except NotImplementedError:
+        target = Path(workdir) / (Path(video.video_file.name).name or 'source')
+        with video.video_file.open('rb') as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, length=1024 * 1024)
+        return target
+
+
+def publish(out_dir, prefix):
+    """Envia os arquivos gerados para o storage sob `prefix` (mesma estrutura relativa)."""
+    for path in sorted(Path(out_dir).rglob('*')):
+        if path.is_file():
+            name = f'{prefix}/{path.relative_to(out_dir).as_posix()}'
+            with open(path, 'rb') as fh:
+                default_storage.save(name, File(fh))
+
+
+def delete_prefix(prefix):
+    """Remove do storage todos os arquivos sob `prefix` (renditions de um processamento anterior)."""
+    try:
+        dirs, files = default_storage.listdir(prefix)
+    except FileNotFoundError:
+        return
+    for name in files:
+        default_storage.delete(f'{prefix}/{name}')
+    for name in dirs:
+        delete_prefix(f'{prefix}/{name}')
+    try:
+        os.rmdir(default_storage.path(prefix))
+    except (NotImplementedError, OSError):
+        pass  # storage remoto não tem diretórios
+
+
+def schedule_cleanup(prefix):
+    """
+    Agenda a remoção das renditions antigas depois que as URLs assinadas já emitidas para
+    elas expiram (até 2×TTL), para não cortar quem está assistindo.
+    """
+    return enqueue(CLEANUP_JOB, prefix=prefix, delay=timedelta(seconds=2 * signing.ttl()))
+
+
+def process_video(video_id):
+    video = Video.objects.filter(pk=video_id).first()
+    if video is None or not video.video_file:
+        return
+    _set_state(video_id, processing_status=Video.ProcessingStatus.PROCESSING, processing_progress=0)
+    try:
+        with tempfile.TemporaryDirectory(prefix='myfit-video-') as workdir:
+            source = local_source(video, workdir)
+            info = probe(source)
+            out_dir = Path(workdir) / 'out'
+            renditions = select_renditions(info['height'])
+            for i in range(len(renditions)):
+                (out_dir / f'v{i}').mkdir(parents=True, exist_ok=True)
+            run_ffmpeg(
+                hls_command(source, out_dir, renditions, info['has_audio']),
+                info['duration'],
+                on_progress=lambda p: _set_state(video_id, processing_progress=p),
+                log_path=Path(workdir) / 'ffmpeg.log',
+            )
+            extract_poster(source, out_dir / 'poster.jpg', poster_time(info['duration']))
+            # Prefixo novo a cada processamento: o manifest antigo continua válido até a troca
+            prefix = f'hls/{video.professional_id}/{video.pk}/{uuid.uuid4().hex[:12]}'
+            publish(out_dir, prefix)
+    except Exception as exc:
+        _set_state(video_id, processing_status=Video.ProcessingStatus.FAILED, processing_error=str(exc)[:1000])
+        raise
+    old_prefix = posixpath.dirname(video.hls_manifest) if video.hls_manifest else ''
+    _set_state(
+        video_id,
+        hls_manifest=f'{prefix}/master.m3u8',
+        poster=f'{prefix}/poster.jpg',
+        processing_status=Video.ProcessingStatus.READY,
+        processing_progress=100,
+        processing_error='',
+    )
+    # Sem thumbnail enviado pelo profissional (ou com o poster anterior): usa o poster extraído
+    automatic = Q(thumbnail='') | Q(thumbnail__isnull=True)
+    if old_prefix:
+        automatic |= Q(thumbnail=f'{old_prefix}/poster.jpg')
+    if Video.objects.filter(pk=video_id).filter(automatic).update(thumbnail=f'{prefix}/poster.jpg'):
+        bump_content_version(video.professional_id)
+    if old_prefix and old_prefix != prefix:
+        schedule_cleanup(old_prefix)
+    logger.info('Vídeo %s processado em %s', video_id, prefix)
@@ -0,0 +1,147 @@
+"""
+Upload resumível (estilo tus 1.0.0) para o armazenamento local.
+
+Cada upload é um arquivo parcial em VIDEO_RESUMABLE_UPLOAD_DIR. Os chunks são
+copiados do stream da requisição direto para o disco (sem carregar o corpo em
+memória) e podem ser verificados pelo cabeçalho Upload-Checksum. Ao completar,
+o arquivo é movido para Video.video_file (video_upload_path), sem nova cópia
+quando o storage é o FileSystemStorage.
+"""
+import base64
+import binascii
+import hashlib
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = 'creation,checksum,termination'
+CHECKSUM_ALGORITHMS = ('sha1', 'sha256', 'md5')
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class ChecksumMismatch(Exception):
+    pass
+
+
+class InvalidChecksumHeader(Exception):
+    pass
+
+
+class PartialFileMissing(Exception):
+    """Arquivo parcial ausente ou menor que o offset gravado: o upload recomeça do zero."""
+
+
+class PartialUploadFile(File):
+    """Arquivo parcial já em disco: FileSystemStorage o move em vez de copiar."""
+
+    def __init__(self, path, name):
+        self._path = str(path)
+        super().__init__(open(self._path, 'rb'), name=name)
+
+    def temporary_file_path(self):
+        return self._path
+
+
+def upload_dir():
+    path = Path(getattr(settings, 'VIDEO_RESUMABLE_UPLOAD_DIR', settings.BASE_DIR / 'uploads_tmp'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def partial_path(upload):
+    return upload_dir() / f'{upload.pk}.part'
+
+
+def max_size():
+    return getattr(settings, 'VIDEO_RESUMABLE_MAX_SIZE', 5 * 1024 * 1024 * 1024)
+
+
+def parse_metadata(header):
+    """Upload-Metadata: 'chave base64,chave base64' -> dict."""
+    metadata = {}
+    for pair in (header or '').split(','):
+        pair = pair.strip()
+        if not pair:
+            continue
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value).decode() if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(f'Upload-Metadata inválido para "{key}".')
+    return metadata
+
+
+def parse_checksum(header):
+    """Upload-Checksum: '<algoritmo> <digest base64>' -> (algoritmo, digest bytes) ou None."""
+    if not header:
+        return None
+    algorithm, _, digest = header.strip().partition(' ')
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise InvalidChecksumHeader(f'Algoritmo de checksum não suportado: {algorithm}.')
+    try:
+        return algorithm, base64.b64decode(digest)
+    except binascii.Error:
+        raise InvalidChecksumHeader('Checksum inválido.')
+
+
+def append_chunk(upload, stream, length, checksum=None):
+    """
+    Acrescenta até `length` bytes do stream ao arquivo parcial, a partir de upload.offset.
+    Em caso de checksum divergente o arquivo volta ao offset anterior. Retorna o novo offset.
+    Com offset > 0 e arquivo parcial ausente (ou menor) levanta PartialFileMissing, em vez
+    de completar com zeros.
+    """
+    path = partial_path(upload)
+    if upload.offset and (not path.exists() or path.stat().st_size < upload.offset):
+        raise PartialFileMissing('Arquivo parcial não encontrado; reinicie o upload do offset 0.')
+    digest = hashlib.new(checksum[0]) if checksum else None
+    written = 0
+    with open(path, 'ab') as fh:
+        fh.truncate(upload.offset)
+        fh.seek(upload.offset)
+        remaining = length
+        while remaining > 0:
+            chunk = stream.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            fh.write(chunk)
+            if digest:
+                digest.update(chunk)
+            written += len(chunk)
+            remaining -= len(chunk)
+        if digest and digest.digest() != checksum[1]:
+            fh.truncate(upload.offset)
+            raise ChecksumMismatch('Checksum do chunk não confere.')
+    return upload.offset + written
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def attach_to_video(upload, video):
+    """Move o arquivo completo para video.video_file (usa video_upload_path)."""
+    path = partial_path(upload)
+    if upload.checksum and file_sha256(path) != upload.checksum.lower():
+        raise ChecksumMismatch('Checksum do arquivo não confere.')
+    content = PartialUploadFile(path, upload.filename)
+    try:
+        video.video_file.save(upload.filename, content, save=True)
+    finally:
+        content.close()
+    discard(upload)
+
+
+def discard(upload):
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
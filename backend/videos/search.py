@@ -0,0 +1,93 @@
+"""
+Busca de vídeos.
+
+No PostgreSQL usa a coluna Video.search_vector (tsvector armazenado, configuração
+'portuguese_unaccent' = português + unaccent, índice GIN) com ranking por relevância.
+Em outros bancos (SQLite nos testes/dev) cai para title/description__icontains.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections, models
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_config():
+    return getattr(settings, 'VIDEO_SEARCH_CONFIG', 'portuguese_unaccent')
+
+
+def fulltext_enabled(using='default'):
+    """Busca full-text só no PostgreSQL (e se não desativada em settings)."""
+    if not getattr(settings, 'VIDEO_SEARCH_FULLTEXT', True):
+        return False
+    return connections[using].vendor == 'postgresql'
+
+
+def search_vector_expression(title=None, description=None):
+    """
+    Expressão do tsvector. Sem argumentos usa as colunas atuais; title/description
+    permitem calcular a partir de valores novos (no mesmo INSERT/UPDATE que os grava).
+    """
+    from django.contrib.postgres.search import SearchVector
+    config = search_config()
+
+    def _source(value, column):
+        if value is None:
+            return models.F(column)
+        if hasattr(value, 'resolve_expression'):
+            return value
+        return models.Value(value, output_field=models.TextField())
+
+    return (
+        SearchVector(_source(title, 'title'), weight='A', config=config)
+        + SearchVector(_source(description, 'description'), weight='B', config=config)
+    )
+
+
+def update_search_vectors(queryset):
+    """Recalcula search_vector das linhas do queryset num único UPDATE (no-op fora do PostgreSQL)."""
+    if not fulltext_enabled(queryset.db):
+        return 0
+    return queryset.update(search_vector=search_vector_expression())
+
+
+def _prefix_query(value):
+    """'agacham sumô' -> 'agacham:* & sumô:*' (busca por prefixo a cada tecla digitada)."""
+    terms = _TERM_RE.findall(value)
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_videos(queryset, value, rank=False):
+    """
+    Filtra o queryset pelo termo. Com rank=True anota `search_rank` e ordena por relevância
+    (desempate por mais recente).
+    """
+    value = (value or '').strip()
+    if not value:
+        return queryset
+    if fulltext_enabled(queryset.db):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        raw = _prefix_query(value)
+        if not raw:
+            return queryset.none()
+        query = SearchQuery(raw, config=search_config(), search_type='raw')
+        queryset = queryset.filter(search_vector=query)
+        if rank:
+            queryset = queryset.annotate(
+                search_rank=SearchRank(models.F('search_vector'), query)
+            ).order_by('-search_rank', '-created_at', '-id')
+        return queryset
+    queryset = queryset.filter(
+        models.Q(title__icontains=value) | models.Q(description__icontains=value)
+    )
+    if rank:
+        # Fallback: título vale mais que descrição
+        queryset = queryset.annotate(
+            search_rank=models.Case(
+                models.When(title__icontains=value, then=models.Value(1.0)),
+                default=models.Value(0.5),
+                output_field=models.FloatField(),
+            )
+        ).order_by('-search_rank', '-created_at', '-id')
+    return queryset
@@ -1,8 +1,49 @@
+import posixpath
+
 from rest_framework import serializers
-from .models import Category, Video
+from .models import Category, Video, VideoUpload
+from . import bulk, categories as category_ops, resumable, uploads
+from .processing import enqueue_processing
+from .thumbnails import enqueue_thumbnails, srcset, variants_srcset
+from . import signing
 from users.models import ProfessionalProfile
 
 
+def _profile_id(request):
+    """PK do perfil profissional do usuário (o próprio user.pk) ou None."""
+    user = request.user if request else None
+    if user is None or not user.is_authenticated or not user.has_professional_profile:
+        return None
+    return user.pk
+
+
+def validate_professional_categories(request, value):
+    """Categorias informadas (já carregadas por CategoryIdsField) devem pertencer ao profissional logado."""
+    profile_id = _profile_id(request)
+    for cat in value or []:
+        if profile_id and cat.professional_id is not None and cat.professional_id != profile_id:
+            raise serializers.ValidationError('Só é possível usar categorias que você criou.')
+    return value or []
+
+
+class SignedMediaField(serializers.ReadOnlyField):
+    """Imagem do storage (thumbnail, poster) como URL assinada (signing.media_url)."""
+
+    def to_representation(self, value):
+        return signing.media_url(value.name if value else None, self.context.get('request'))
+
+
+class CategoryIdsField(serializers.ListField):
+    """IDs de categorias carregados numa única query (PrimaryKeyRelatedField faz uma por ID)."""
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        return category_ops.load_categories(super().to_internal_value(data))
+
+    def to_representation(self, value):
+        return [category.pk for category in (value.all() if hasattr(value, 'all') else value)]
+
+
 class CategorySerializer(serializers.ModelSerializer):
     parent = serializers.PrimaryKeyRelatedField(read_only=True)
     parent_name = serializers.SerializerMethodField()
@@ -33,8 +74,13 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'slug', 'description', 'parent', 'parent_name', 'display_name', 'children', 'created_at')
 
     def get_children(self, obj):
-        qs = getattr(obj, 'prefetched_children', None) or obj.children.all()
-        return CategoryTreeSerializer(qs, many=True).data
+        # children_map (parent_id -> filhos) vem da view quando a árvore foi carregada numa única query
+        children_map = self.context.get('children_map')
+        if children_map is not None:
+            qs = children_map.get(obj.pk, [])
+        else:
+            qs = getattr(obj, 'prefetched_children', None) or obj.children.all()
+        return CategoryTreeSerializer(qs, many=True, context=self.context).data
 
     def get_parent_name(self, obj):
         return obj.parent.name if obj.parent_id else None
@@ -46,32 +92,79 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
 
 
 class CategoryCreateSerializer(serializers.ModelSerializer):
-    """Criação de categoria ou subcategoria: slug gerado; pertence ao profissional logado."""
+    """Criação de categoria ou subcategoria: slug gerado (videos.categories); pertence ao profissional logado."""
     class Meta:
         model = Category
         fields = ('name', 'description', 'parent')
 
     def create(self, validated_data):
-        from django.utils.text import slugify
-        request = self.context.get('request')
-        professional = getattr(request.user, 'professional_profile', None)
-        if not professional:
+        professional_id = _profile_id(self.context.get('request'))
+        if not professional_id:
             raise serializers.ValidationError('Apenas profissionais podem criar categorias.')
         name = validated_data.get('name', '').strip()
         if not name:
             raise serializers.ValidationError({'name': 'Nome é obrigatório.'})
         parent = validated_data.get('parent')
-        if parent and parent.professional_id != professional.pk:
+        if parent and parent.professional_id != professional_id:
             raise serializers.ValidationError({'parent': 'Só é possível usar categorias suas como pai.'})
-        base_slug = slugify(name) or 'categoria'
-        slug = base_slug
-        n = 0
-        while Category.objects.filter(professional=professional, parent=parent, slug=slug).exists():
-            n += 1
-            slug = f'{base_slug}-{n}'
-        validated_data['slug'] = slug
-        validated_data['professional'] = professional
-        return Category.objects.create(**validated_data)
+        try:
+            return category_ops.create_category(
+                professional_id, name, parent=parent, description=validated_data.get('description', ''),
+            )
+        except category_ops.SlugConflict:
+            raise serializers.ValidationError({'name': ['Categoria criada ao mesmo tempo com esse nome; tente de novo.']})
+
+
+class CategoryNodeSerializer(serializers.Serializer):
+    """Nó da importação de árvore: nome, descrição e filhos (validados recursivamente)."""
+    name = serializers.CharField(max_length=100)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    children = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+
+    def validate_children(self, value):
+        depth = self.context.get('depth', 1) + 1
+        if value and depth > category_ops.max_import_depth():
+            raise serializers.ValidationError(f'Profundidade máxima: {category_ops.max_import_depth()} níveis.')
+        nodes, errors = [], []
+        for child in value:
+            serializer = CategoryNodeSerializer(data=child, context={**self.context, 'depth': depth})
+            valid = serializer.is_valid()
+            nodes.append(serializer.validated_data if valid else None)
+            errors.append({} if valid else serializer.errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return nodes
+
+
+class CategoryImportSerializer(serializers.Serializer):
+    """Importação de uma árvore de categorias (ex.: currículo inteiro) sob `parent` (opcional)."""
+    parent = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), required=False, allow_null=True)
+    categories = CategoryNodeSerializer(many=True, allow_empty=False)
+
+    def validate_parent(self, value):
+        if value and value.professional_id != _profile_id(self.context.get('request')):
+            raise serializers.ValidationError('Só é possível usar categorias suas como pai.')
+        return value
+
+    def validate_categories(self, value):
+        def count(nodes):
+            return sum(1 + count(node['children']) for node in nodes)
+        if count(value) > category_ops.max_import_nodes():
+            raise serializers.ValidationError(f'No máximo {category_ops.max_import_nodes()} categorias por importação.')
+        return value
+
+    def validate(self, attrs):
+        if not _profile_id(self.context.get('request')):
+            raise serializers.ValidationError('Apenas profissionais podem criar categorias.')
+        return attrs
+
+    def create(self, validated_data):
+        try:
+            return category_ops.import_tree(
+                _profile_id(self.context.get('request')), validated_data['categories'], validated_data.get('parent'),
+            )
+        except category_ops.SlugConflict:
+            raise serializers.ValidationError({'categories': ['Categorias criadas ao mesmo tempo com esses nomes; tente de novo.']})
 
 
 class CategoryUpdateSerializer(serializers.ModelSerializer):
@@ -88,24 +181,40 @@ class CategoryUpdateSerializer(serializers.ModelSerializer):
         instance = self.instance
         if instance and value and value.pk == instance.pk:
             raise serializers.ValidationError('Uma categoria não pode ser pai de si mesma.')
-        if instance and value and value.parent_id and value.parent_id == instance.pk:
+        # Pai dentro da própria subárvore (qualquer profundidade) formaria ciclo
+        if instance and value and value.is_descendant_of(instance):
             raise serializers.ValidationError('Não é possível criar ciclo na árvore.')
         return value
 
 
+class SignedURLListSerializer(serializers.ListSerializer):
+    """Assina as URLs da página inteira de uma vez (cache por vídeo e balde de validade)."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        if signing.signing_enabled():
+            self._context['signed_urls'] = signing.signed_urls(items, self.context.get('request'))
+        return super().to_representation(items)
+
+
 class VideoListSerializer(serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
+    url = serializers.SerializerMethodField()
     professional_name = serializers.SerializerMethodField()
     can_edit = serializers.SerializerMethodField()
+    thumbnail = SignedMediaField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Video
+        list_serializer_class = SignedURLListSerializer
         fields = (
             'id',
             'title',
             'description',
             'url',
             'thumbnail',
+            'thumbnails',
             'categories',
             'professional_name',
             'can_edit',
@@ -113,9 +222,15 @@ class VideoListSerializer(serializers.ModelSerializer):
             'updated_at',
         )
 
+    def get_url(self, obj):
+        return signing.video_url(obj, self.context.get('request'), self.context.get('signed_urls'))
+
     def get_professional_name(self, obj):
         return obj.professional.full_name or obj.professional.user.email
 
+    def get_thumbnails(self, obj):
+        return srcset(obj, self.context.get('request'))
+
     def get_can_edit(self, obj):
         request = self.context.get('request')
         if not request or not getattr(request, 'user', None) or not request.user.is_authenticated:
@@ -128,9 +243,117 @@ class VideoListSerializer(serializers.ModelSerializer):
         return False
 
 
+class VideoListValuesSerializer:
+    """
+    Mesma saída de VideoListSerializer(many=True), sem a maquinaria de campos do DRF:
+    os vídeos vêm de uma query .values() (ver rows()) e as categorias da página de uma
+    única query na tabela de ligação. Usado pelas listagens (muitas linhas por resposta).
+    """
+    VALUES = (
+        'id', 'title', 'description', 'video_file', 'video_url', 'thumbnail', 'thumbnail_variants',
+        'professional_id', 'professional__full_name', 'professional__user__email', 'created_at', 'updated_at',
+    )
+    CATEGORY_VALUES = (
+        'video_id', 'category_id', 'category__name', 'category__slug', 'category__description',
+        'category__parent_id', 'category__parent__name', 'category__created_at',
+    )
+    _datetime = serializers.DateTimeField()
+
+    def __init__(self, instance=None, many=True, context=None, **kwargs):
+        self.instance = instance
+        self.context = context or {}
+
+    @classmethod
+    def rows(cls, queryset):
+        """Queryset de dicts com as colunas usadas na listagem (mesmos filtros e ordenação)."""
+        return queryset.select_related(None).prefetch_related(None).values(*cls.VALUES)
+
+    def category_map(self, video_ids):
+        """{video_id: [categoria serializada, ...]} na ordem de Category.Meta.ordering."""
+        to_datetime = self._datetime.to_representation
+        categories = {}
+        links = (
+            Video.categories.through.objects.filter(video_id__in=video_ids)
+            .order_by('category__name', 'category_id')
+            .values_list(*self.CATEGORY_VALUES)
+        )
+        for video_id, pk, name, slug, description, parent_id, parent_name, created_at in links:
+            categories.setdefault(video_id, []).append({
+                'id': pk,
+                'name': name,
+                'slug': slug,
+                'description': description,
+                'parent': parent_id,
+                'parent_name': parent_name if parent_id else None,
+                'display_name': f'{parent_name} › {name}' if parent_id else name,
+                'created_at': to_datetime(created_at),
+            })
+        return categories
+
+    def _can_edit(self):
+        """Função professional_id -> can_edit (mesmas regras de VideoListSerializer.get_can_edit)."""
+        request = self.context.get('request')
+        user = getattr(request, 'user', None) if request else None
+        if not user or not user.is_authenticated:
+            return lambda professional_id: False
+        if user.role == 'admin':
+            return lambda professional_id: True
+        if user.role == 'professional':
+            return lambda professional_id: professional_id == user.id
+        return lambda professional_id: False
+
+    def _urls(self, rows, request):
+        """{video_id: url} com a mesma regra de signing.video_url para os vídeos com arquivo."""
+        file_field = Video._meta.get_field('video_file')
+        with_file = [row for row in rows if row['video_file']]
+        if not with_file:
+            return {}
+        if signing.signing_enabled():
+            videos = [Video(id=row['id'], video_file=row['video_file'], video_url=row['video_url']) for row in with_file]
+            signed = signing.signed_urls(videos, request)
+            return {video.pk: signed.get(video.pk) or video.url for video in videos}
+        return {row['id']: file_field.storage.url(row['video_file']) for row in with_file}
+
+    def to_representation(self, rows):
+        request = self.context.get('request')
+        rows = list(rows)
+        categories = self.category_map([row['id'] for row in rows])
+        urls = self._urls(rows, request)
+        can_edit = self._can_edit()
+        to_datetime = self._datetime.to_representation
+        data = []
+        for row in rows:
+            thumbnail = row['thumbnail']
+            data.append({
+                'id': row['id'],
+                'title': row['title'],
+                'description': row['description'],
+                'url': urls.get(row['id'], row['video_url'] or ''),
+                'thumbnail': signing.media_url(thumbnail, request),
+                'thumbnails': variants_srcset(row['thumbnail_variants'], thumbnail, request),
+                'categories': categories.get(row['id'], []),
+                'professional_name': row['professional__full_name'] or row['professional__user__email'],
+                'can_edit': can_edit(row['professional_id']),
+                'created_at': to_datetime(row['created_at']),
+                'updated_at': to_datetime(row['updated_at']),
+            })
+        return data
+
+    @property
+    def data(self):
+        if not hasattr(self, '_data'):
+            self._data = self.to_representation(self.instance or [])
+        return self._data
+
+
 class VideoDetailSerializer(serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
+    url = serializers.SerializerMethodField()
     professional_name = serializers.SerializerMethodField()
+    manifest_url = serializers.SerializerMethodField()
+    thumbnail = SignedMediaField()
+    poster = SignedMediaField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Video
@@ -140,19 +363,43 @@ class VideoDetailSerializer(serializers.ModelSerializer):
             'description',
             'url',
             'thumbnail',
+            'thumbnails',
             'categories',
             'professional',
             'professional_name',
             'created_at',
             'updated_at',
             'is_active',
+            'manifest_url',
+            'poster',
+            'processing_status',
+            'processing_progress',
         )
 
+    def get_url(self, obj):
+        return signing.video_url(obj, self.context.get('request'))
+
     def get_professional_name(self, obj):
         return obj.professional.full_name or obj.professional.user.email
 
+    def get_thumbnails(self, obj):
+        return srcset(obj, self.context.get('request'))
+
+    def get_manifest_url(self, obj):
+        """
+        Playlist HLS (master.m3u8) quando o processamento terminou; senão use `url`. A
+        assinatura cobre o diretório do HLS: playlists das renditions e segmentos inclusos.
+        """
+        if obj.processing_status != Video.ProcessingStatus.READY or not obj.hls_manifest:
+            return None
+        return signing.media_url(
+            obj.hls_manifest, self.context.get('request'), scope=posixpath.dirname(obj.hls_manifest),
+        )
+
 
 class VideoCreateUpdateSerializer(serializers.ModelSerializer):
+    categories = CategoryIdsField(required=False)
+
     class Meta:
         model = Video
         fields = (
@@ -172,6 +419,9 @@ class VideoCreateUpdateSerializer(serializers.ModelSerializer):
         video = Video.objects.create(professional=professional, **validated_data)
         if categories:
             video.categories.set(categories)
+        # Sem transcodificação, ainda extrai/redimensiona o thumbnail
+        if not enqueue_processing(video):
+            enqueue_thumbnails(video)
         return video
 
     def update(self, instance, validated_data):
@@ -181,14 +431,145 @@ class VideoCreateUpdateSerializer(serializers.ModelSerializer):
         instance.save()
         if categories is not None:
             instance.categories.set(categories)
+        if validated_data.get('video_file'):
+            if not enqueue_processing(instance):
+                enqueue_thumbnails(instance)
+        elif 'thumbnail' in validated_data:
+            enqueue_thumbnails(instance)
         return instance
 
     def validate_categories(self, value):
-        request = self.context.get('request')
-        profile = getattr(request.user, 'professional_profile', None) if request else None
-        for cat in value or []:
-            if not Category.objects.filter(pk=cat.pk).exists():
-                raise serializers.ValidationError('Categoria inválida.')
-            if profile and cat.professional_id is not None and cat.professional_id != profile.pk:
-                raise serializers.ValidationError('Só é possível usar categorias que você criou.')
-        return value or []
+        return validate_professional_categories(self.context.get('request'), value)
+
+
+class VideoBulkSerializer(serializers.Serializer):
+    """
+    Operação em lote (videos.bulk): `ids` dos vídeos, `categories` para set/add/remove e
+    `source`/`target` para move. Vídeos e categorias são validados com uma query cada.
+    """
+    action = serializers.ChoiceField(choices=bulk.ACTIONS)
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    categories = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+    source = serializers.IntegerField(min_value=1, required=False)
+    target = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_ids(self, value):
+        if len(value) > bulk.max_ids():
+            raise serializers.ValidationError(f'No máximo {bulk.max_ids()} vídeos por operação.')
+        return list(dict.fromkeys(value))
+
+    def validate(self, attrs):
+        action = attrs['action']
+        if action in (bulk.SET_CATEGORIES, bulk.ADD_CATEGORIES, bulk.REMOVE_CATEGORIES):
+            if action != bulk.SET_CATEGORIES and not attrs['categories']:
+                raise serializers.ValidationError({'categories': 'Informe as categorias.'})
+            self._check_categories(attrs['categories'], 'categories')
+            attrs['categories'] = list(dict.fromkeys(attrs['categories']))
+        elif action == bulk.MOVE:
+            for field in ('source', 'target'):
+                if field not in attrs:
+                    raise serializers.ValidationError({field: 'Informe a categoria de origem e a de destino.'})
+            self._check_categories([attrs['source'], attrs['target']], 'target')
+        attrs['videos'] = self._videos(attrs['ids'])
+        return attrs
+
+    def _videos(self, ids):
+        user = self.context['request'].user
+        qs = Video.objects.filter(pk__in=ids)
+        if user.role != 'admin':
+            qs = qs.filter(professional_id=user.pk)
+        videos = list(qs.values('id', 'professional_id'))
+        missing = set(ids) - {video['id'] for video in videos}
+        if missing:
+            raise serializers.ValidationError({'ids': f'Vídeos não encontrados: {sorted(missing)}.'})
+        return videos
+
+    def _check_categories(self, ids, field):
+        try:
+            validate_professional_categories(self.context['request'], category_ops.load_categories(ids))
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({field: exc.detail})
+
+
+class VideoUploadSerializer(serializers.ModelSerializer):
+    """Estado de um upload direto (S3 multipart)."""
+    part_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = VideoUpload
+        fields = (
+            'id', 'status', 'backend', 'filename', 'content_type', 'title', 'part_size',
+            'upload_length', 'offset', 'video', 'created_at',
+        )
+        read_only_fields = fields
+
+    def get_part_size(self, obj):
+        return uploads.part_size()
+
+
+class VideoUploadInitiateSerializer(serializers.ModelSerializer):
+    """Início do upload direto: metadados do vídeo que será criado na conclusão."""
+    categories = CategoryIdsField(required=False, write_only=True)
+    size = serializers.IntegerField(required=False, min_value=1, write_only=True)
+
+    class Meta:
+        model = VideoUpload
+        fields = ('filename', 'content_type', 'title', 'description', 'categories', 'size')
+
+    def validate_categories(self, value):
+        return validate_professional_categories(self.context.get('request'), value)
+
+    def validate_size(self, value):
+        if value and value > uploads.part_size() * uploads.MAX_PARTS:
+            raise serializers.ValidationError('Arquivo grande demais para upload em partes.')
+        return value
+
+    def create(self, validated_data):
+        validated_data.pop('size', None)
+        categories = validated_data.pop('categories', [])
+        validated_data['category_ids'] = [cat.pk for cat in categories]
+        return VideoUpload.objects.create(**validated_data)
+
+
+class ResumableUploadCreateSerializer(VideoUploadInitiateSerializer):
+    """Criação de upload resumível: tamanho obrigatório e sha256 (hex) opcional do arquivo inteiro."""
+    size = serializers.IntegerField(min_value=1)
+    checksum = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+
+    class Meta(VideoUploadInitiateSerializer.Meta):
+        fields = VideoUploadInitiateSerializer.Meta.fields + ('checksum',)
+
+    def validate_size(self, value):
+        if value > resumable.max_size():
+            raise serializers.ValidationError('Arquivo maior que o limite permitido.')
+        return value
+
+    def create(self, validated_data):
+        categories = validated_data.pop('categories', [])
+        validated_data['upload_length'] = validated_data.pop('size')
+        validated_data['category_ids'] = [cat.pk for cat in categories]
+        validated_data['backend'] = VideoUpload.Backend.RESUMABLE
+        return VideoUpload.objects.create(**validated_data)
+
+
+class UploadPartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1, max_value=uploads.MAX_PARTS)
+    etag = serializers.CharField(max_length=255)
+
+
+class VideoUploadSignPartsSerializer(serializers.Serializer):
+    part_numbers = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=uploads.MAX_PARTS),
+        min_length=1,
+        max_length=100,
+    )
+
+
+class VideoUploadCompleteSerializer(serializers.Serializer):
+    parts = UploadPartSerializer(many=True, allow_empty=False)
+
+    def validate_parts(self, value):
+        numbers = [p['part_number'] for p in value]
+        if len(numbers) != len(set(numbers)):
+            raise serializers.ValidationError('Partes duplicadas.')
+        return value
@@ -0,0 +1,32 @@
+"""
+Signals do app videos: trocam a versão de conteúdo do profissional (videos/content_cache.py)
+quando vídeos, categorias ou os vínculos vídeo-categoria mudam.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import ProfessionalProfile
+from .content_cache import bump_content_version
+from .models import Category, Video
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_on_content_change(sender, instance, **kwargs):
+    bump_content_version(instance.professional_id)
+
+
+@receiver(m2m_changed, sender=Video.categories.through)
+def bump_on_categories_change(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # instance é o Video (video.categories) ou a Category (category.videos); ambos têm professional_id
+        bump_content_version(instance.professional_id)
+
+
+@receiver(post_save, sender=ProfessionalProfile)
+def bump_on_profile_change(sender, instance, created, **kwargs):
+    """professional_name (full_name) aparece na listagem de vídeos."""
+    if not created:
+        bump_content_version(instance.pk)
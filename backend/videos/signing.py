@@ -0,0 +1,211 @@
+"""
+URLs assinadas e com validade para o arquivo dos vídeos.
+
+O acesso (ProfessionalStudent) é checado quando a API devolve o vídeo; a URL
+emitida carrega só a prova de que essa checagem foi feita, até expirar. Assim um
+cache de borda pode servir os bytes sem consultar o Django a cada requisição.
+
+- Storage local: /api/videos/<id>/stream/?expires=...&sig=... (HMAC com a SECRET_KEY),
+  aceito pelo VideoStreamView sem token JWT.
+- S3: URL pré-assinada (get_object) ou, com VIDEO_CLOUDFRONT_KEY_ID/PRIVATE_KEY,
+  URL assinada do CloudFront (política canned) no AWS_S3_CUSTOM_DOMAIN.
+
+Os arquivos derivados (playlists e segmentos HLS, poster, thumbnails) passam por
+/api/videos/media/<expires>/<sig>/<nome no storage> (media_url), com a mesma validade.
+A assinatura do manifest cobre o diretório do HLS: as URIs relativas das playlists
+(v0/index.m3u8, seg_00001.ts) herdam o prefixo assinado sem reescrever os arquivos.
+No S3 o VideoMediaView devolve as playlists e redireciona o resto para remote_object_url.
+
+A validade é alinhada a "baldes" de VIDEO_SIGNED_URL_TTL segundos: dentro do mesmo
+balde o mesmo vídeo gera a mesma URL (cacheável na borda e no navegador), e a
+assinatura remota é guardada no cache do Django por (vídeo, balde).
+"""
+import posixpath
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from . import uploads
+
+_SALT = 'videos.signing'
+
+
+def signing_enabled():
+    return getattr(settings, 'VIDEO_SIGNED_URLS', True)
+
+
+def ttl():
+    return max(getattr(settings, 'VIDEO_SIGNED_URL_TTL', 3600), 60)
+
+
+def current_bucket(now=None):
+    return int(now if now is not None else time.time()) // ttl()
+
+
+def bucket_expires(bucket):
+    """Fim da validade das URLs do balde: entre TTL e 2×TTL a partir da emissão."""
+    return (bucket + 2) * ttl()
+
+
+def _is_local(video):
+    try:
+        video.video_file.path
+    except NotImplementedError:
+        return False
+    return True
+
+
+# --- storage local (HMAC) ---
+
+def stream_signature(video_id, expires):
+    return salted_hmac(_SALT, f'{video_id}:{expires}', algorithm='sha256').hexdigest()[:32]
+
+
+def verify_stream_signature(video_id, expires, signature):
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires < time.time() or not signature:
+        return False
+    return constant_time_compare(stream_signature(video_id, expires), signature)
+
+
+def local_url(video, expires):
+    query = urlencode({'expires': expires, 'sig': stream_signature(video.pk, expires)})
+    return f'{reverse("video-stream", args=[video.pk])}?{query}'
+
+
+# --- arquivos derivados (HLS, poster, thumbnails) ---
+
+def media_signature(scope, expires):
+    return salted_hmac(_SALT, f'media:{scope}:{expires}', algorithm='sha256').hexdigest()[:32]
+
+
+def media_url(name, request=None, scope=None):
+    """
+    URL de um arquivo do storage: assinada (válida até o fim do balde atual) ou, sem
+    VIDEO_SIGNED_URLS, a URL pública do storage. `scope` (diretório) libera também os
+    arquivos abaixo dele.
+    """
+    if not name:
+        return None
+    if signing_enabled():
+        expires = bucket_expires(current_bucket())
+        url = reverse('video-media', kwargs={
+            'expires': expires, 'signature': media_signature(scope or name, expires), 'name': name,
+        })
+    else:
+        url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def verify_media_signature(name, expires, signature):
+    """A assinatura vale para o próprio arquivo ou para um dos diretórios acima dele."""
+    if not signature or expires < time.time():
+        return False
+    if posixpath.normpath(name) != name or name.startswith('/'):
+        return False
+    scope = name
+    while scope:
+        if constant_time_compare(media_signature(scope, expires), signature):
+            return True
+        scope = posixpath.dirname(scope)
+    return False
+
+
+# --- S3 / CloudFront ---
+
+@lru_cache(maxsize=1)
+def cloudfront_signer():
+    key_id = getattr(settings, 'VIDEO_CLOUDFRONT_KEY_ID', '')
+    private_key = getattr(settings, 'VIDEO_CLOUDFRONT_PRIVATE_KEY', '')
+    if not key_id or not private_key:
+        return None
+    try:
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import padding
+    except ImportError as exc:
+        raise ImproperlyConfigured('URLs assinadas do CloudFront exigem o pacote cryptography.') from exc
+    from botocore.signers import CloudFrontSigner
+
+    key = serialization.load_pem_private_key(private_key.replace('\\n', '\n').encode(), password=None)
+    return CloudFrontSigner(key_id, lambda message: key.sign(message, padding.PKCS1v15(), hashes.SHA1()))
+
+
+def remote_url(video, expires):
+    return remote_object_url(video.video_file.name, expires)
+
+
+def remote_object_url(name, expires):
+    """URL assinada (CloudFront ou S3 pré-assinada) de um objeto do bucket, válida até `expires`."""
+    signer = cloudfront_signer()
+    if signer is not None:
+        domain = getattr(settings, 'AWS_S3_CUSTOM_DOMAIN', None)
+        if not domain:
+            raise ImproperlyConfigured('URLs do CloudFront exigem AWS_S3_CUSTOM_DOMAIN (domínio da distribuição).')
+        return signer.generate_presigned_url(
+            f'https://{domain}/{uploads.object_key(name)}',
+            date_less_than=datetime.fromtimestamp(expires, tz=timezone.utc),
+        )
+    return uploads.s3_client().generate_presigned_url(
+        'get_object',
+        Params={'Bucket': settings.AWS_STORAGE_BUCKET_NAME, 'Key': uploads.object_key(name)},
+        ExpiresIn=max(int(expires - time.time()), 1),
+    )
+
+
+def _cache_key(video, bucket):
+    return f'signed-url:{video.pk}:{bucket}'
+
+
+def signed_urls(videos, request=None):
+    """
+    {video.pk: URL} para os vídeos com arquivo (os demais ficam de fora). As
+    assinaturas remotas da página inteira vêm do cache numa única consulta.
+    """
+    bucket = current_bucket()
+    expires = bucket_expires(bucket)
+    urls = {}
+    remote = []
+    for video in videos:
+        if not video.video_file:
+            continue
+        if _is_local(video):
+            url = local_url(video, expires)
+            urls[video.pk] = request.build_absolute_uri(url) if request is not None else url
+        else:
+            remote.append(video)
+    if remote:
+        keys = {_cache_key(video, bucket): video for video in remote}
+        cached = cache.get_many(list(keys))
+        missing = {}
+        for key, video in keys.items():
+            entry = cached.get(key)
+            # O nome do arquivo entra no valor: trocar o arquivo invalida a URL em cache
+            if entry and entry[0] == video.video_file.name:
+                urls[video.pk] = entry[1]
+            else:
+                urls[video.pk] = remote_url(video, expires)
+                missing[key] = (video.video_file.name, urls[video.pk])
+        if missing:
+            # A chave muda com o balde; depois de um TTL a entrada não é mais consultada
+            cache.set_many(missing, timeout=ttl())
+    return urls
+
+
+def video_url(video, request=None, urls=None):
+    """URL de reprodução do vídeo: assinada quando há arquivo, senão o link externo."""
+    if not video.video_file or not signing_enabled():
+        return video.url
+    if urls is None:
+        urls = signed_urls([video], request)
+    return urls.get(video.pk) or video.url
@@ -0,0 +1,183 @@
+"""
+Entrega do Video.video_file em storage local com suporte a Range (seek no player).
+
+O handler de `static()` não entende Range: cada seek baixa o arquivo do início e
+segura um worker durante toda a transferência. Aqui respondemos 206 com apenas o
+trecho pedido, com ETag/Last-Modified (If-Range, If-None-Match) e um objeto de
+arquivo com fileno(): o gunicorn envia o trecho via os.sendfile (zero-copy).
+
+Com VIDEO_STREAM_OFFLOAD o Django só checa o acesso e delega o envio ao proxy
+reverso: 'x-accel-redirect' (nginx, location interna em VIDEO_STREAM_ACCEL_PREFIX)
+ou 'x-sendfile' (Apache mod_xsendfile / lighttpd).
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+OFFLOAD_ACCEL = 'x-accel-redirect'
+OFFLOAD_SENDFILE = 'x-sendfile'
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Tipos do HLS que o mimetypes não conhece em todas as plataformas
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/mp2t', '.ts')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """
+    Janela [start, start + length) de um arquivo aberto. read() nunca passa do fim
+    da janela; fileno() deixa o gunicorn usar sendfile a partir da posição atual,
+    limitado pelo Content-Length.
+    """
+
+    def __init__(self, fh, start, length):
+        fh.seek(start)
+        self._fh = fh
+        self.remaining = length
+        self.name = fh.name
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self._fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._fh.fileno()
+
+    def close(self):
+        self._fh.close()
+
+
+def local_path(video):
+    """Caminho do arquivo no disco, ou None se o storage não for local (ex.: S3)."""
+    if not video.video_file:
+        return None
+    try:
+        return video.video_file.path
+    except NotImplementedError:
+        return None
+
+
+def make_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusivos do header Range, ou None para servir o arquivo inteiro
+    (sem Range, sintaxe inválida ou vários intervalos). Intervalo fora do arquivo
+    levanta RangeNotSatisfiable.
+    """
+    match = _RANGE_RE.match((header or '').replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Sufixo: últimos N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def if_range_matches(request, etag, last_modified):
+    """If-Range ausente ou ainda válido (mesmo ETag forte ou mesma data) -> Range pode ser usado."""
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _offload_response(path, mode):
+    response = HttpResponse()
+    if mode == OFFLOAD_ACCEL:
+        relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        prefix = getattr(settings, 'VIDEO_STREAM_ACCEL_PREFIX', '/protected-media/').rstrip('/')
+        response['X-Accel-Redirect'] = quote(f'{prefix}/{relative}')
+    else:
+        response['X-Sendfile'] = path
+    # Content-Type fica a cargo do proxy (pelo arquivo)
+    del response['Content-Type']
+    return response
+
+
+def serve(request, video, public=False, max_age=None):
+    """
+    Resposta para GET/HEAD do arquivo do vídeo (200, 206, 304, 412 ou 416).
+    `public` (URL assinada) permite cache compartilhado (CDN) por até `max_age` segundos.
+    """
+    return serve_file(request, local_path(video), public=public, max_age=max_age)
+
+
+def serve_file(request, path, public=False, max_age=None):
+    """serve() para um arquivo qualquer do MEDIA_ROOT (segmentos HLS, poster, thumbnails)."""
+    stat = os.stat(path)
+    max_age = min(getattr(settings, 'VIDEO_STREAM_MAX_AGE', 3600), max_age if max_age is not None else 3600)
+    cache_control = {'public': True} if public else {'private': True}
+    mode = getattr(settings, 'VIDEO_STREAM_OFFLOAD', '')
+    if mode in (OFFLOAD_ACCEL, OFFLOAD_SENDFILE):
+        response = _offload_response(path, mode)
+        patch_cache_control(response, max_age=max_age, **cache_control)
+        return response
+
+    etag = make_etag(stat)
+    last_modified = int(stat.st_mtime)
+    headers = HttpResponse()
+    headers['ETag'] = etag
+    headers['Last-Modified'] = http_date(last_modified)
+    headers['Accept-Ranges'] = 'bytes'
+    patch_cache_control(headers, max_age=max_age, **cache_control)
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified, response=headers)
+    if conditional is not headers:
+        return conditional
+
+    size = stat.st_size
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size) if size else None
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range and not if_range_matches(request, etag, last_modified):
+        byte_range = None
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, status=206 if byte_range else 200)
+    else:
+        fh = open(path, 'rb')
+        body = FileRange(fh, start, length) if byte_range else fh
+        response = FileResponse(body, content_type=content_type, status=206 if byte_range else 200)
+    for header in ('ETag', 'Last-Modified', 'Accept-Ranges', 'Cache-Control'):
+        response[header] = headers[header]
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.benchmark import auth_client
+from videos import bulk
+from videos.models import Category, Video
+
+from .utils import create_professional
+
+URL = '/api/videos/bulk/'
+
+
+@override_settings(ALLOWED_HOSTS=['*'], QUERY_BUDGET_MODE='raise')
+class VideoBulkTests(TestCase):
+    """No tamanho máximo (VIDEO_BULK_MAX_IDS) cada operação cabe no orçamento de 'video-bulk'."""
+
+    def setUp(self):
+        cache.clear()
+        self.user, profile = create_professional()
+        self.client = auth_client(self.user)
+        self.videos = Video.objects.bulk_create(
+            Video(title=f'Vídeo {i}', video_url=f'https://cdn.example.com/{i}.mp4', professional=profile)
+            for i in range(bulk.max_ids())
+        )
+        self.ids = [video.pk for video in self.videos]
+        self.categories = [
+            Category.objects.create(professional=profile, name=f'Categoria {i}', slug=f'categoria-{i}')
+            for i in range(5)
+        ]
+        self.category_ids = [category.pk for category in self.categories]
+
+    def _post(self, **data):
+        response = self.client.post(URL, {'ids': self.ids, **data}, content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['data']
+
+    def test_set_categories_at_max_size(self):
+        Video.categories.through.objects.create(video=self.videos[0], category=self.categories[0])
+        data = self._post(action=bulk.SET_CATEGORIES, categories=self.category_ids)
+        self.assertEqual(data['changed'], len(self.ids))
+        self.assertEqual(Video.categories.through.objects.count(), len(self.ids) * len(self.category_ids))
+
+    def test_add_then_move_and_remove_at_max_size(self):
+        self._post(action=bulk.ADD_CATEGORIES, categories=self.category_ids[:2])
+        data = self._post(action=bulk.MOVE, source=self.category_ids[0], target=self.category_ids[1])
+        self.assertEqual(data['changed'], len(self.ids))
+        self.assertFalse(Video.categories.through.objects.filter(category_id=self.category_ids[0]).exists())
+        data = self._post(action=bulk.REMOVE_CATEGORIES, categories=self.category_ids)
+        self.assertEqual(data['changed'], len(self.ids))
+
+    def test_deactivate_at_max_size(self):
+        data = self._post(action=bulk.DEACTIVATE)
+        self.assertEqual(data['changed'], len(self.ids))
+        self.assertFalse(Video.objects.filter(is_active=True).exists())
+
+    def test_delete_at_max_size(self):
+        Video.categories.through.objects.create(video=self.videos[0], category=self.categories[0])
+        data = self._post(action=bulk.DELETE)
+        self.assertEqual(data['changed'], len(self.ids))
+        self.assertFalse(Video.objects.exists())
+        self.assertFalse(Video.categories.through.objects.exists())
@@ -0,0 +1,65 @@
+import asyncio
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+
+from core.benchmark import auth_client
+from videos import categories
+from videos.models import Category
+from videos.views import CategoryListCreateView
+
+from .utils import create_professional
+
+
+class RootSlugTests(TestCase):
+    def setUp(self):
+        _, self.profile = create_professional()
+
+    def test_root_slug_is_unique_per_professional(self):
+        Category.objects.create(professional=self.profile, name='Pernas', slug='pernas')
+        with self.assertRaises(IntegrityError) as ctx, transaction.atomic():
+            Category.objects.create(professional=self.profile, name='Pernas', slug='pernas')
+        self.assertTrue(categories._is_slug_conflict(ctx.exception))
+        _, other = create_professional('other')
+        Category.objects.create(professional=other, name='Pernas', slug='pernas')
+
+    def test_concurrent_root_create_retries_with_next_slug(self):
+        Category.objects.create(professional=self.profile, name='Pernas', slug='pernas')
+        siblings = categories.taken_slugs(self.profile.pk, [(None, 'pernas')])
+        # Primeira tentativa não vê o irmão (criado por outra requisição ao mesmo tempo)
+        with mock.patch.object(categories, 'taken_slugs', side_effect=[set(), siblings]) as taken:
+            category = categories.create_category(self.profile.pk, 'Pernas')
+        self.assertEqual(category.slug, 'pernas-1')
+        self.assertEqual(taken.call_count, 2)
+
+
+@override_settings(ALLOWED_HOSTS=['*'], CONTENT_CACHE_TIMEOUT=0)
+class CategoryListSerializationTests(TestCase):
+    """A listagem async serializa fora do event loop, medida pelo timer('serialization')."""
+
+    def setUp(self):
+        cache.clear()
+        user, profile = create_professional()
+        root = Category.objects.create(professional=profile, name='Pernas', slug='pernas')
+        Category.objects.create(professional=profile, name='Agachamento', slug='agachamento', parent=root)
+        self.client = auth_client(user)
+
+    def test_flat_and_tree_serialize_off_the_event_loop(self):
+        loops = []
+        original = CategoryListCreateView._serialize
+
+        def serialize(view, serializer):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return original(view, serializer)
+
+        with mock.patch.object(CategoryListCreateView, '_serialize', serialize):
+            flat = self.client.get('/api/categories/').json()['data']
+            tree = self.client.get('/api/categories/?tree=1').json()['data']
+        self.assertEqual(len(flat), 2)
+        self.assertEqual([len(node['children']) for node in tree], [1])
+        self.assertEqual(loops, [None, None])
@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+from videos.filters import VideoFilter
+from videos.models import Category, Video
+
+from .utils import create_professional
+
+
+class CategoryDescendantsFilterTests(TestCase):
+    def setUp(self):
+        _, profile = create_professional()
+        _, other = create_professional('other')
+        self.root = Category.objects.create(professional=profile, name='Pernas', slug='pernas')
+        child = Category.objects.create(professional=profile, name='Quadríceps', slug='quadriceps', parent=self.root)
+        foreign = Category.objects.create(professional=other, name='Costas', slug='costas')
+        self.in_root = self.video(profile, self.root)
+        self.in_child = self.video(profile, child)
+        self.foreign = self.video(other, foreign)
+
+    def video(self, profile, category):
+        video = Video.objects.create(title=category.name, professional=profile, video_url='https://cdn.example.com/a.mp4')
+        video.categories.add(category)
+        return video
+
+    def filter(self, **data):
+        return set(VideoFilter(data, queryset=Video.objects.all()).qs)
+
+    def test_descendants_include_subtree(self):
+        self.assertEqual(self.filter(category=self.root.pk, descendants='1'), {self.in_root, self.in_child})
+        self.assertEqual(self.filter(category=self.root.pk), {self.in_root})
+
+    def test_empty_path_does_not_match_every_category(self):
+        # Linha gravada sem Category.save (QuerySet.update/bulk_create)
+        Category.objects.filter(pk=self.root.pk).update(path='')
+        self.assertEqual(self.filter(category=self.root.pk, descendants='1'), {self.in_root})
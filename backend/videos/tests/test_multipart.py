@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+import boto3
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.benchmark import auth_client
+from videos import uploads
+from videos.models import Video, VideoUpload
+
+from .utils import create_professional
+
+try:
+    from moto import mock_aws
+except ImportError:  # moto fica em requirements-dev.txt
+    mock_aws = None
+
+BUCKET = 'myfit-test'
+PART = b'x' * uploads.MIN_PART_SIZE
+
+
+@skipUnless(mock_aws, 'requer moto (requirements-dev.txt)')
+@override_settings(
+    ALLOWED_HOSTS=['*'], USE_S3=True, AWS_STORAGE_BUCKET_NAME=BUCKET, AWS_S3_REGION_NAME='us-east-1',
+    AWS_ACCESS_KEY_ID='testing', AWS_SECRET_ACCESS_KEY='testing', AWS_S3_ENDPOINT_URL=None,
+    VIDEO_PROCESSING_ENABLED=False,
+)
+class MultipartUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        uploads.s3_client.cache_clear()
+        self.addCleanup(uploads.s3_client.cache_clear)
+        # Chave sob o prefixo 'media' do MediaStorage do S3 (o módulo foi importado sem USE_S3)
+        storage = mock.patch('videos.storage.MediaStorage', SimpleNamespace(location='media'))
+        storage.start()
+        self.addCleanup(storage.stop)
+        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.s3.create_bucket(Bucket=BUCKET)
+        self.user, _ = create_professional()
+        self.client = auth_client(self.user)
+
+    def initiate(self):
+        response = self.client.post(
+            '/api/videos/uploads/', {'filename': 'treino.mp4', 'content_type': 'video/mp4', 'title': 'Treino'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return VideoUpload.objects.get(pk=response.json()['data']['id'])
+
+    def upload_parts(self, upload, *parts):
+        response = self.client.post(
+            f'/api/videos/uploads/{upload.pk}/parts/', {'part_numbers': list(range(1, len(parts) + 1))},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        etags = []
+        for signed, body in zip(response.json()['data']['parts'], parts):
+            put = requests.put(signed['url'], data=body, timeout=10)
+            self.assertEqual(put.status_code, 200)
+            etags.append({'part_number': signed['part_number'], 'etag': put.headers['ETag']})
+        return etags
+
+    def test_video_only_exists_after_complete(self):
+        upload = self.initiate()
+        parts = self.upload_parts(upload, PART, b'fim')
+        self.assertFalse(Video.objects.exists())
+        response = self.client.post(
+            f'/api/videos/uploads/{upload.pk}/complete/', {'parts': parts}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, VideoUpload.Status.COMPLETED)
+        self.assertEqual(upload.video.video_file.name, upload.storage_name)
+        stored = self.s3.head_object(Bucket=BUCKET, Key=uploads.object_key(upload.storage_name))
+        self.assertEqual(stored['ContentLength'], len(PART) + 3)
+
+    def test_abort_discards_parts_and_creates_no_video(self):
+        upload = self.initiate()
+        self.upload_parts(upload, PART)
+        self.assertEqual(self.client.delete(f'/api/videos/uploads/{upload.pk}/').status_code, 204)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, VideoUpload.Status.ABORTED)
+        self.assertFalse(Video.objects.exists())
+        self.assertNotIn('Uploads', self.s3.list_multipart_uploads(Bucket=BUCKET))
+        # Upload abortado não pode mais ser concluído
+        response = self.client.post(
+            f'/api/videos/uploads/{upload.pk}/complete/', {'parts': [{'part_number': 1, 'etag': '"x"'}]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.benchmark import auth_client
+from videos.models import Video
+
+from .utils import create_professional
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class VideoOwnershipTests(TestCase):
+    """ClaimsUser.pk é inteiro: as checagens de dono comparam com as FKs."""
+
+    def setUp(self):
+        # Versão das claims em cache sobrevive ao rollback entre testes (pks se repetem)
+        cache.clear()
+        self.user, profile = create_professional()
+        self.video = Video.objects.create(title='Agachamento', video_url='https://cdn.example.com/a.mp4', professional=profile)
+        self.client = auth_client(self.user)
+
+    def test_owner_can_read_update_and_delete(self):
+        url = f'/api/videos/{self.video.pk}/edit/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.patch(url, {'title': 'Agachamento livre'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+
+    def test_other_professional_is_forbidden(self):
+        other, _ = create_professional('other')
+        response = auth_client(other).get(f'/api/videos/{self.video.pk}/edit/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_can_edit_on_own_list(self):
+        results = self.client.get('/api/videos/me/').json()
+        results = results.get('results', results)
+        self.assertTrue(results and all(video['can_edit'] for video in results))
@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from core import jobs as core_jobs
+from core.models import Job
+from videos import jobs, processing, thumbnails
+from videos.models import Video
+
+from .utils import create_professional
+
+
+class ProcessingJobTests(TestCase):
+    """Thumbnails só depois do último resultado do processamento, sem tarefas repetidas."""
+
+    def setUp(self):
+        _, profile = create_professional()
+        self.video = Video.objects.create(title='Supino', video_file='videos/supino.mp4', professional=profile)
+        # close_old_connections derrubaria a conexão da transação do teste
+        patcher = mock.patch.object(core_jobs, 'close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _thumbnail_jobs(self):
+        return Job.objects.filter(name=thumbnails.THUMBNAIL_JOB).count()
+
+    def test_failed_attempt_that_will_retry_does_not_queue_thumbnails(self):
+        job = core_jobs.enqueue(processing.PROCESS_JOB, video_id=self.video.pk, max_attempts=2)
+        with mock.patch.object(processing, 'process_video', side_effect=processing.ProcessingError('ffmpeg')), \
+                self.assertLogs('core.jobs', 'ERROR'):
+            self.assertEqual(core_jobs.execute(job.pk), Job.Status.QUEUED)
+            self.assertEqual(self._thumbnail_jobs(), 0)
+            self.assertEqual(core_jobs.execute(job.pk), Job.Status.FAILED)
+        self.assertEqual(self._thumbnail_jobs(), 1)
+
+    def test_success_queues_thumbnails_once(self):
+        thumbnails.enqueue_thumbnails(self.video)
+        job = core_jobs.enqueue(processing.PROCESS_JOB, video_id=self.video.pk)
+        with mock.patch.object(processing, 'process_video'):
+            self.assertEqual(core_jobs.execute(job.pk), Job.Status.DONE)
+        self.assertEqual(self._thumbnail_jobs(), 1)
+
+
+class RenditionCleanupTests(TestCase):
+    """O reprocessamento agenda a remoção do prefixo HLS anterior."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        _, profile = create_professional()
+        self.old = f'hls/{profile.pk}/1/old'
+        for name in ('master.m3u8', 'poster.jpg', 'v0/index.m3u8', 'v0/seg_00000.ts'):
+            default_storage.save(f'{self.old}/{name}', ContentFile(b'x'))
+        self.video = Video.objects.create(
+            title='Supino', video_file='videos/supino.mp4', professional=profile,
+            hls_manifest=f'{self.old}/master.m3u8', poster=f'{self.old}/poster.jpg', thumbnail=f'{self.old}/poster.jpg',
+        )
+
+    def _process(self):
+        def run_ffmpeg(cmd, *args, **kwargs):
+            (Path(cmd[-1]).parent.parent / 'v0' / 'index.m3u8').write_text('#EXTM3U')
+            (Path(cmd[-1]).parent.parent / 'master.m3u8').write_text('#EXTM3U')
+
+        info = {'duration': 10.0, 'height': 360, 'has_audio': False}
+        with mock.patch.object(processing, 'local_source', return_value=Path('supino.mp4')), \
+                mock.patch.object(processing, 'probe', return_value=info), \
+                mock.patch.object(processing, 'run_ffmpeg', side_effect=run_ffmpeg), \
+                mock.patch.object(processing, 'extract_poster', side_effect=lambda s, target, t: Path(target).write_bytes(b'jpg')):
+            processing.process_video(self.video.pk)
+
+    def test_reprocess_schedules_old_prefix_cleanup(self):
+        self._process()
+        self.video.refresh_from_db()
+        prefix = self.video.hls_manifest.rsplit('/', 1)[0]
+        self.assertNotEqual(prefix, self.old)
+        self.assertEqual(self.video.thumbnail.name, f'{prefix}/poster.jpg')
+        job = Job.objects.get(name=processing.CLEANUP_JOB)
+        self.assertEqual(job.payload, {'prefix': self.old})
+
+        jobs.delete_renditions(**job.payload)
+        self.assertFalse(default_storage.exists(f'{self.old}/v0/seg_00000.ts'))
+        self.assertFalse(default_storage.exists(self.old))
+        self.assertTrue(default_storage.exists(self.video.hls_manifest))
+
+    def test_first_processing_schedules_nothing(self):
+        Video.objects.filter(pk=self.video.pk).update(hls_manifest='', thumbnail='')
+        self._process()
+        self.assertFalse(Job.objects.filter(name=processing.CLEANUP_JOB).exists())
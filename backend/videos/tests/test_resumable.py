@@ -0,0 +1,89 @@
+import base64
+import hashlib
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.benchmark import auth_client
+from videos import resumable
+from videos.models import Video, VideoUpload
+
+from .utils import create_professional
+
+CONTENT = b'0123456789' * 100
+
+
+def _metadata(**fields):
+    return ','.join(f'{key} {base64.b64encode(value.encode()).decode()}' for key, value in fields.items())
+
+
+class ResumableUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.mkdtemp(prefix='myfit-test-')
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        settings_override = override_settings(
+            ALLOWED_HOSTS=['*'], MEDIA_ROOT=tmp, VIDEO_RESUMABLE_UPLOAD_DIR=f'{tmp}/parts',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user, _ = create_professional()
+        self.client = auth_client(self.user)
+
+    def create_upload(self, checksum=None):
+        response = self.client.post(
+            '/api/videos/resumable/',
+            HTTP_TUS_RESUMABLE=resumable.TUS_VERSION,
+            HTTP_UPLOAD_LENGTH=str(len(CONTENT)),
+            HTTP_UPLOAD_METADATA=_metadata(
+                filename='treino.mp4', filetype='video/mp4', title='Treino',
+                checksum=checksum or hashlib.sha256(CONTENT).hexdigest(),
+            ),
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return VideoUpload.objects.get(professional__user=self.user)
+
+    def patch(self, upload, offset, data):
+        return self.client.patch(
+            f'/api/videos/resumable/{upload.pk}/', data,
+            content_type='application/offset+octet-stream',
+            HTTP_TUS_RESUMABLE=resumable.TUS_VERSION, HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_chunks_complete_into_video(self):
+        upload = self.create_upload()
+        self.assertEqual(self.patch(upload, 0, CONTENT[:400]).status_code, 204)
+        self.assertFalse(Video.objects.exists())
+        response = self.patch(upload, 400, CONTENT[400:])
+        self.assertEqual(response.status_code, 204)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, VideoUpload.Status.COMPLETED)
+        self.assertEqual(response['Upload-Video-Id'], str(upload.video_id))
+        with upload.video.video_file.open('rb') as fh:
+            self.assertEqual(fh.read(), CONTENT)
+
+    def test_file_checksum_mismatch_restarts_from_zero(self):
+        upload = self.create_upload(checksum='0' * 64)
+        self.patch(upload, 0, CONTENT[:400])
+        self.assertEqual(self.patch(upload, 400, CONTENT[400:]).status_code, 460)
+        upload.refresh_from_db()
+        self.assertEqual(upload.offset, 0)
+        self.assertEqual(upload.status, VideoUpload.Status.PENDING)
+        self.assertFalse(Video.objects.exists())
+        self.assertFalse(resumable.partial_path(upload).exists())
+
+    def test_missing_partial_file_is_not_zero_padded(self):
+        upload = self.create_upload()
+        self.patch(upload, 0, CONTENT[:400])
+        resumable.discard(upload)
+        response = self.patch(upload, 400, CONTENT[400:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '0')
+        self.assertFalse(resumable.partial_path(upload).exists())
+        # Recomeça do zero e completa com o conteúdo certo
+        self.assertEqual(self.patch(upload, 0, CONTENT).status_code, 204)
+        upload.refresh_from_db()
+        with upload.video.video_file.open('rb') as fh:
+            self.assertEqual(fh.read(), CONTENT)
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.benchmark import auth_client
+from videos.models import Video
+
+from .utils import create_professional
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class VideoSearchTests(TestCase):
+    """Mesmas expectativas na busca textual do PostgreSQL e no fallback (icontains) dos outros bancos."""
+
+    def setUp(self):
+        cache.clear()
+        self.user, profile = create_professional()
+        self.client = auth_client(self.user)
+
+        def video(title, description=''):
+            return Video.objects.create(
+                title=title, description=description, professional=profile, video_url='https://cdn.example.com/a.mp4',
+            )
+
+        self.in_title = video('Agachamento livre')
+        self.in_description = video('Treino de pernas', 'Séries de agachamento com barra')
+        self.unrelated = video('Supino reto', 'Peito e tríceps')
+
+    def ids(self, **params):
+        response = self.client.get('/api/videos/', params)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        results = body.get('results', body) if isinstance(body, dict) else body
+        return [video['id'] for video in results]
+
+    def test_search_matches_title_and_description(self):
+        self.assertCountEqual(self.ids(search='agacha'), [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(self.ids(search='supino'), [self.unrelated.pk])
+        self.assertEqual(self.ids(search='natação'), [])
+
+    def test_relevance_ranks_title_matches_first(self):
+        # Sem relevância o mais recente vem antes, mesmo com o termo só na descrição
+        self.assertEqual(self.ids(search='agacha'), [self.in_description.pk, self.in_title.pk])
+        self.assertEqual(
+            self.ids(search='agacha', ordering='relevance'), [self.in_title.pk, self.in_description.pk],
+        )
+
+    def test_blank_search_returns_everything(self):
+        self.assertEqual(len(self.ids(search='  ')), 3)
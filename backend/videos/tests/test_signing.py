@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from core.benchmark import auth_client
+from videos import signing
+from videos.models import Video
+
+from .utils import create_professional
+
+PREFIX = 'hls/1/1/abc'
+
+
+class SignedMediaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.mkdtemp(prefix='myfit-test-')
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        settings_override = override_settings(ALLOWED_HOSTS=['*'], MEDIA_ROOT=tmp, VIDEO_SIGNED_URLS=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        files = {
+            'master.m3u8': b'#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=800000\nv0/index.m3u8\n',
+            'v0/index.m3u8': b'#EXTM3U\n#EXTINF:4.0,\nseg_00000.ts\n#EXT-X-ENDLIST\n',
+            'v0/seg_00000.ts': b'\x47' * 188,
+            'poster.jpg': b'jpeg',
+        }
+        for name, content in files.items():
+            path = Path(tmp) / PREFIX / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        self.user, profile = create_professional()
+        self.video = Video.objects.create(
+            title='Agachamento', professional=profile, video_url='https://cdn.example.com/a.mp4',
+            processing_status=Video.ProcessingStatus.READY,
+            hls_manifest=f'{PREFIX}/master.m3u8', poster=f'{PREFIX}/poster.jpg',
+        )
+        self.anonymous = Client()
+
+    def detail(self):
+        response = auth_client(self.user).get(f'/api/videos/{self.video.pk}/')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return body.get('data', body)
+
+    def get(self, url):
+        parts = urlsplit(url)
+        return self.anonymous.get(parts.path + (f'?{parts.query}' if parts.query else ''))
+
+    def test_hls_playlists_and_segments_follow_the_signed_prefix(self):
+        master = self.detail()['manifest_url']
+        self.assertIn('/api/videos/media/', master)
+        response = self.get(master)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apple.mpegurl')
+        self.assertIn('public', response['Cache-Control'])
+        rendition = urljoin(master, 'v0/index.m3u8')
+        self.assertEqual(self.get(rendition).status_code, 200)
+        segment = self.get(urljoin(rendition, 'seg_00000.ts'))
+        self.assertEqual(segment.status_code, 200)
+        self.assertEqual(b''.join(segment.streaming_content), b'\x47' * 188)
+
+    def test_poster_is_signed(self):
+        poster = self.detail()['poster']
+        self.assertIn('/api/videos/media/', poster)
+        self.assertEqual(self.get(poster).status_code, 200)
+
+    def test_signature_is_limited_to_its_scope_and_validity(self):
+        expires = signing.bucket_expires(signing.current_bucket())
+        sig = signing.media_signature(f'{PREFIX}/poster.jpg', expires)
+        # Assinatura de um arquivo não vale para os vizinhos
+        self.assertEqual(self.anonymous.get(f'/api/videos/media/{expires}/{sig}/{PREFIX}/master.m3u8').status_code, 404)
+        self.assertEqual(self.anonymous.get(f'/api/videos/media/{expires}/{sig}/{PREFIX}/x/../poster.jpg').status_code, 404)
+        self.assertEqual(self.anonymous.get(f'/api/videos/media/{expires + 1}/{sig}/{PREFIX}/poster.jpg').status_code, 404)
+        past = int(time.time()) - 10
+        stale = signing.media_signature(f'{PREFIX}/poster.jpg', past)
+        self.assertEqual(self.anonymous.get(f'/api/videos/media/{past}/{stale}/{PREFIX}/poster.jpg').status_code, 404)
+        self.assertEqual(self.anonymous.get(f'/api/videos/media/{expires}/{sig}/{PREFIX}/poster.jpg').status_code, 200)
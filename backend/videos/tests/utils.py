@@ -0,0 +1,11 @@
+from users.models import ProfessionalProfile, User
+
+
+def create_professional(name='pro'):
+    user = User.objects.create(
+        email=f'{name}@example.com', username=name, role=User.Role.PROFESSIONAL,
+        subscription_status=User.SubscriptionStatus.ACTIVE,
+    )
+    profile = ProfessionalProfile.objects.create(user=user, full_name=name)
+    user.refresh_from_db()
+    return user, profile
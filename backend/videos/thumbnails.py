@@ -0,0 +1,155 @@
+"""
+Thumbnails dos vídeos: extração automática de um frame do video_file quando o
+profissional não envia imagem, e variantes redimensionadas (WebP + JPEG) em
+algumas larguras para o front usar via srcset em vez do arquivo original.
+
+Executado pelo worker (core.jobs). As variantes ficam em Video.thumbnail_variants
+junto com o nome do thumbnail de origem; se o thumbnail mudar, as variantes
+antigas deixam de ser usadas até a tarefa gerar as novas.
+"""
+import io
+import logging
+import tempfile
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from core.jobs import enqueue
+from core.models import Job
+from . import processing, signing
+from .content_cache import bump_content_version
+from .models import Video
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_JOB = 'videos.generate_thumbnails'
+DEFAULT_WIDTHS = (320, 640, 1280)
+# formato no srcset -> formato do Pillow
+FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+
+
+def thumbnail_widths():
+    return sorted(getattr(settings, 'VIDEO_THUMBNAIL_WIDTHS', DEFAULT_WIDTHS))
+
+
+def enqueue_thumbnails(video):
+    """
+    Agenda extração/variantes; nada a fazer sem thumbnail nem arquivo de vídeo. Uma tarefa
+    ainda na fila para o vídeo já vai ler o estado atual: não agenda outra.
+    """
+    if not video.thumbnail and not video.video_file:
+        return None
+    queued = Job.objects.filter(name=THUMBNAIL_JOB, status=Job.Status.QUEUED, payload__video_id=video.pk).first()
+    return queued or enqueue(THUMBNAIL_JOB, video_id=video.pk, max_attempts=2)
+
+
+def extract_thumbnail(video):
+    """Extrai um frame do video_file e grava como thumbnail do vídeo."""
+    with tempfile.TemporaryDirectory(prefix='myfit-thumb-') as workdir:
+        source = processing.local_source(video, workdir)
+        target = Path(workdir) / 'thumbnail.jpg'
+        info = processing.probe(source)
+        processing.extract_poster(source, target, processing.poster_time(info['duration']))
+        with open(target, 'rb') as fh:
+            name = default_storage.save(f'thumbnails/auto/{video.pk}-{uuid.uuid4().hex[:8]}.jpg', File(fh))
+    Video.objects.filter(pk=video.pk).update(thumbnail=name)
+    video.thumbnail.name = name
+    return name
+
+
+def _encode(image, fmt):
+    quality = getattr(settings, 'VIDEO_THUMBNAIL_QUALITY', 80)
+    buf = io.BytesIO()
+    if fmt == 'JPEG':
+        image.save(buf, fmt, quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buf, fmt, quality=quality, method=4)
+    return ContentFile(buf.getvalue())
+
+
+def build_variants(video):
+    """Gera as variantes do thumbnail atual e devolve o dict salvo em thumbnail_variants."""
+    source_name = video.thumbnail.name
+    with video.thumbnail.open('rb') as fh:
+        image = Image.open(fh)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    # Não faz upscale; imagem menor que a menor largura vira uma variante no tamanho original
+    widths = [w for w in thumbnail_widths() if w <= image.width] or [image.width]
+    prefix = f'thumbnails/variants/{video.pk}/{uuid.uuid4().hex[:8]}'
+    items = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        item = {'width': width, 'height': height}
+        for key, fmt in FORMATS.items():
+            item[key] = default_storage.save(f'{prefix}/{width}.{key}', _encode(resized, fmt))
+        items.append(item)
+    return {'source': source_name, 'items': items}
+
+
+def _delete_variants(variants):
+    for item in (variants or {}).get('items', []):
+        for key in FORMATS:
+            if item.get(key):
+                try:
+                    default_storage.delete(item[key])
+                except Exception:  # noqa: BLE001 — arquivo órfão não impede a troca das variantes
+                    logger.warning('Não foi possível remover %s', item[key])
+
+
+def generate_thumbnails(video_id):
+    video = Video.objects.filter(pk=video_id).first()
+    if video is None:
+        return
+    if not video.thumbnail:
+        if not video.video_file:
+            return
+        extract_thumbnail(video)
+    old = video.thumbnail_variants or {}
+    if old.get('source') == video.thumbnail.name:
+        return
+    variants = build_variants(video)
+    # Só grava se o thumbnail não mudou durante a geração (senão outra tarefa já está na fila)
+    updated = Video.objects.filter(pk=video_id, thumbnail=variants['source']).update(thumbnail_variants=variants)
+    _delete_variants(old if updated else variants)
+    # .update() não dispara signals: thumbnail/variantes novas nas listagens
+    bump_content_version(video.professional_id)
+
+
+def srcset(obj, request=None):
+    """
+    Estrutura srcset das variantes do thumbnail, ou None se ainda não foram geradas:
+    {'src', 'width', 'height', 'srcset': {'webp': 'url 320w, ...', 'jpeg': '...'}}.
+    """
+    return variants_srcset(obj.thumbnail_variants, obj.thumbnail.name if obj.thumbnail else None, request)
+
+
+def variants_srcset(variants, thumbnail_name, request=None):
+    """srcset() a partir dos valores crus (thumbnail_variants e nome do thumbnail)."""
+    variants = variants or {}
+    items = variants.get('items')
+    if not items or not thumbnail_name or variants.get('source') != thumbnail_name:
+        return None
+
+    def url(name):
+        return signing.media_url(name, request)
+
+    # src (fallback sem srcset): JPEG na largura mais próxima de um card (~640px)
+    fallback = min(items, key=lambda item: abs(item['width'] - 640))
+    return {
+        'src': url(fallback['jpeg']),
+        'width': fallback['width'],
+        'height': fallback['height'],
+        'srcset': {
+            key: ', '.join(f'{url(item[key])} {item["width"]}w' for item in items)
+            for key in FORMATS
+        },
+    }
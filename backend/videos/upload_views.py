@@ -0,0 +1,290 @@
+"""
+Uploads de vídeo que não passam inteiros por uma única requisição.
+
+S3 (presigned multipart): POST uploads/ (inicia) -> POST uploads/<id>/parts/ (URLs
+assinadas por parte) -> PUT de cada parte direto no bucket -> POST uploads/<id>/complete/
+(cria o Video). DELETE uploads/<id>/ aborta. Requer USE_S3=True.
+
+Resumível (estilo tus, armazenamento local): POST resumable/ (cria, com Upload-Length e
+Upload-Metadata) -> HEAD resumable/<id>/ (offset atual) -> PATCH resumable/<id>/ (chunks
+a partir do offset). DELETE resumable/<id>/ descarta.
+
+Ambos exigem profissional com assinatura ativa.
+"""
+from botocore.exceptions import BotoCoreError, ClientError
+from django.db import transaction
+from django.urls import reverse
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.permissions import IsProfessional, HasActiveSubscription
+from . import resumable, uploads
+from .processing import enqueue_processing
+from .thumbnails import enqueue_thumbnails
+from .models import Category, Video, VideoUpload
+from .serializers import (
+    VideoDetailSerializer,
+    VideoUploadSerializer,
+    VideoUploadInitiateSerializer,
+    ResumableUploadCreateSerializer,
+    VideoUploadSignPartsSerializer,
+    VideoUploadCompleteSerializer,
+)
+
+
+def _error(message, status_code):
+    return Response({'success': False, 'error': {'message': message}}, status=status_code)
+
+
+def _storage_error(exc):
+    if isinstance(exc, uploads.DirectUploadUnavailable):
+        return _error(str(exc), status.HTTP_503_SERVICE_UNAVAILABLE)
+    return _error(f'Erro no armazenamento: {exc}', status.HTTP_502_BAD_GATEWAY)
+
+
+STORAGE_ERRORS = (uploads.DirectUploadUnavailable, BotoCoreError, ClientError)
+
+
+def create_video_from_upload(upload, **fields):
+    """Cria o Video com os metadados guardados no upload."""
+    video = Video.objects.create(
+        professional=upload.professional,
+        title=upload.title,
+        description=upload.description,
+        is_active=True,
+        **fields,
+    )
+    if upload.category_ids:
+        video.categories.set(
+            Category.objects.filter(pk__in=upload.category_ids, professional=upload.professional)
+        )
+    return video
+
+
+class VideoUploadMixin:
+    permission_classes = [IsProfessional, HasActiveSubscription]
+    upload_backend = VideoUpload.Backend.S3_MULTIPART
+
+    def get_queryset(self):
+        return VideoUpload.objects.filter(professional_id=self.request.user.pk, backend=self.upload_backend)
+
+    def get_pending_upload(self, pk, lock=False):
+        qs = self.get_queryset().filter(status=VideoUpload.Status.PENDING)
+        if lock:
+            qs = qs.select_for_update()
+        return qs.filter(pk=pk).first()
+
+
+class VideoUploadInitiateView(VideoUploadMixin, generics.CreateAPIView):
+    """Inicia o upload em partes e devolve o id do upload e o tamanho de cada parte."""
+    serializer_class = VideoUploadInitiateSerializer
+
+    def create(self, request, *args, **kwargs):
+        professional = getattr(request.user, 'professional_profile', None)
+        if not professional:
+            return _error('Apenas profissionais podem enviar vídeos.', status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        storage_name = uploads.storage_name_for(professional, data['filename'])
+        try:
+            upload_id = uploads.initiate(storage_name, data.get('content_type', ''))
+        except STORAGE_ERRORS as exc:
+            return _storage_error(exc)
+        upload = serializer.save(professional=professional, storage_name=storage_name, s3_upload_id=upload_id)
+        return Response({'success': True, 'data': VideoUploadSerializer(upload).data}, status=status.HTTP_201_CREATED)
+
+
+class VideoUploadDetailView(VideoUploadMixin, generics.RetrieveDestroyAPIView):
+    """Consulta o upload (GET) ou aborta um upload pendente (DELETE)."""
+    serializer_class = VideoUploadSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response({'success': True, 'data': self.get_serializer(self.get_object()).data})
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            upload = self.get_pending_upload(kwargs['pk'], lock=True)
+            if upload is None:
+                return _error('Upload não encontrado ou já finalizado.', status.HTTP_404_NOT_FOUND)
+            try:
+                uploads.abort(upload.storage_name, upload.s3_upload_id)
+            except STORAGE_ERRORS as exc:
+                return _storage_error(exc)
+            upload.status = VideoUpload.Status.ABORTED
+            upload.save(update_fields=['status', 'updated_at'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class VideoUploadSignPartsView(VideoUploadMixin, APIView):
+    """URLs pré-assinadas (PUT) para as partes informadas."""
+
+    def post(self, request, pk):
+        serializer = VideoUploadSignPartsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = self.get_pending_upload(pk)
+        if upload is None:
+            return _error('Upload não encontrado ou já finalizado.', status.HTTP_404_NOT_FOUND)
+        try:
+            urls = [
+                {'part_number': n, 'url': uploads.sign_part(upload.storage_name, upload.s3_upload_id, n)}
+                for n in serializer.validated_data['part_numbers']
+            ]
+        except STORAGE_ERRORS as exc:
+            return _storage_error(exc)
+        return Response({'success': True, 'data': {'parts': urls}})
+
+
+class VideoUploadCompleteView(VideoUploadMixin, APIView):
+    """Conclui o upload no S3 e só então cria o Video com o arquivo enviado."""
+
+    def post(self, request, pk):
+        serializer = VideoUploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            upload = self.get_pending_upload(pk, lock=True)
+            if upload is None:
+                return _error('Upload não encontrado ou já finalizado.', status.HTTP_404_NOT_FOUND)
+            try:
+                uploads.complete(upload.storage_name, upload.s3_upload_id, serializer.validated_data['parts'])
+            except STORAGE_ERRORS as exc:
+                return _storage_error(exc)
+            video = create_video_from_upload(upload, video_file=upload.storage_name)
+            if not enqueue_processing(video):
+                enqueue_thumbnails(video)
+            upload.status = VideoUpload.Status.COMPLETED
+            upload.video = video
+            upload.save(update_fields=['status', 'video', 'updated_at'])
+        return Response({
+            'success': True,
+            'data': VideoDetailSerializer(video, context={'request': request}).data,
+        }, status=status.HTTP_201_CREATED)
+
+
+def _tus_response(status_code=status.HTTP_204_NO_CONTENT, upload=None, **headers):
+    response = Response(status=status_code)
+    response['Tus-Resumable'] = resumable.TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    if upload is not None:
+        response['Upload-Offset'] = str(upload.offset)
+        response['Upload-Length'] = str(upload.upload_length)
+    for name, value in headers.items():
+        response[name.replace('_', '-')] = value
+    return response
+
+
+class ResumableUploadCreateView(VideoUploadMixin, APIView):
+    """Cria um upload resumível (POST com Upload-Length e Upload-Metadata) e anuncia as extensões (OPTIONS)."""
+    upload_backend = VideoUpload.Backend.RESUMABLE
+
+    def options(self, request, *args, **kwargs):
+        return _tus_response(
+            Tus_Version=resumable.TUS_VERSION,
+            Tus_Extension=resumable.TUS_EXTENSIONS,
+            Tus_Max_Size=str(resumable.max_size()),
+            Tus_Checksum_Algorithm=','.join(resumable.CHECKSUM_ALGORITHMS),
+        )
+
+    def post(self, request):
+        professional = getattr(request.user, 'professional_profile', None)
+        if not professional:
+            return _error('Apenas profissionais podem enviar vídeos.', status.HTTP_403_FORBIDDEN)
+        try:
+            metadata = resumable.parse_metadata(request.headers.get('Upload-Metadata'))
+        except ValueError as exc:
+            return _error(str(exc), status.HTTP_400_BAD_REQUEST)
+        categories = metadata.get('categories', '')
+        serializer = ResumableUploadCreateSerializer(
+            data={
+                'filename': metadata.get('filename', ''),
+                'content_type': metadata.get('filetype', ''),
+                'title': metadata.get('title') or metadata.get('filename', ''),
+                'description': metadata.get('description', ''),
+                'categories': [c for c in categories.split(',') if c.strip()],
+                'size': request.headers.get('Upload-Length'),
+                'checksum': metadata.get('checksum', ''),
+            },
+            context={'request': request},
+        )
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.save(professional=professional)
+        location = request.build_absolute_uri(reverse('video-resumable-detail', args=[upload.pk]))
+        return _tus_response(status.HTTP_201_CREATED, upload, Location=location)
+
+
+class ResumableUploadView(VideoUploadMixin, APIView):
+    """HEAD: offset atual; PATCH: acrescenta um chunk; GET: estado em JSON; DELETE: descarta."""
+    upload_backend = VideoUpload.Backend.RESUMABLE
+
+    def get(self, request, pk):
+        upload = self.get_queryset().filter(pk=pk).first()
+        if upload is None:
+            return _error('Upload não encontrado.', status.HTTP_404_NOT_FOUND)
+        return Response({'success': True, 'data': VideoUploadSerializer(upload).data})
+
+    def head(self, request, pk):
+        upload = self.get_pending_upload(pk)
+        if upload is None:
+            return _tus_response(status.HTTP_404_NOT_FOUND)
+        return _tus_response(status.HTTP_200_OK, upload)
+
+    def patch(self, request, pk):
+        if request.content_type != 'application/offset+octet-stream':
+            return _tus_response(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+            checksum = resumable.parse_checksum(request.headers.get('Upload-Checksum'))
+        except (KeyError, ValueError, resumable.InvalidChecksumHeader):
+            return _tus_response(status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            upload = self.get_pending_upload(pk, lock=True)
+            if upload is None:
+                return _tus_response(status.HTTP_404_NOT_FOUND)
+            if offset != upload.offset:
+                return _tus_response(status.HTTP_409_CONFLICT, upload)
+            if upload.offset + length > upload.upload_length:
+                return _tus_response(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, upload)
+            try:
+                upload.offset = resumable.append_chunk(upload, request.stream, length, checksum)
+            except resumable.ChecksumMismatch:
+                return _tus_response(460)  # tus: Checksum Mismatch
+            except resumable.PartialFileMissing:
+                # O cliente consulta o offset (HEAD) e reenvia desde o início
+                self._restart(upload)
+                return _tus_response(status.HTTP_409_CONFLICT, upload)
+            upload.save(update_fields=['offset', 'updated_at'])
+            if upload.offset < upload.upload_length:
+                return _tus_response(upload=upload)
+            try:
+                # Savepoint: só o Video é desfeito; o offset zerado é gravado na transação externa
+                with transaction.atomic():
+                    video = create_video_from_upload(upload)
+                    resumable.attach_to_video(upload, video)
+            except resumable.ChecksumMismatch:
+                # Arquivo inteiro corrompido: recomeça o upload do zero
+                self._restart(upload)
+                return _tus_response(460)
+            if not enqueue_processing(video):
+                enqueue_thumbnails(video)
+            upload.status = VideoUpload.Status.COMPLETED
+            upload.video = video
+            upload.storage_name = video.video_file.name
+            upload.save(update_fields=['status', 'video', 'storage_name', 'updated_at'])
+        return _tus_response(upload=upload, Upload_Video_Id=str(video.pk))
+
+    def _restart(self, upload):
+        resumable.discard(upload)
+        upload.offset = 0
+        upload.save(update_fields=['offset', 'updated_at'])
+
+    def delete(self, request, pk):
+        with transaction.atomic():
+            upload = self.get_pending_upload(pk, lock=True)
+            if upload is None:
+                return _tus_response(status.HTTP_404_NOT_FOUND)
+            resumable.discard(upload)
+            upload.status = VideoUpload.Status.ABORTED
+            upload.save(update_fields=['status', 'updated_at'])
+        return _tus_response()
@@ -0,0 +1,107 @@
+"""
+Upload de vídeo direto para o S3 em partes (multipart upload com URLs pré-assinadas).
+
+O cliente envia cada parte direto ao bucket; o Django só inicia, assina, conclui
+ou aborta o upload, sem que o arquivo passe pelos workers do gunicorn.
+Funciona com AWS ou qualquer endpoint compatível (MinIO, moto) via AWS_S3_ENDPOINT_URL.
+"""
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.text import get_valid_filename
+
+# Limites do S3 para multipart upload
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+
+class DirectUploadUnavailable(Exception):
+    """Upload direto exige USE_S3=True."""
+
+
+def direct_upload_enabled():
+    return bool(getattr(settings, 'USE_S3', False))
+
+
+@lru_cache(maxsize=1)
+def s3_client():
+    """Client boto3 reaproveitado pelo processo (mantém o pool de conexões HTTP)."""
+    if not direct_upload_enabled():
+        raise DirectUploadUnavailable('Upload direto requer armazenamento S3 (USE_S3=True).')
+    import boto3
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+        region_name=settings.AWS_S3_REGION_NAME,
+        endpoint_url=getattr(settings, 'AWS_S3_ENDPOINT_URL', None),
+    )
+
+
+def part_size():
+    return max(getattr(settings, 'VIDEO_UPLOAD_PART_SIZE', MIN_PART_SIZE), MIN_PART_SIZE)
+
+
+def storage_name_for(professional, filename):
+    """Nome do arquivo relativo ao storage (o mesmo que fica em Video.video_file)."""
+    safe = get_valid_filename(filename) or 'video'
+    return f'videos/{professional.user_id}/uploads/{uuid.uuid4().hex}/{safe}'
+
+
+def object_key(storage_name):
+    """Chave no bucket: MediaStorage grava sob o prefixo `location` ('media')."""
+    from .storage import MediaStorage
+    location = getattr(MediaStorage, 'location', '') or ''
+    return f'{location.strip("/")}/{storage_name}' if location else storage_name
+
+
+def initiate(storage_name, content_type):
+    response = s3_client().create_multipart_upload(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=object_key(storage_name),
+        ContentType=content_type or 'application/octet-stream',
+        **_object_parameters(),
+    )
+    return response['UploadId']
+
+
+def sign_part(storage_name, upload_id, part_number):
+    return s3_client().generate_presigned_url(
+        'upload_part',
+        Params={
+            'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
+            'Key': object_key(storage_name),
+            'UploadId': upload_id,
+            'PartNumber': part_number,
+        },
+        ExpiresIn=getattr(settings, 'VIDEO_UPLOAD_URL_EXPIRES', 3600),
+    )
+
+
+def complete(storage_name, upload_id, parts):
+    """parts: [{'part_number': int, 'etag': str}, ...]"""
+    s3_client().complete_multipart_upload(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=object_key(storage_name),
+        UploadId=upload_id,
+        MultipartUpload={
+            'Parts': [
+                {'PartNumber': p['part_number'], 'ETag': p['etag']}
+                for p in sorted(parts, key=lambda p: p['part_number'])
+            ],
+        },
+    )
+
+
+def abort(storage_name, upload_id):
+    s3_client().abort_multipart_upload(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=object_key(storage_name),
+        UploadId=upload_id,
+    )
+
+
+def _object_parameters():
+    params = getattr(settings, 'AWS_S3_OBJECT_PARAMETERS', None) or {}
+    return {k: v for k, v in params.items() if k in ('CacheControl', 'ContentDisposition')}
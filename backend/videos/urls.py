@@ -1,12 +1,23 @@
 from django.urls import path
 from . import views
+from . import upload_views
 
 urlpatterns = [
     path('categories/', views.CategoryListCreateView.as_view(), name='category-list-create'),
+    path('categories/import/', views.CategoryImportView.as_view(), name='category-import'),
     path('categories/<int:pk>/', views.CategoryDetailView.as_view(), name='category-detail'),
     path('videos/', views.VideoListView.as_view(), name='video-list'),
     path('videos/me/', views.VideoMyListView.as_view(), name='video-my-list'),
+    path('videos/bulk/', views.VideoBulkView.as_view(), name='video-bulk'),
     path('videos/upload/', views.VideoCreateView.as_view(), name='video-create'),
+    path('videos/uploads/', upload_views.VideoUploadInitiateView.as_view(), name='video-upload-initiate'),
+    path('videos/uploads/<int:pk>/', upload_views.VideoUploadDetailView.as_view(), name='video-upload-detail'),
+    path('videos/uploads/<int:pk>/parts/', upload_views.VideoUploadSignPartsView.as_view(), name='video-upload-parts'),
+    path('videos/uploads/<int:pk>/complete/', upload_views.VideoUploadCompleteView.as_view(), name='video-upload-complete'),
+    path('videos/resumable/', upload_views.ResumableUploadCreateView.as_view(), name='video-resumable-create'),
+    path('videos/resumable/<int:pk>/', upload_views.ResumableUploadView.as_view(), name='video-resumable-detail'),
+    path('videos/media/<int:expires>/<str:signature>/<path:name>', views.VideoMediaView.as_view(), name='video-media'),
     path('videos/<int:pk>/', views.VideoDetailView.as_view(), name='video-watch'),
+    path('videos/<int:pk>/stream/', views.VideoStreamView.as_view(), name='video-stream'),
     path('videos/<int:pk>/edit/', views.VideoUpdateDestroyView.as_view(), name='video-edit'),
 ]
@@ -1,29 +1,43 @@
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
 from rest_framework import generics
 from rest_framework.response import Response
 
+from core.async_views import AsyncAPIViewMixin, AsyncListModelMixin, AsyncRetrieveModelMixin
+from core.pagination import OptionalCursorPagination
 from core.permissions import IsProfessional, IsProfessionalOrReadOnly, IsOwnerOrAdmin, HasActiveSubscription
+from users.visibility import visible_professional_ids
 from .models import Category, Video
 from .serializers import (
     CategorySerializer,
     CategoryTreeSerializer,
     CategoryCreateSerializer,
     CategoryUpdateSerializer,
-    VideoListSerializer,
+    CategoryImportSerializer,
+    VideoListValuesSerializer,
     VideoDetailSerializer,
     VideoCreateUpdateSerializer,
+    VideoBulkSerializer,
 )
 from .filters import VideoFilter
+from .content_cache import cached_response
+from . import bulk, signing, streaming
 
 
 def _category_queryset(request):
-    from users.models import ProfessionalStudent
     user = request.user
     qs = Category.objects.all().select_related('parent').order_by('name')
     if user.role == 'user':
-        pro_ids = ProfessionalStudent.objects.filter(student=user).values_list('professional_id', flat=True)
-        qs = qs.filter(professional__user_id__in=pro_ids)
-    elif user.role in ('professional', 'admin') and hasattr(user, 'professional_profile'):
-        qs = qs.filter(professional=user.professional_profile)
+        qs = qs.filter(professional_id__in=visible_professional_ids(user))
+    elif user.role in ('professional', 'admin') and user.has_professional_profile:
+        # ProfessionalProfile usa o user como PK
+        qs = qs.filter(professional_id=user.pk)
     elif user.role == 'admin':
         pass
     else:
@@ -31,8 +45,23 @@ def _category_queryset(request):
     return qs
 
 
-class CategoryListCreateView(generics.ListCreateAPIView):
-    """Lista categorias (em árvore se ?tree=1) e cria categoria/subcategoria (professor)."""
+def _with_categories(qs):
+    """Categorias com o pai já carregado (display_name/parent_name sem query por categoria)."""
+    return qs.select_related('professional', 'professional__user').prefetch_related(
+        Prefetch('categories', queryset=Category.objects.select_related('parent')),
+    )
+
+
+def _visible_videos(request):
+    """Vídeos ativos; alunos só os dos profissionais a que estão vinculados (ProfessionalStudent)."""
+    qs = Video.objects.filter(is_active=True)
+    if request.user.role == 'user':
+        qs = qs.filter(professional_id__in=visible_professional_ids(request.user))
+    return qs
+
+
+class CategoryListCreateView(AsyncAPIViewMixin, generics.ListCreateAPIView):
+    """Lista categorias (em árvore se ?tree=1) e cria categoria/subcategoria (professor). View async."""
     permission_classes = [IsProfessionalOrReadOnly]
     pagination_class = None
 
@@ -46,12 +75,38 @@ class CategoryListCreateView(generics.ListCreateAPIView):
             return CategoryTreeSerializer
         return CategorySerializer
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+    async def get(self, request, *args, **kwargs):
+        return await cached_response(self, 'categories', lambda: self.list(request, *args, **kwargs))
+
+    def content_scope(self):
+        """Profissionais cujas categorias esta listagem mostra (None = todos)."""
+        user = self.request.user
+        if user.role == 'user':
+            return visible_professional_ids(user)
+        if user.role in ('professional', 'admin') and user.has_professional_profile:
+            return [user.pk]
+        if user.role == 'admin':
+            return None
+        return []
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(self.create)(request, *args, **kwargs)
+
+    async def list(self, request, *args, **kwargs):
+        queryset = await self.aget_queryset()
+        categories = [category async for category in queryset]
         if request.query_params.get('tree') == '1':
-            queryset = queryset.filter(parent__isnull=True).prefetch_related('children__children')
-        serializer = self.get_serializer(queryset, many=True)
-        return Response({'success': True, 'data': serializer.data})
+            # Árvore inteira numa única query; filhos agrupados em Python (qualquer profundidade)
+            children_map = defaultdict(list)
+            for category in categories:
+                children_map[category.parent_id].append(category)
+            roots = children_map.pop(None, [])
+            context = {**self.get_serializer_context(), 'children_map': children_map}
+            serializer = self.get_serializer(roots, many=True, context=context)
+        else:
+            serializer = self.get_serializer(categories, many=True)
+        # Fora do event loop e medido como serialização (árvores grandes)
+        return Response({'success': True, 'data': await sync_to_async(self._serialize)(serializer)})
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -63,6 +118,24 @@ class CategoryListCreateView(generics.ListCreateAPIView):
         }, status=201)
 
 
+class CategoryImportView(generics.GenericAPIView):
+    """
+    Importa uma árvore de categorias de uma vez (ex.: currículo inteiro):
+    {"parent": id opcional, "categories": [{"name", "description", "children": [...]}]}.
+    """
+    serializer_class = CategoryImportSerializer
+    permission_classes = [IsProfessional]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created = serializer.save()
+        return Response({
+            'success': True,
+            'data': CategorySerializer(created, many=True).data,
+        }, status=201)
+
+
 class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, atualizar e excluir categoria ou subcategoria (dono ou admin)."""
     permission_classes = [IsProfessional]
@@ -95,37 +168,119 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(status=204)
 
 
-class VideoListView(generics.ListAPIView):
-    """Listagem de vídeos: alunos veem só dos profissionais a que estão vinculados."""
-    serializer_class = VideoListSerializer
+class VideoListView(AsyncAPIViewMixin, AsyncListModelMixin, generics.ListAPIView):
+    """Listagem de vídeos: alunos veem só dos profissionais a que estão vinculados (?cursor= ativa paginação por cursor)."""
+    serializer_class = VideoListValuesSerializer
+    pagination_class = OptionalCursorPagination
     filterset_class = VideoFilter
 
+    async def get(self, request, *args, **kwargs):
+        return await cached_response(self, 'videos', lambda: self.alist(request, *args, **kwargs))
+
+    def content_scope(self):
+        """Profissionais cujos vídeos esta listagem mostra (None = todos)."""
+        user = self.request.user
+        return visible_professional_ids(user) if user.role == 'user' else None
+
+    def filter_queryset(self, queryset):
+        return VideoListValuesSerializer.rows(super().filter_queryset(queryset))
+
     def get_queryset(self):
-        qs = Video.objects.filter(is_active=True).select_related('professional', 'professional__user').prefetch_related('categories')
+        qs = Video.objects.filter(is_active=True)
         user = self.request.user
         if user.role == 'user':
             # Aluno: apenas vídeos dos profissionais que o têm como aluno
-            from users.models import ProfessionalStudent
-            pro_ids = ProfessionalStudent.objects.filter(student=user).values_list('professional_id', flat=True)
-            # Vídeo.professional é ProfessionalProfile; professional.user_id é o User profissional
-            qs = qs.filter(professional__user_id__in=pro_ids)
+            # Vídeo.professional é ProfessionalProfile (pk = user_id), então filtramos direto pela FK
+            qs = qs.filter(professional_id__in=visible_professional_ids(user))
         # professional/admin continuam vendo todos aqui? Não: profissionais usam /videos/me/. Então esta listagem é para alunos. Admin pode ver todos - então para admin não filtramos.
         elif user.role == 'admin':
             pass  # admin vê todos
         return qs
 
 
-class VideoDetailView(generics.RetrieveAPIView):
+class VideoDetailView(AsyncAPIViewMixin, AsyncRetrieveModelMixin, generics.RetrieveAPIView):
     """Detalhe de um vídeo. Alunos só acessam vídeos dos seus profissionais."""
     serializer_class = VideoDetailSerializer
 
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
+
     def get_queryset(self):
-        qs = Video.objects.filter(is_active=True).select_related('professional', 'professional__user').prefetch_related('categories')
-        if self.request.user.role == 'user':
-            from users.models import ProfessionalStudent
-            pro_ids = ProfessionalStudent.objects.filter(student=self.request.user).values_list('professional_id', flat=True)
-            qs = qs.filter(professional__user_id__in=pro_ids)
-        return qs
+        return _with_categories(_visible_videos(self.request))
+
+
+class VideoStreamView(generics.GenericAPIView):
+    """
+    Arquivo do vídeo com Range/If-Range (storage local); mesmas regras de acesso do detalhe.
+    URLs assinadas (?expires=&sig=, emitidas pelos serializers) dispensam o token: o acesso
+    já foi checado na emissão, e o player/CDN não envia Authorization.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.signed = signing.verify_stream_signature(
+            kwargs.get('pk'), request.query_params.get('expires'), request.query_params.get('sig'),
+        )
+        super().initial(request, *args, **kwargs)
+
+    def get_permissions(self):
+        if self.signed:
+            return []
+        return super().get_permissions()
+
+    def get_queryset(self):
+        qs = Video.objects.filter(is_active=True) if self.signed else _visible_videos(self.request)
+        return qs.only('id', 'video_file', 'video_url', 'professional_id')
+
+    def get(self, request, *args, **kwargs):
+        video = self.get_object()
+        if streaming.local_path(video) is None:
+            # S3 ou URL externa: o próprio storage/host atende Range
+            url = signing.video_url(video, request)
+            if not url:
+                raise Http404
+            return HttpResponseRedirect(url)
+        try:
+            if self.signed:
+                # Cacheável na CDN até a URL expirar
+                expires_in = int(request.query_params['expires']) - int(time.time())
+                return streaming.serve(request, video, public=True, max_age=max(expires_in, 0))
+            return streaming.serve(request, video)
+        except FileNotFoundError:
+            raise Http404
+
+
+class VideoMediaView(generics.GenericAPIView):
+    """
+    Playlists/segmentos HLS, poster e thumbnails por URL assinada (signing.media_url),
+    sem token e sem consulta ao banco: o acesso foi checado quando a URL foi emitida.
+    """
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request, expires, signature, name):
+        if not signing.verify_media_signature(name, expires, signature):
+            raise Http404
+        max_age = max(expires - int(time.time()), 0)
+        try:
+            path = default_storage.path(name)
+        except NotImplementedError:
+            path = None
+        if path is None:
+            if not name.endswith('.m3u8'):
+                return HttpResponseRedirect(signing.remote_object_url(name, expires))
+            # Playlist servida daqui: as URIs relativas continuam no prefixo assinado
+            try:
+                with default_storage.open(name) as fh:
+                    content = fh.read()
+            except FileNotFoundError:
+                raise Http404
+            response = HttpResponse(content, content_type='application/vnd.apple.mpegurl')
+            patch_cache_control(response, public=True, max_age=max_age)
+            return response
+        try:
+            return streaming.serve_file(request, path, public=True, max_age=max_age)
+        except FileNotFoundError:
+            raise Http404
 
 
 class VideoCreateView(generics.CreateAPIView):
@@ -140,22 +295,48 @@ class VideoCreateView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
+        # Recarregado com categorias e pais (display_name sem uma query por categoria)
+        video = _with_categories(Video.objects.filter(pk=serializer.instance.pk)).get()
         return Response({
             'success': True,
-            'data': VideoDetailSerializer(serializer.instance).data,
+            'data': VideoDetailSerializer(video).data,
         }, status=201)
 
 
 class VideoMyListView(generics.ListAPIView):
-    """Vídeos do profissional logado (requer assinatura ativa)."""
-    serializer_class = VideoListSerializer
+    """Vídeos do profissional logado (requer assinatura ativa; ?cursor= ativa paginação por cursor)."""
+    serializer_class = VideoListValuesSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = [IsProfessional, HasActiveSubscription]
     filterset_class = VideoFilter
 
+    def filter_queryset(self, queryset):
+        return VideoListValuesSerializer.rows(super().filter_queryset(queryset))
+
     def get_queryset(self):
-        return Video.objects.filter(
-            professional__user=self.request.user
-        ).select_related('professional', 'professional__user').prefetch_related('categories')
+        return Video.objects.filter(professional_id=self.request.user.pk)
+
+
+class VideoBulkView(generics.GenericAPIView):
+    """
+    Operação em lote nos vídeos do profissional (admin: em quaisquer vídeos):
+    {"action": "activate|deactivate|set_categories|add_categories|remove_categories|move|delete",
+    "ids": [...], "categories": [...], "source": id, "target": id}.
+    """
+    serializer_class = VideoBulkSerializer
+    permission_classes = [IsProfessional, HasActiveSubscription]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        changed = bulk.apply(
+            data['action'], data['videos'], data['categories'], data.get('source'), data.get('target'),
+        )
+        return Response({
+            'success': True,
+            'data': {'action': data['action'], 'matched': len(data['videos']), 'changed': changed},
+        })
 
 
 class VideoUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
@@ -177,6 +358,7 @@ class VideoUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        instance = _with_categories(Video.objects.filter(pk=instance.pk)).get()
         return Response({
             'success': True,
             'data': VideoDetailSerializer(instance).data,
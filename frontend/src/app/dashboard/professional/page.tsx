@@ -5,7 +5,7 @@ import Link from 'next/link';
 import { useSearchParams } from 'next/navigation';
 import { api, apiAuth, apiFormData } from '@/lib/api';
 import type { Video, Category, LinkedStudent, User } from '@/types';
-import type { PaginatedResponse } from '@/types';
+import type { CursorPage, PaginatedResponse } from '@/types';
 import { VideoCard } from '@/features/videos/VideoCard';
 import { VideoPlayer } from '@/features/videos/VideoPlayer';
 import { useAuth } from '@/features/auth/AuthProvider';
@@ -39,6 +39,7 @@ export default function ProfessionalDashboardPage() {
 
   const [students, setStudents] = useState<LinkedStudent[]>([]);
   const [studentsLoading, setStudentsLoading] = useState(false);
+  const [studentsNext, setStudentsNext] = useState<string | null>(null);
   const [studentEmail, setStudentEmail] = useState('');
   const [studentError, setStudentError] = useState('');
   const [addingStudent, setAddingStudent] = useState(false);
@@ -97,9 +98,22 @@ export default function ProfessionalDashboardPage() {
   const loadStudents = async () => {
     if (!hasActiveSubscription) return;
     setStudentsLoading(true);
-    const res = await apiAuth<LinkedStudent[]>('students/');
+    const res = await apiAuth<CursorPage<LinkedStudent>>('students/');
     setStudentsLoading(false);
-    if (res.success) setStudents(Array.isArray(res.data) ? res.data : []);
+    if (res.success) {
+      setStudents(res.data.results ?? []);
+      setStudentsNext(res.data.next);
+    }
+  };
+
+  const loadMoreStudents = async () => {
+    if (!studentsNext) return;
+    const cursor = new URL(studentsNext).searchParams.get('cursor') ?? '';
+    const res = await apiAuth<CursorPage<LinkedStudent>>(`students/?cursor=${encodeURIComponent(cursor)}`);
+    if (res.success) {
+      setStudents((s) => [...s, ...(res.data.results ?? [])]);
+      setStudentsNext(res.data.next);
+    }
   };
 
   useEffect(() => {
@@ -393,6 +407,11 @@ export default function ProfessionalDashboardPage() {
               ))}
             </ul>
           )}
+          {studentsNext && (
+            <button type="button" onClick={loadMoreStudents} className="text-sm text-white/70 hover:text-white mt-3">
+              Carregar mais
+            </button>
+          )}
         </div>
       )}
 